@@ -1,58 +1,68 @@
+import logging
 import os
-from langchain_google_vertexai import ChatVertexAI
-from langchain_google_genai import ChatGoogleGenerativeAI
+from functools import lru_cache
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from src.system_instructions import VISIONARY_INSTRUCTION, SKEPTIC_INSTRUCTION, CHAIRPERSON_INSTRUCTION
-from src.tools import notion_search, notion_read_page, calendar_list_events, calendar_create_event
-
-# Initialize Models
-# Check if we have Vertex AI config or just API Key
-# Initialize Models
-# Check if we have Vertex AI config or just API Key
-project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-location = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
-api_key = os.getenv("GOOGLE_API_KEY")
-
-if api_key:
-    print("Using Google Gemini API Models (via API Key)")
-    llm_pro = ChatGoogleGenerativeAI(model="gemini-1.5-pro", temperature=0.7, google_api_key=api_key)
-    llm_flash = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.3, google_api_key=api_key)
-elif project_id:
-    print(f"Using Vertex AI Models (Project: {project_id}, Location: {location})")
-    llm_pro = ChatVertexAI(
-        model_name="gemini-1.5-pro-001", 
-        temperature=0.7,
-        project=project_id,
-        location=location
-    )
-    llm_flash = ChatVertexAI(
-        model_name="gemini-1.5-flash-001", 
-        temperature=0.3,
-        project=project_id,
-        location=location
-    )
-else:
+
+logger = logging.getLogger(__name__)
+
+# Models are built on first use, not at import: the provider SDKs take seconds
+# to import, and importing this module should not require credentials.
+def _build_llm(tier: str):
+    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+    location = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
+    api_key = os.getenv("GOOGLE_API_KEY")
+    temperature = 0.7 if tier == "pro" else 0.3
+
+    if api_key:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        logger.info(f"Using Google Gemini API Models (via API Key): {tier}")
+        return ChatGoogleGenerativeAI(model=f"gemini-1.5-{tier}", temperature=temperature, google_api_key=api_key)
+    elif project_id:
+        from langchain_google_vertexai import ChatVertexAI
+        logger.info(f"Using Vertex AI Models (Project: {project_id}, Location: {location}): {tier}")
+        return ChatVertexAI(
+            model_name=f"gemini-1.5-{tier}-001",
+            temperature=temperature,
+            project=project_id,
+            location=location
+        )
     raise ValueError("No Google Cloud Project or API Key found. Please configure .env.")
 
-def get_visionary_agent():
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", VISIONARY_INSTRUCTION),
+@lru_cache(maxsize=None)
+def get_llm_pro():
+    return _build_llm("pro")
+
+@lru_cache(maxsize=None)
+def get_llm_flash():
+    return _build_llm("flash")
+
+def __getattr__(name):
+    # `from src.agents import llm_pro` still works; the model is built on that first access
+    if name == "llm_pro":
+        return get_llm_pro()
+    if name == "llm_flash":
+        return get_llm_flash()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@lru_cache(maxsize=None)
+def _agent_prompt(instruction: str) -> ChatPromptTemplate:
+    # Parsed once per instruction; templates are immutable, so every agent can share them
+    return ChatPromptTemplate.from_messages([
+        ("system", instruction),
         MessagesPlaceholder(variable_name="messages"),
     ])
-    return prompt | llm_pro
 
+def get_visionary_agent():
+    return _agent_prompt(VISIONARY_INSTRUCTION) | get_llm_pro()
+
+@lru_cache(maxsize=None)
 def get_skeptic_agent():
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", SKEPTIC_INSTRUCTION),
-        MessagesPlaceholder(variable_name="messages"),
-    ])
-    # Bind tools to Skeptic
-    tools = [notion_search, notion_read_page, calendar_list_events, calendar_create_event]
-    return prompt | llm_flash.bind_tools(tools)
+    from src.tools import notion_search, notion_read_page, calendar_list_events, calendar_create_event, calendar_create_events
+
+    # Bind tools to Skeptic once; tool calls are executed by src.tool_runner
+    tools = [notion_search, notion_read_page, calendar_list_events, calendar_create_event, calendar_create_events]
+    return _agent_prompt(SKEPTIC_INSTRUCTION) | get_llm_flash().bind_tools(tools)
 
 def get_chair_agent():
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", CHAIRPERSON_INSTRUCTION),
-        MessagesPlaceholder(variable_name="messages"),
-    ])
-    return prompt | llm_pro
+    return _agent_prompt(CHAIRPERSON_INSTRUCTION) | get_llm_pro()
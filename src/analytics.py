@@ -0,0 +1,413 @@
+"""
+Debate Analytics Export for THE ROUNDTABLE
+
+Studying decisions, round counts and latency used to mean digging through
+the checkpoint database: pickled channel values, one blob per node write.
+This module appends every finished debate to flat, typed tables instead:
+
+- `analytics_debates`: one row per debate (or follow-up, or resumed run):
+  question hash, verdict, rounds, turns, tokens, wall-clock seconds
+- `analytics_turns`: one row per agent turn: node, agent, round, input and
+  output tokens, model seconds, seconds since the previous turn
+- Both carry a `day` partition column in covering indexes, so the
+  aggregates read compact, pre-sorted indexes, never checkpoints
+- Rows are buffered and written in batches (ANALYTICS_BATCH_SIZE turns, or
+  after ANALYTICS_FLUSH_SECONDS) by a flush on a worker thread, so a debate
+  never waits on the analytics write; anything still buffered is written
+  at exit
+
+The aggregates are set-based SQL over those indexes (a percentile is a
+seek to its rank in an index already sorted by latency): `node_latency`
+(p50/p95 per node), `verdict_mix` and `debate_summary`.
+
+CLI:
+    python -m src.analytics report [--days 7]
+    python -m src.analytics bench [--turns 1000000]
+"""
+
+import argparse
+import asyncio
+import atexit
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+ANALYTICS_EXPORT = os.getenv("ANALYTICS_EXPORT", "1").lower() in ("1", "true", "yes")
+ANALYTICS_PATH = os.getenv("ANALYTICS_PATH", "analytics.db")
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "256"))  # Buffered turns that trigger a flush
+ANALYTICS_FLUSH_SECONDS = float(os.getenv("ANALYTICS_FLUSH_SECONDS", "2"))  # Longest a row waits in the buffer
+
+VERDICTS = ("SUPPORT", "OPPOSE")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analytics_debates (
+    day TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    question_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    rounds INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analytics_turns (
+    day TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    node TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    model_seconds REAL NOT NULL,
+    elapsed_seconds REAL NOT NULL,
+    chars INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analytics_debates_day ON analytics_debates (day, verdict, kind, rounds, input_tokens, output_tokens);
+CREATE INDEX IF NOT EXISTS analytics_debates_seconds ON analytics_debates (seconds, day);
+CREATE INDEX IF NOT EXISTS analytics_turns_latency ON analytics_turns (node, model_seconds, day, input_tokens, output_tokens);
+"""
+
+DEBATE_COLUMNS = ("day", "thread_id", "question_hash", "kind", "verdict", "rounds", "turns", "input_tokens", "output_tokens", "seconds", "started_at")
+TURN_COLUMNS = ("day", "thread_id", "seq", "round", "node", "agent", "input_tokens", "output_tokens", "model_seconds", "elapsed_seconds", "chars")
+
+logger = logging.getLogger(__name__)
+
+
+def question_hash(question: str) -> str:
+    """Stable key for a question (case and whitespace insensitive), so the text itself is not exported."""
+    return hashlib.sha256(" ".join(question.lower().split()).encode()).hexdigest()[:16]
+
+
+def verdict_of(text: Optional[str]) -> str:
+    """SUPPORT, OPPOSE, or UNDECIDED from the Chair's last message."""
+    upper = (text or "").upper()
+    return next((v for v in VERDICTS if f"DECISION: {v}" in upper), "UNDECIDED")
+
+
+def debate_rows(
+    thread_id: str,
+    question: str,
+    entries: Sequence[Mapping[str, Any]],
+    started_at: float,
+    nodes: Mapping[str, str],
+    chair: str,
+    kind: str = "debate",
+    first_round: int = 1,
+) -> Tuple[Tuple[Any, ...], List[Tuple[Any, ...]]]:
+    """
+    Flatten one debate's transcript into a debate row and its turn rows.
+
+    Args:
+        thread_id: Checkpoint thread
+        question: The question debated (only its hash is exported)
+        entries: Transcript entries with `usage` (see `TranscriptEntry`)
+        started_at: Epoch seconds the run started
+        nodes: Agent name -> graph node
+        chair: The Chair's agent name (its turns close a round)
+        kind: "debate", "follow_up" or "resumed"
+        first_round: Round the first entry belongs to (a resumed run starts mid-debate)
+
+    Returns:
+        (debate row, turn rows), in DEBATE_COLUMNS / TURN_COLUMNS order
+    """
+    day = datetime.fromtimestamp(started_at).strftime("%Y-%m-%d")
+    turns, previous, current_round = [], started_at, first_round
+    totals = Counter()
+    verdict_text = None
+    for seq, entry in enumerate(entries):
+        usage = entry.get("usage") or {}
+        created = getattr(entry, "created", None) or datetime.fromisoformat(entry["timestamp"]).timestamp()
+        agent = entry["agent"]
+        turns.append((
+            day, thread_id, seq, current_round, nodes.get(agent, agent), agent,
+            int(usage.get("input_tokens", 0)), int(usage.get("output_tokens", 0)),
+            float(usage.get("seconds", 0.0)), max(0.0, created - previous), len(entry["content"]),
+        ))
+        totals["input_tokens"] += int(usage.get("input_tokens", 0))
+        totals["output_tokens"] += int(usage.get("output_tokens", 0))
+        previous = created
+        if agent == chair:
+            verdict_text = entry["content"]
+            current_round += 1
+    debate = (
+        day, thread_id, question_hash(question), kind, verdict_of(verdict_text),
+        current_round - first_round, len(turns), totals["input_tokens"], totals["output_tokens"],
+        round(previous - started_at, 3), started_at,
+    )
+    return debate, turns
+
+
+class AnalyticsExporter:
+    """Append-only, batched writer of debate and turn rows to the analytics tables."""
+
+    def __init__(
+        self,
+        path: str = ANALYTICS_PATH,
+        batch_size: int = ANALYTICS_BATCH_SIZE,
+        flush_seconds: float = ANALYTICS_FLUSH_SECONDS,
+        enabled: bool = ANALYTICS_EXPORT,
+    ):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.enabled = enabled
+        self.counters: Counter = Counter()
+        self._debates: List[Tuple[Any, ...]] = []
+        self._turns: List[Tuple[Any, ...]] = []
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._schema_ready = False
+        # Pending flush task / timer, per event loop
+        self._flushing: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task]" = weakref.WeakKeyDictionary()
+        self._timers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.TimerHandle]" = weakref.WeakKeyDictionary()
+
+    def record(self, debate: Tuple[Any, ...], turns: Sequence[Tuple[Any, ...]]):
+        """Buffer one debate's rows (cheap; the write happens in a later batch)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._debates.append(debate)
+            self._turns.extend(turns)
+            full = len(self._turns) >= self.batch_size
+        self._schedule(full)
+
+    def _schedule(self, now: bool):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if now:
+                self.flush()  # No event loop to flush on: write inline
+            return
+        if now:
+            task = self._flushing.get(loop)
+            if task is None or task.done():
+                self._flushing[loop] = loop.create_task(self.aflush())
+        elif loop not in self._timers:
+            self._timers[loop] = loop.call_later(self.flush_seconds, self._timer_fired, loop)
+
+    def _timer_fired(self, loop: asyncio.AbstractEventLoop):
+        self._timers.pop(loop, None)
+        self._schedule(True)
+
+    async def aflush(self) -> int:
+        """Write the buffered rows on a worker thread."""
+        return await asyncio.to_thread(self.flush)
+
+    def flush(self) -> int:
+        """Write the buffered rows in one transaction (blocking); returns the turns written."""
+        with self._lock:
+            debates, self._debates = self._debates, []
+            turns, self._turns = self._turns, []
+        if not debates and not turns:
+            return 0
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany(f"INSERT INTO analytics_debates VALUES ({', '.join('?' * len(DEBATE_COLUMNS))})", debates)
+                        conn.executemany(f"INSERT INTO analytics_turns VALUES ({', '.join('?' * len(TURN_COLUMNS))})", turns)
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"📊 Analytics export failed, {len(debates)} debates dropped: {e}")
+            self.counters["dropped_debates"] += len(debates)
+            return 0
+        self.counters["flushes"] += 1
+        self.counters["debates"] += len(debates)
+        self.counters["turns"] += len(turns)
+        return len(turns)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"buffered_turns": len(self._turns), **self.counters}
+
+
+_exporter: Optional[AnalyticsExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> AnalyticsExporter:
+    """Process-wide exporter; whatever is still buffered is written at exit."""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = AnalyticsExporter()
+            atexit.register(_exporter.flush)
+        return _exporter
+
+
+# --- Aggregates ---
+
+def _since(days: Optional[int]) -> str:
+    return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d") if days else "0000-00-00"
+
+
+def _rank(share: float, n: int) -> int:
+    """0-based offset of the nearest-rank percentile `share` among `n` sorted values."""
+    return max(0, math.ceil(share * n) - 1)
+
+
+def node_latency(conn: sqlite3.Connection, days: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Turns, p50/p95 model seconds and mean tokens per node.
+
+    Everything is read from the covering `analytics_turns_latency` index:
+    one grouped scan for the counts and means, then each percentile is a
+    seek to its rank in the node's already sorted slice.
+    """
+    since = _since(days)
+    groups = conn.execute(
+        "SELECT node, COUNT(*), AVG(input_tokens), AVG(output_tokens) FROM analytics_turns WHERE day >= ? GROUP BY node ORDER BY node",
+        (since,),
+    ).fetchall()
+    percentile = (
+        "SELECT model_seconds FROM analytics_turns INDEXED BY analytics_turns_latency "
+        "WHERE node = ? AND day >= ? ORDER BY model_seconds LIMIT 1 OFFSET ?"
+    )
+    return [
+        {
+            "node": node,
+            "turns": n,
+            "p50_seconds": round(conn.execute(percentile, (node, since, _rank(0.50, n))).fetchone()[0], 3),
+            "p95_seconds": round(conn.execute(percentile, (node, since, _rank(0.95, n))).fetchone()[0], 3),
+            "avg_input_tokens": round(inp),
+            "avg_output_tokens": round(out),
+        }
+        for node, n, inp, out in groups
+    ]
+
+
+def verdict_mix(conn: sqlite3.Connection, days: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Debates and share per verdict."""
+    rows = conn.execute(
+        "SELECT verdict, COUNT(*), COUNT(*) * 1.0 / SUM(COUNT(*)) OVER () FROM analytics_debates WHERE day >= ? GROUP BY verdict ORDER BY 2 DESC",
+        (_since(days),),
+    ).fetchall()
+    return [{"verdict": verdict, "debates": n, "share": round(share, 3)} for verdict, n, share in rows]
+
+
+def debate_summary(conn: sqlite3.Connection, days: Optional[int] = None) -> Dict[str, Any]:
+    """Debates by kind, mean rounds and tokens, p50/p95 debate seconds."""
+    since = _since(days)
+    by_kind = dict(conn.execute("SELECT kind, COUNT(*) FROM analytics_debates WHERE day >= ? GROUP BY kind", (since,)).fetchall())
+    n, avg_rounds, avg_tokens = conn.execute(
+        "SELECT COUNT(*), AVG(rounds), AVG(input_tokens + output_tokens) FROM analytics_debates WHERE day >= ?", (since,)
+    ).fetchone()
+    percentile = (
+        "SELECT seconds FROM analytics_debates INDEXED BY analytics_debates_seconds "
+        "WHERE day >= ? ORDER BY seconds LIMIT 1 OFFSET ?"
+    )
+    return {
+        "debates": by_kind,
+        "avg_rounds": round(avg_rounds or 0, 2),
+        "avg_tokens": round(avg_tokens or 0),
+        "p50_seconds": conn.execute(percentile, (since, _rank(0.50, n))).fetchone()[0] if n else None,
+        "p95_seconds": conn.execute(percentile, (since, _rank(0.95, n))).fetchone()[0] if n else None,
+    }
+
+
+def report(path: str = ANALYTICS_PATH, days: Optional[int] = None) -> Dict[str, Any]:
+    """All aggregates over the last `days` days (everything if None)."""
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.executescript(SCHEMA)
+        return {"summary": debate_summary(conn, days), "verdicts": verdict_mix(conn, days), "nodes": node_latency(conn, days)}
+    finally:
+        conn.close()
+
+
+# --- Benchmark ---
+
+def run_benchmark(turns: int = 1_000_000):
+    """Batched export throughput, then the aggregate queries over `turns` synthetic turns."""
+    import json
+    import random
+
+    path = "bench_analytics.db"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    rng = random.Random(7)
+    exporter = AnalyticsExporter(path, batch_size=4096, enabled=True)
+    nodes = {"ChiefOfStaff": "chief_of_staff", "Aria": "visionary", "Marcus": "skeptic", "TheChair": "chair"}
+    latency = {"ChiefOfStaff": 1.5, "Aria": 3.0, "Marcus": 2.0, "TheChair": 4.0}
+    start_day = time.time() - 30 * 86400
+    print(f"📊 Exporting {turns:,} synthetic turns in batches of {exporter.batch_size}")
+    start = time.perf_counter()
+    written = debate_count = 0
+    while written < turns:
+        rounds = rng.choice((1, 2, 3, 3))
+        agents = ["ChiefOfStaff"] + ["Aria", "Marcus", "TheChair"] * rounds
+        started = start_day + rng.random() * 30 * 86400
+        created = started
+        entries = []
+        for n, agent in enumerate(agents):
+            seconds = rng.lognormvariate(0, 0.5) * latency[agent]
+            created += seconds
+            verdict = "**DECISION: SUPPORT**" if rng.random() < 0.6 else "**DECISION: OPPOSE**"
+            content = verdict if agent == "TheChair" and n == len(agents) - 1 else "NEEDS_REVISION" if agent == "TheChair" else "x" * 800
+            entries.append({"agent": agent, "content": content, "timestamp": datetime.fromtimestamp(created).isoformat(),
+                            "usage": {"input_tokens": 2000 + 400 * n, "output_tokens": 150, "seconds": seconds}})
+        exporter.record(*debate_rows(f"bench-{debate_count}", f"question {debate_count % 500}", entries, started, nodes, "TheChair"))
+        written += len(agents)
+        debate_count += 1
+    exporter.flush()
+    export_seconds = time.perf_counter() - start
+    print(f"   {debate_count:,} debates, {written:,} turns in {export_seconds:.1f}s ({written / export_seconds:,.0f} turns/s)")
+
+    conn = sqlite3.connect(path)
+    try:
+        for label, query in (
+            ("node_latency (all)", lambda: node_latency(conn)),
+            ("node_latency (7 days)", lambda: node_latency(conn, 7)),
+            ("verdict_mix (all)", lambda: verdict_mix(conn)),
+            ("debate_summary (all)", lambda: debate_summary(conn)),
+        ):
+            start = time.perf_counter()
+            result = query()
+            print(f"   {label:<22} {(time.perf_counter() - start) * 1000:8.1f} ms")
+        print(json.dumps({"nodes": node_latency(conn), "verdicts": verdict_mix(conn)}, indent=2))
+    finally:
+        conn.close()
+
+
+def main():
+    import json
+
+    parser = argparse.ArgumentParser(description="Debate analytics")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_cmd = sub.add_parser("report", help="p50/p95 per node, verdict mix, debate summary")
+    report_cmd.add_argument("--days", type=int, default=None)
+    report_cmd.add_argument("--path", default=ANALYTICS_PATH)
+    bench_cmd = sub.add_parser("bench", help="Export throughput and query time at N turns")
+    bench_cmd.add_argument("--turns", type=int, default=1_000_000)
+    args = parser.parse_args()
+    if args.command == "report":
+        print(json.dumps(report(args.path, args.days), indent=2))
+    elif args.command == "bench":
+        run_benchmark(args.turns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+HTTP/JSON API for THE ROUNDTABLE
+
+An ASGI (Starlette) service in front of the shared background executor, so
+the board can run behind a load balancer:
+
+    POST   /debates               {"question": "...", "mode": "async" | "sync"}
+                                  (+ "thread_id", "follow_up": true to follow up a finished debate;
+                                  "priority": "interactive" | "batch")
+    GET    /debates/{id}          status + transcript (live job or checkpoint)
+    GET    /debates/{id}/events   Server-Sent Events, one per agent message
+    DELETE /debates/{id}          cancel a queued or running debate
+    GET    /health                liveness + queue depth
+    GET    /metrics               job counters, per-node call latencies, prompt versions, tenants
+
+Requests act for one tenant: the X-Tenant header (or "tenant" in the body or
+query string; DEFAULT_TENANT if absent). Debates of other tenants answer 404.
+The header is trusted as is, so a multi-tenant deployment sets it in the
+authenticating proxy in front of the API.
+
+Every request shares one executor (one event loop, one compiled graph, one
+checkpointer), or with API_WORKER_PROCESSES > 0 one multi-process
+`WorkerPool`. Admission control happens at submit time: when
+MAX_QUEUED_DEBATES jobs are already waiting (or the tenant's or the batch
+share of the queue is full) the API answers 503 with Retry-After instead
+of letting the queue grow without bound.
+
+Run locally (ROUNDTABLE_OFFLINE_LLM=1 swaps in the offline model for load tests):
+    python -m src.api serve [--host 127.0.0.1] [--port 8000]
+    python -m src.api loadtest [--url http://127.0.0.1:8000] [--debates 50] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Union
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from .backend import DEBATE_LATENCY_BUDGET_SECONDS, configure_logging
+from .checkpoint_maintenance import thread_info
+from .executor import DebateExecutor, QueueFullError, get_executor
+from .worker_pool import WorkerPool
+from .latency import call_metrics
+from .offline_llm import OFFLINE_LLM
+from .prompts import prompt_versions
+from .tool_runner import get_tool_runner
+from .session_memory import get_context_store, get_session_store
+from .analytics import get_exporter
+from .log_pipeline import logging_stats
+from .tenants import UnknownTenantError, get_tenants, tenant_of, validate_tenant
+
+MAX_QUESTION_CHARS = int(os.getenv("API_MAX_QUESTION_CHARS", "2000"))
+SYNC_WAIT_SECONDS = float(os.getenv("API_SYNC_WAIT_SECONDS", str(DEBATE_LATENCY_BUDGET_SECONDS + 30)))
+SSE_POLL_SECONDS = 0.25
+RETRY_AFTER_SECONDS = 5
+API_WORKER_PROCESSES = int(os.getenv("API_WORKER_PROCESSES", "0"))  # 0 = in-process executor
+
+
+def _error(status: int, message: str, **headers: str) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status, headers=headers or None)
+
+
+def _executor(request: Request) -> Union[DebateExecutor, WorkerPool]:
+    return request.app.state.executor
+
+
+def _tenant(request: Request, body: Optional[Dict[str, Any]] = None) -> str:
+    """The tenant the request acts for (raises UnknownTenantError)."""
+    tenant = request.headers.get("x-tenant") or (body or {}).get("tenant") or request.query_params.get("tenant")
+    if tenant is not None and not isinstance(tenant, str):
+        raise UnknownTenantError("'tenant' must be a string.")
+    return validate_tenant(tenant)
+
+
+def _owned(request: Request, debate_id: str) -> bool:
+    """Whether the debate belongs to the request's tenant (unknown tenants own nothing)."""
+    try:
+        return tenant_of(debate_id) == _tenant(request)
+    except UnknownTenantError:
+        return False
+
+
+async def create_debate(request: Request) -> Response:
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        return _error(400, "Body must be JSON.")
+    question = str(body.get("question", "")).strip() if isinstance(body, dict) else ""
+    mode = body.get("mode", "async") if isinstance(body, dict) else "async"
+    if not question:
+        return _error(400, "'question' is required.")
+    if len(question) > MAX_QUESTION_CHARS:
+        return _error(413, f"'question' is longer than {MAX_QUESTION_CHARS} characters.")
+    if mode not in ("async", "sync"):
+        return _error(400, "'mode' must be 'async' or 'sync'.")
+    thread_id = body.get("thread_id")
+    if thread_id is not None and not isinstance(thread_id, str):
+        return _error(400, "'thread_id' must be a string.")
+    follow_up = bool(body.get("follow_up", False))
+    if follow_up and not thread_id:
+        return _error(400, "'follow_up' needs the 'thread_id' of the debate it follows.")
+    priority = body.get("priority", "interactive")
+    if priority not in ("interactive", "batch"):
+        return _error(400, "'priority' must be 'interactive' or 'batch'.")
+    try:
+        tenant = _tenant(request, body)
+    except UnknownTenantError as e:
+        return _error(400, str(e))
+    if thread_id and tenant_of(thread_id) != tenant:
+        return _error(404, f"No debate '{thread_id}'.")
+
+    executor = _executor(request)
+    try:
+        job = executor.submit(question, thread_id, follow_up=follow_up, tenant=tenant, priority=priority)
+    except QueueFullError as e:
+        return _error(503, str(e), **{"Retry-After": str(RETRY_AFTER_SECONDS)})
+    except ValueError as e:
+        return _error(409, str(e))
+
+    if mode == "sync":
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.finished)), SYNC_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass  # Still running: fall through to the async answer
+        else:
+            return JSONResponse(job.to_dict(), status_code=200)
+
+    return JSONResponse(
+        {**job.to_dict(include_messages=False), "links": _links(job.job_id)},
+        status_code=202,
+        headers={"Location": f"/debates/{job.job_id}"},
+    )
+
+
+def _links(debate_id: str) -> Dict[str, str]:
+    return {"self": f"/debates/{debate_id}", "events": f"/debates/{debate_id}/events"}
+
+
+async def get_debate(request: Request) -> Response:
+    debate_id = request.path_params["debate_id"]
+    if not _owned(request, debate_id):
+        return _error(404, f"No debate '{debate_id}'.")
+    executor = _executor(request)
+    job = executor.get(debate_id)
+    if job is not None:
+        return JSONResponse(job.to_dict())
+
+    # Not in memory (finished long ago, or run by another process): read the checkpoint
+    info = await asyncio.to_thread(thread_info, executor.db_path, debate_id)
+    if info is None:
+        return _error(404, f"No debate '{debate_id}'.")
+    messages = await asyncio.wrap_future(executor.replay(debate_id))
+    return JSONResponse({
+        "id": debate_id,
+        "question": info["question"],
+        "tenant": tenant_of(debate_id),
+        "status": info["status"],
+        "error": None,
+        "created_at": info["created_at"],
+        "finished_at": info["finished_at"],
+        "messages": [dict(entry) for entry in messages],
+    })
+
+
+async def debate_events(request: Request) -> Response:
+    debate_id = request.path_params["debate_id"]
+    job = _executor(request).get(debate_id) if _owned(request, debate_id) else None
+    if job is None:
+        return _error(404, f"No running debate '{debate_id}'; GET /debates/{debate_id} for its transcript.")
+
+    async def stream():
+        sent = 0
+        while True:
+            messages = job.snapshot()
+            for entry in messages[sent:]:
+                yield f"event: message\ndata: {json.dumps(dict(entry))}\n\n"
+            sent = len(messages)
+            if job.done and sent == len(job.snapshot()):
+                yield f"event: end\ndata: {json.dumps({'status': job.status, 'error': job.error})}\n\n"
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def cancel_debate(request: Request) -> Response:
+    debate_id = request.path_params["debate_id"]
+    if not _owned(request, debate_id) or not _executor(request).cancel(debate_id):
+        return _error(404, f"No queued or running debate '{debate_id}'.")
+    return JSONResponse({"id": debate_id, "status": "cancelling"}, status_code=202)
+
+
+async def health(request: Request) -> Response:
+    return JSONResponse({"status": "ok", "offline_llm": OFFLINE_LLM, **_executor(request).stats()})
+
+
+async def metrics(request: Request) -> Response:
+    return JSONResponse({"executor": _executor(request).stats(), "calls": call_metrics(), "prompts": prompt_versions(), "tenants": get_tenants().stats(), "tools": get_tool_runner().stats(), "sessions": get_session_store().stats(), "workspace_contexts": get_context_store().stats(), "analytics": get_exporter().stats(), "logging": logging_stats()})
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    if API_WORKER_PROCESSES > 0:
+        # Worker-pool mode: debates run in separate processes, checkpoints via one writer
+        pool = WorkerPool(workers=API_WORKER_PROCESSES)
+        await asyncio.to_thread(pool.wait_until_ready)
+        app.state.executor = pool
+        yield
+        await asyncio.to_thread(pool.shutdown)
+    else:
+        app.state.executor = get_executor()
+        yield
+
+
+def create_app() -> Starlette:
+    return Starlette(
+        routes=[
+            Route("/debates", create_debate, methods=["POST"]),
+            Route("/debates/{debate_id}", get_debate, methods=["GET"]),
+            Route("/debates/{debate_id}", cancel_debate, methods=["DELETE"]),
+            Route("/debates/{debate_id}/events", debate_events, methods=["GET"]),
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+app = create_app()
+
+
+# --- Load test ---
+
+async def _load_test(url: str, debates: int, concurrency: int, mode: str) -> Dict[str, Any]:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+
+    async def one(client: httpx.AsyncClient, i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/debates", json={"question": f"Should I take a sabbatical? (load {i})", "mode": mode})
+            if response.status_code == 202 and mode == "async":
+                # Follow the SSE stream to the end, like a browser would
+                async with client.stream("GET", f"/debates/{response.json()['id']}/events") as events:
+                    async for _ in events.aiter_lines():
+                        pass
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=url, timeout=None) as client:
+        await asyncio.gather(*(one(client, i) for i in range(debates)))
+        server_metrics = (await client.get("/metrics")).json()
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    return {
+        "debates": debates,
+        "concurrency": concurrency,
+        "statuses": statuses,
+        "seconds": round(elapsed, 2),
+        "debates_per_second": round(debates / elapsed, 2),
+        "p50_seconds": round(ordered[len(ordered) // 2], 3),
+        "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "executor": server_metrics["executor"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="THE ROUNDTABLE HTTP API")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = sub.add_parser("serve", help="Run the API with uvicorn")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8000)
+    load_cmd = sub.add_parser("loadtest", help="Drive a running API with concurrent debates")
+    load_cmd.add_argument("--url", default="http://127.0.0.1:8000")
+    load_cmd.add_argument("--debates", type=int, default=50)
+    load_cmd.add_argument("--concurrency", type=int, default=10)
+    load_cmd.add_argument("--mode", choices=("async", "sync"), default="async")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        import uvicorn
+        configure_logging()
+        uvicorn.run(app, host=args.host, port=args.port)
+    elif args.command == "loadtest":
+        print(json.dumps(asyncio.run(_load_test(args.url, args.debates, args.concurrency, args.mode)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
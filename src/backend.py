@@ -6,51 +6,82 @@ Simplified version for testing without requiring real API credentials.
 
 import asyncio
 import os
-from typing import Annotated, TypedDict, List, Any, Literal, Dict
+import sys
+import threading
+import time
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Annotated, TypedDict, List, Any, Literal, Dict, Optional, Callable, Tuple
 from datetime import datetime
 
-# Mock data
-from .mock_data import mock_data
+from .panel import PanelConfig, PanelistConfig, MIN_ROUND_SECONDS, panel_semaphore, next_round_deadline
+from .latency import DEBATE_LATENCY_BUDGET_SECONDS, hedged_call, with_deadline, remaining_time, call_metrics
+from .validation import VALIDATION_MAX_ATTEMPTS, ResponseRules, check_response, leading_marker, stream_response
+from .checkpoint_maintenance import schedule_maintenance
+from .delta_checkpoint import DeltaSqliteSaver
+from .offline_llm import OFFLINE_LLM, OfflineChatModel
+from .prompts import PromptTemplate, prompts
+from .research_cache import ResearchCache
+from .tool_runner import get_tool_runner
+from .session_memory import TranscriptEntry, get_context_store
+from .analytics import debate_rows, get_exporter
+from .profiling import profiled, profiling
+from .log_pipeline import configure_logging, log_context, logged_node  # configure_logging: re-exported for the entry points
+from .budget import finish_budget, merge_budget, metered, new_budget, record_usage, should_close, turn_output_tokens, usage_summary
+from .context_selector import CHAIR_CONTEXT_TOKEN_BUDGET, CONTEXT_TOKEN_BUDGET
+from .tenants import current_tenant, get_tenants, tenant_of, tenant_scope, tenant_thread_id
+from .prefix_cache import (
+    PREFIX_CACHE_DEBATE_TTL_SECONDS, PREFIX_CACHE_INSTRUCTION_TTL_SECONDS,
+    GeminiPrefixStore, LocalPrefixStore, PrefixCache,
+)
 
 # Core LangGraph and LangChain imports
 from langgraph.graph import StateGraph, END, START
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langgraph.types import Command
+from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 
 # Retry logic
 from tenacity import (
     retry,
     stop_after_attempt,
     wait_random_exponential,
-    retry_if_exception_type,
+    retry_if_exception,
 )
-import google.api_core.exceptions
 
 # Utilities
 from dotenv import load_dotenv
 import logging
 import json
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
 load_dotenv()
 
 # Configuration
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+NOTION_API_KEY = os.getenv("NOTION_API_KEY") or os.getenv("NOTION_TOKEN")
 MAX_DEBATE_ROUNDS = int(os.getenv("MAX_DEBATE_ROUNDS", "3"))
-DB_PATH = "roundtable_demo.db"
+DB_PATH = os.getenv("ROUNDTABLE_DB_PATH", "roundtable_demo.db")  # Also the maintenance CLI's default
 THREAD_ID = "demo_session"
 
 DEFAULT_MODEL = "gemini-2.0-flash-lite"
 TEMPERATURE_CREATIVE = 0.9  # Lowered from 1.0 to prevent empty responses
 TEMPERATURE_BALANCED = 0.7
 TEMPERATURE_ANALYTICAL = 0.3
-MAX_TOKENS = 2048  # Prevent infinite repetition
+MAX_TOKENS = 2048  # Largest answer a turn may produce; the budget governor sizes each turn below it
+# Marcus's read-only fact-checking tools, bound when a Notion workspace is configured
+SKEPTIC_TOOLS = ("notion_search", "notion_read_page", "calendar_list_events") if NOTION_API_KEY else ()
 MAX_DEBATE_ROUNDS = int(os.getenv("MAX_DEBATE_ROUNDS", "3"))  # Limit debate rounds
+CHAIR_MIN_SECONDS = float(os.getenv("CHAIR_MIN_SECONDS", "15"))  # Chair's floor once the latency budget is spent
+FOLLOW_UP_ROUNDS = int(os.getenv("FOLLOW_UP_ROUNDS", "1"))  # Rounds a follow-up question may run
+FOLLOW_UP_CONTEXT_TTL_SECONDS = float(os.getenv("FOLLOW_UP_CONTEXT_TTL_SECONDS", "900"))  # Context a follow-up may reuse
+FOLLOW_UP_VERDICT_CHARS = 600  # Length of each earlier verdict in a follow-up's summary
+FOLLOW_UP_MAX_VERDICTS = 3  # Earlier questions a follow-up remembers
 
 # Agent Instructions
 CHIEF_OF_STAFF_INSTRUCTION = """You are the Chief of Staff for THE ROUNDTABLE.
@@ -168,31 +199,240 @@ If you want to support your friend:
 
 Remember: Protecting the user's financial security is more important than being optimistic."""
 
+# Prompt templates: parsed once and versioned (see src/prompts.py)
+DECISION_PROMPT = prompts.register("chief_of_staff.decide", """You are the Chief of Staff analyzing this question: "{question}"
+
+Determine if this question requires CURRENT EXTERNAL DATA from the web.
+
+Examples that NEED web search:
+- "Should I buy a BMW M3?" → YES (need current price, reviews)
+- "What movie should I watch?" → YES (need latest releases, ratings)
+- "Is now a good time to buy a house?" → YES (need market rates, trends)
+- "Should I invest in Tesla stock?" → YES (need current stock data)
+
+Examples that DON'T need web search:
+- "Should I take a sabbatical next year?" → NO (use calendar/project data)
+- "Can I finish my project on time?" → NO (use internal task data)
+- "Should I attend the networking event?" → NO (use calendar data)
+
+Respond with ONLY one word: "YES" or "NO"
+""")
+
+SEARCH_PROMPT = prompts.register("chief_of_staff.search", """You are a research assistant. The user asked: "{question}"
+
+Search the web for relevant information. Provide:
+1. Current pricing/costs if asking about purchases
+2. Latest releases/reviews if asking about movies/products  
+3. Market data if asking about investments/real estate
+4. Any other current, factual information
+
+Format your response as:
+**Web Search Results:**
+[Summary of findings with specific numbers/dates/sources]""")
+
+# `web_section` is "" or the search results framed by blank lines
+CONTEXT_REPORT_PROMPT = prompts.register("chief_of_staff.report", """📊 **Context Report from Chief of Staff**
+
+**User Question:** {question}
+
+{web_section}
+**Internal Data:**
+- **Projects Found:** {project_count} active projects
+- High Priority: {high_priority_count} projects
+- Total Budget: ${total_budget:,}
+
+**Upcoming Events:** {event_count} events in next 30 days
+- Critical deadlines: {critical_count}
+- Meetings: {meeting_count}
+
+**Notion Search:** {search_total} relevant items found
+
+This data is now available for analysis.""")
+
+CHAIR_EVIDENCE_PROMPT = prompts.register("chair.evidence", """
+**WORKSPACE RECORDS RELEVANT TO THIS ROUND** (cite them by `source`):
+{records}
+""")
+
+CHAIR_STATUS_PROMPT = prompts.register("chair.status", """
+**DEBATE STATUS:**
+- Current Round: {current_round} of {max_rounds}
+
+{final_round_warning}
+
+Review the debate. Decide:
+- **OPPOSE**: If the idea is reckless, risky, or unfeasible
+- **SUPPORT**: If the idea is viable (with conditions)
+- **NEEDS_REVISION**: If you need more information (only if NOT final round)
+
+Remember your instruction: Protect the user from financial ruin.
+""")
+FINAL_ROUND_WARNING = "⚠️  FINAL ROUND - You MUST produce a final decision (SUPPORT or OPPOSE) NOW."
+
+FOLLOW_UP_PROMPT = prompts.register("followup.summary", """
+**EARLIER QUESTIONS IN THIS SESSION** (the board's verdicts, condensed):
+{verdicts}
+
+The user is now asking a follow-up. Build on these verdicts instead of starting over.
+""")
+
+REGENERATE_PROMPT = prompts.register(
+    "validation.regenerate",
+    "Your previous answer was rejected because {problem}. Answer again in full, following your instructions exactly.",
+)
+
+# Board Configuration
+# Aria opens each round; Marcus critiques her proposal against the data;
+# the Chair rules once both have spoken. Extra panelists with no `after`
+# dependency run in parallel with Aria.
+DEFAULT_PANEL = PanelConfig(
+    panelists=(
+        # Aria (Visionary): bold, opportunity-focused proposals at high temperature
+        PanelistConfig(
+            node="visionary",
+            name="Aria",
+            title="Visionary",
+            icon="🚀",
+            instruction=ARIA_INSTRUCTION,
+            temperature=TEMPERATURE_CREATIVE,
+            model=DEFAULT_MODEL,
+            turn_prompt="Aria, based on the context above about '{question}', provide your bold, visionary proposal. Be specific and detailed.",
+            default_stance="I believe we should pursue this opportunity with ambition and confidence. The potential benefits outweigh the risks, and with proper planning, this can be a transformative decision.",
+        ),
+        # Marcus (Skeptic): checks the proposal against projects and calendar data
+        PanelistConfig(
+            node="skeptic",
+            name="Marcus",
+            title="Skeptic",
+            icon="🔍",
+            instruction=MARCUS_INSTRUCTION,
+            temperature=TEMPERATURE_ANALYTICAL,
+            model=DEFAULT_MODEL,
+            turn_prompt="""
+**GROUND TRUTH DATA FOR ANALYSIS:**
+
+Each record is tagged with its `source`; cite it when you rely on it.
+
+Projects:
+{projects}
+
+Tasks:
+{tasks}
+
+Calendar Events (next 30 days):
+{calendar_events}
+
+Notes:
+{notes}
+
+Use this REAL data to validate Aria's proposal above.
+""",
+            ground_truth=True,
+            tools=SKEPTIC_TOOLS,
+            after=("visionary",),
+            default_stance="I could not verify this plan against your data in time. Until the budget, deadlines and calendar commitments are checked, treat it as unvalidated and proceed cautiously.",
+        ),
+    ),
+    # The Chair (Moderator): synthesizes the round and issues the verdict
+    chair=PanelistConfig(
+        node="chair",
+        name="TheChair",
+        title="The Chair",
+        icon="⚖️",
+        instruction=CHAIR_INSTRUCTION,
+        temperature=TEMPERATURE_BALANCED,
+        model=DEFAULT_MODEL,
+        rules=ResponseRules(required_markers=("DECISION: SUPPORT", "DECISION: OPPOSE", "NEEDS_REVISION")),
+    ),
+)
+
+# Validation rule for the Chief of Staff's one-word web-search decision
+DECISION_RULES = ResponseRules(min_length=2, required_markers=("YES", "NO"), markers_lead=True, check_repetition=False)
+
 # Retry decorator
 def log_retry_callback(retry_state):
     wait_time = retry_state.next_action.sleep
     logger.warning(f"⏳ Rate limit hit. Cooling down for {wait_time:.1f}s...")
-    print(f"\n⚠️  Rate limit hit. Cooling down for {wait_time:.1f}s...\n", flush=True)
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether a model call failed on quota/availability (and is worth retrying)."""
+    import google.api_core.exceptions  # Deferred: only needed once a call has failed
+
+    return isinstance(error, (
+        google.api_core.exceptions.ResourceExhausted,
+        google.api_core.exceptions.ServiceUnavailable,
+    ))
 
 retry_decorator = retry(
     wait=wait_random_exponential(min=2, max=60),
     stop=stop_after_attempt(10),
-    retry=retry_if_exception_type((
-        google.api_core.exceptions.ResourceExhausted,
-        google.api_core.exceptions.ServiceUnavailable,
-    )),
+    retry=retry_if_exception(is_rate_limited),
     before_sleep=log_retry_callback,
 )
 
 # State Definition
 class BoardState(TypedDict):
     messages: Annotated[List, add_messages]
-    context_data: Dict[str, Any]
+    context_data: Dict[str, Any]  # Per-debate context; workspace records by reference (see `debate_context`)
     round_count: int
     status: Literal["gathering", "debating", "approved", "max_rounds"]
+    round_deadline: float  # Epoch seconds by which the round's panelists must report
+    debate_deadline: float  # Epoch seconds by which the whole debate must finish
+    budget: Annotated[Dict[str, Any], merge_budget]  # Tokens and model time spent so far (see src/budget.py)
+    max_rounds: int  # Rounds this question may run (MAX_DEBATE_ROUNDS, or FOLLOW_UP_ROUNDS for a follow-up)
+    earlier_verdicts: List[str]  # Condensed verdicts of earlier questions on this thread
+
+async def debate_context(state: Dict[str, Any]) -> Dict[str, Any]:
+    """The Chief of Staff's context with the shared workspace records it references filled in."""
+    context = state.get("context_data") or {}
+    ref = context.get("workspace_ref")
+    if not ref:
+        return context  # Checkpoints from before records were shared carry them inline
+    store = get_context_store()
+    records = store.get(ref)
+    if records is None:
+        records = await asyncio.to_thread(store.load, ref) or {}
+    return {**records, **context}
+
+def round_limit(state: Dict[str, Any]) -> int:
+    """Rounds the current question may run."""
+    return state.get("max_rounds") or MAX_DEBATE_ROUNDS
+
+def current_question(state: Dict[str, Any]) -> str:
+    """The question being debated: the latest user message on the thread."""
+    return next((m.content for m in reversed(state.get("messages", [])) if isinstance(m, HumanMessage)), "")
+
+def debate_messages(state: Dict[str, Any]) -> List[Any]:
+    """
+    The history agents see for the current question.
+    
+    On a follow-up, earlier debates on the thread are replaced by their
+    condensed verdicts; the last context report is kept when the Chief of
+    Staff did not run again, so the stable prompt prefix is unchanged.
+    """
+    messages = state["messages"]
+    start = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+    if start == 0:
+        return messages
+    current = messages[start:]
+    earlier = []
+    if not any(getattr(m, "name", None) == "ChiefOfStaff" for m in current):
+        report = next((m for m in reversed(messages[:start]) if getattr(m, "name", None) == "ChiefOfStaff"), None)
+        if report is not None:
+            earlier.append(report)
+    if state.get("earlier_verdicts"):
+        earlier.append(FOLLOW_UP_PROMPT.human(verdicts="\n".join(state["earlier_verdicts"])))
+    return [*earlier, *current]
 
 # Agent Nodes
-async def chief_of_staff_node(state: BoardState) -> BoardState:
+async def chief_of_staff_node(state: BoardState) -> Dict[str, Any]:
+    with metered() as meter:
+        update = await _gather_context(state)
+    if update:
+        update["budget"] = meter.as_update()
+    return update
+
+async def _gather_context(state: BoardState) -> Dict[str, Any]:
     """
     Chief of Staff Agent: Context Gathering & Intelligence
     
@@ -209,49 +449,27 @@ async def chief_of_staff_node(state: BoardState) -> BoardState:
         state: Current BoardState with user messages and metadata
         
     Returns:
-        Updated state with context_data populated and context report added to messages
+        State update with context_data populated and the context report message
     """
     logger.info("👔 Chief of Staff gathering context...")
     
     user_messages = [msg for msg in state["messages"] if isinstance(msg, HumanMessage)]
     if not user_messages:
-        return state
+        return {}
     
     latest_question = user_messages[-1].content
     
     # Let the LLM decide if web search is needed (intelligent, not hardcoded)
     logger.info("🤔 Chief of Staff analyzing if web search is needed...")
-    decision_llm = ChatGoogleGenerativeAI(
-        model=DEFAULT_MODEL,
-        temperature=0.1,
-        google_api_key=GOOGLE_API_KEY
-    )
-    
-    decision_prompt = f"""You are the Chief of Staff analyzing this question: "{latest_question}"
-
-Determine if this question requires CURRENT EXTERNAL DATA from the web.
-
-Examples that NEED web search:
-- "Should I buy a BMW M3?" → YES (need current price, reviews)
-- "What movie should I watch?" → YES (need latest releases, ratings)
-- "Is now a good time to buy a house?" → YES (need market rates, trends)
-- "Should I invest in Tesla stock?" → YES (need current stock data)
-
-Examples that DON'T need web search:
-- "Should I take a sabbatical next year?" → NO (use calendar/project data)
-- "Can I finish my project on time?" → NO (use internal task data)
-- "Should I attend the networking event?" → NO (use calendar data)
-
-Respond with ONLY one word: "YES" or "NO"
-"""
-
-    @retry_decorator
-    async def decide_search():
-        return await decision_llm.ainvoke([HumanMessage(content=decision_prompt)])
+    decision_llm = make_llm(DEFAULT_MODEL, temperature=0.1)
     
     try:
-        decision_response = await decide_search()
-        needs_web_search = "YES" in decision_response.content.upper()
+        decision_text, _ = await with_deadline(
+            generate_validated(decision_llm, [DECISION_PROMPT.human(question=latest_question)], DECISION_RULES, "chief_of_staff.decide"),
+            "chief_of_staff.decide",
+            remaining_time(state.get("debate_deadline"))
+        )
+        needs_web_search = leading_marker(decision_text, DECISION_RULES.required_markers) == "YES"
         logger.info(f"🔍 Web search needed: {needs_web_search}")
     except Exception as e:
         logger.error(f"Decision failed, defaulting to no web search: {e}")
@@ -262,212 +480,413 @@ Respond with ONLY one word: "YES" or "NO"
         # Use LLM to perform web search via Google
         logger.info("🌐 Performing web search for external data...")
         try:
-            search_llm = ChatGoogleGenerativeAI(
-                model=DEFAULT_MODEL,
-                temperature=0.1,
-                google_api_key=GOOGLE_API_KEY
-            )
+            search_llm = make_llm(DEFAULT_MODEL, temperature=0.1)
             
-            search_prompt = f"""You are a research assistant. The user asked: "{latest_question}"
-
-Search the web for relevant information. Provide:
-1. Current pricing/costs if asking about purchases
-2. Latest releases/reviews if asking about movies/products  
-3. Market data if asking about investments/real estate
-4. Any other current, factual information
-
-Format your response as:
-**Web Search Results:**
-[Summary of findings with specific numbers/dates/sources]"""
-
-            @retry_decorator
-            async def get_web_data():
-                return await search_llm.ainvoke([HumanMessage(content=search_prompt)])
+            async def search() -> str:
+                search_text, problem = await with_deadline(
+                    generate_validated(search_llm, [SEARCH_PROMPT.human(question=latest_question)], ResponseRules(), "chief_of_staff.search"),
+                    "chief_of_staff.search",
+                    remaining_time(state.get("debate_deadline"))
+                )
+                if problem and not search_text.strip():
+                    raise ValueError(f"no usable search results: {problem}")
+                return search_text
             
-            search_response = await get_web_data()
-            web_search_results = search_response.content
+            # Served from the topic-keyed research cache when the topic was searched recently
+            web_search_results = await get_research_cache().research(latest_question, search)
             
         except Exception as e:
             logger.error(f"Web search failed: {e}")
             web_search_results = "**Web Search:** Could not retrieve external data. Using internal records only."
     
-    # Fetch mock data
-    search_results = mock_data.search(latest_question)
-    calendar_events = mock_data.get_calendar_events(days_ahead=30)
-    all_projects = mock_data.get_all_projects()
-    all_tasks = mock_data.get_all_tasks()
-    
+    # Workspace context: reused from the last debate, with only the edits since applied
+    tenant = current_tenant()
+    snapshot = await asyncio.to_thread(tenant.context_service.current)
+    workspace = tenant.workspace
+    search_results = workspace.search(latest_question)
+    
+    # Workspace records are stored once per distinct content; the state only references them
+    workspace_ref = await asyncio.to_thread(get_context_store().put, {
+        "calendar_events": snapshot.calendar,
+        "projects": snapshot.project_list,
+        "tasks": snapshot.task_list,
+        "notes": workspace.notes,
+    })
+    # This tenant's caches just grew: keep all tenants' caches under the process cap
+    await asyncio.to_thread(get_tenants().enforce)
     context_data = {
+        "workspace_ref": workspace_ref,
         "search_results": search_results,
-        "calendar_events": calendar_events,
-        "projects": all_projects,
-        "tasks": all_tasks,
         "web_search": web_search_results,
+        "revision": snapshot.revision,
         "timestamp": datetime.now().isoformat()
     }
     
-    # Create summary
-    summary_parts = [
-        "📊 **Context Report from Chief of Staff**\n",
-        f"**User Question:** {latest_question}\n"
-    ]
-    
-    if web_search_results:
-        summary_parts.append(f"\n{web_search_results}\n")
-    
-    summary_parts.append(f"""
-**Internal Data:**
-- **Projects Found:** {len(all_projects)} active projects
-- High Priority: {len([p for p in all_projects if p.get('priority') == 'High'])} projects
-- Total Budget: ${sum([int(p.get('budget', '$0').replace('$', '').replace(',', '')) for p in all_projects if p.get('budget')]):,}
-
-**Upcoming Events:** {len(calendar_events['events'])} events in next 30 days
-- Critical deadlines: {len([e for e in calendar_events['events'] if e.get('priority') == 'Critical'])}
-- Meetings: {len([e for e in calendar_events['events'] if e.get('type') == 'Meeting'])}
-
-**Notion Search:** {search_results['total']} relevant items found
-
-This data is now available for analysis.""")
-    
-    summary = "\n".join(summary_parts)
-    
-    state["context_data"] = context_data
-    state["messages"].append(AIMessage(content=summary, name="ChiefOfStaff"))
+    # Create summary (figures precomputed with the snapshot)
+    summary = CONTEXT_REPORT_PROMPT.render(
+        question=latest_question,
+        web_section=f"\n{web_search_results}\n\n" if web_search_results else "",
+        **snapshot.stats,
+        search_total=search_results['total'],
+    )
     
-    return state
+    return {
+        "context_data": context_data,
+        "messages": [AIMessage(content=summary, name="ChiefOfStaff")],
+        "status": "debating",
+    }
 
-async def visionary_node(state: BoardState) -> BoardState:
+async def generate_validated(llm, messages: List[Any], rules: ResponseRules, key: str):
     """
-    Aria (Visionary Agent): Optimistic Proposal Generation
+    Generate an answer that passes `rules`, regenerating a bounded number of times.
     
-    Persona: Bold, creative, opportunity-focused
-    Temperature: 0.9 (creative) for diverse, ambitious thinking
-    
-    This agent reviews the context from Chief of Staff and proposes the most
-    ambitious, upside-focused solution. Designed to counterbalance Marcus's
-    risk-aversion by highlighting potential benefits and opportunities.
-    
-    Error Handling: If response is empty/too short, retries with simplified prompt
-    to ensure debate can continue even if LLM fails initially.
+    Each attempt streams the answer (so a repetition loop is cut off early),
+    goes through the rate-limit retry policy and, when enabled, hedging.
+    A rejected answer is regenerated with the rejection reason appended to
+    the original prompt, up to VALIDATION_MAX_ATTEMPTS attempts in total.
     
     Args:
-        state: BoardState containing user question and context data
+        llm: Chat model for the agent
+        messages: Full prompt (system instruction, history, turn prompt)
+        rules: Validation rules for this agent
+        key: Metrics/log key (usually the node name)
         
     Returns:
-        Updated state with Aria's proposal added to message history
+        (text, problem) where problem is None if the answer is valid, otherwise
+        the reason the last attempt was rejected (text is the longest attempt)
     """
-    logger.info("🚀 Aria (Visionary) crafting proposal...")
-    
-    llm = ChatGoogleGenerativeAI(
-        model=DEFAULT_MODEL,
-        temperature=TEMPERATURE_CREATIVE,
-        google_api_key=GOOGLE_API_KEY,
-        max_output_tokens=MAX_TOKENS
-    )
-    
-    # Add explicit prompt to prevent empty responses
-    user_question = next((msg.content for msg in state["messages"] if isinstance(msg, HumanMessage)), "")
-    
-    messages_with_system = [
-        SystemMessage(content=ARIA_INSTRUCTION),
-        *state["messages"],
-        HumanMessage(content=f"Aria, based on the context above about '{user_question}', provide your bold, visionary proposal. Be specific and detailed.")
-    ]
-    
     @retry_decorator
-    async def invoke_aria():
-        return await llm.ainvoke(messages_with_system)
-    
-    try:
-        response = await invoke_aria()
-        
-        # Check if response is empty and retry with different approach
-        if not response.content or len(response.content.strip()) < 50:
-            logger.warning("⚠️ Aria gave empty/short response, retrying with simpler prompt...")
-            simple_prompt = [
-                SystemMessage(content="You are Aria, an optimistic visionary. Provide a bold, detailed proposal for the user's question."),
-                HumanMessage(content=f"Question: {user_question}\n\nProvide your ambitious, detailed proposal (minimum 200 words):")
-            ]
-            response = await llm.ainvoke(simple_prompt)
-        
-        state["messages"].append(AIMessage(content=response.content, name="Aria"))
-    except Exception as e:
-        logger.error(f"Aria failed to respond: {e}")
-        # Add a default response so debate can continue
-        default_response = f"I believe we should pursue this opportunity with ambition and confidence. The potential benefits outweigh the risks, and with proper planning, this can be a transformative decision."
-        state["messages"].append(AIMessage(content=default_response, name="Aria"))
-    
-    state["status"] = "debating"
-    
-    return state
-
-async def skeptic_node(state: BoardState) -> BoardState:
+    async def attempt(prompt):
+        return await hedged_call(lambda: stream_response(llm, prompt, rules.check_repetition), key=key)
+    
+    prompt = list(messages)
+    best, problem = "", "no answer was generated"
+    for attempt_number in range(1, VALIDATION_MAX_ATTEMPTS + 1):
+        streamed = await attempt(prompt)
+        if streamed.degenerate:
+            problem = "the answer repeated the same passage over and over"
+            logger.warning(f"🔁 {key} looped; generation cancelled early")
+        else:
+            problem = check_response(streamed.text, rules)
+        if problem is None:
+            return streamed.text, None
+        if len(streamed.text.strip()) > len(best.strip()):
+            best = streamed.text
+        logger.warning(f"⚠️ {key} answer rejected ({problem}), attempt {attempt_number}/{VALIDATION_MAX_ATTEMPTS}")
+        prompt = [*messages, REGENERATE_PROMPT.human(problem=problem)]
+    return best, problem
+
+# Panel Nodes
+@lru_cache(maxsize=None)
+def _resolve_tools(names: Tuple[str, ...]) -> Dict[str, Any]:
+    """Look up tool objects from `src.tools` by name (imported lazily, once per tool set)."""
+    if not names:
+        return {}
+    from . import tools as tool_module
+    return {name: getattr(tool_module, name) for name in names}
+
+# Tool-bound models, per event loop: binding converts every tool schema, so it is done once
+_bound_models: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Any, Any]]" = weakref.WeakKeyDictionary()
+
+def make_llm(model: str, temperature: float, max_output_tokens: int = None, tools=(), cached_content: Optional[str] = None, tool_choice: Optional[str] = None):
     """
-    Marcus (Skeptic Agent): Data-Driven Critique
+    Build a chat model for one agent turn.
     
-    Persona: Analytical, risk-aware, constructive critic
-    Temperature: 0.3 (analytical) for focused, logical analysis
+    Uses the deterministic offline stand-in when ROUNDTABLE_OFFLINE_LLM is set,
+    so benchmarks and load tests run the real graph without credentials.
     
-    This agent reviews Aria's proposal against REAL data from the context:
-    - Calendar conflicts and time commitments
-    - Budget constraints from project data
-    - Existing deadlines and priorities
+    Args:
+        model: Gemini model name
+        temperature: Sampling temperature
+        max_output_tokens: Output cap (None for the provider default)
+        tools: Tool names from `src.tools` to bind to the model
+        cached_content: Prefix-cache name the prompt continues (see `agent_prompt`)
+        tool_choice: Passed to `bind_tools` ("none" forces a text answer)
+        
+    Returns:
+        Chat model (with tools bound if any were requested)
+    """
+    if OFFLINE_LLM:
+        prefix = get_prefix_cache().store.contents(cached_content) if cached_content else []
+        return OfflineChatModel(model=model, temperature=temperature, max_output_tokens=max_output_tokens, cached_prefix=prefix)
+    tools = tuple(tools)
+    bound_key = (model, temperature, max_output_tokens, tools, tool_choice)
+    if tools and not cached_content:
+        try:
+            bound = _bound_models.setdefault(asyncio.get_running_loop(), {})
+        except RuntimeError:  # No running loop: build a fresh one
+            bound = {}
+        if bound_key in bound:
+            return bound[bound_key]
+    kwargs = {"model": model, "temperature": temperature, "google_api_key": GOOGLE_API_KEY}
+    if max_output_tokens:
+        kwargs["max_output_tokens"] = max_output_tokens
+    if cached_content:
+        kwargs["cached_content"] = cached_content
+    from langchain_google_genai import ChatGoogleGenerativeAI  # Deferred: ~0.4s to import
+
+    llm = ChatGoogleGenerativeAI(**kwargs)
+    if tools:
+        llm = llm.bind_tools(list(_resolve_tools(tools).values()), tool_choice=tool_choice)
+        if not cached_content:
+            bound[bound_key] = llm
+    return llm
+
+_research_cache: Optional[ResearchCache] = None
+
+def get_research_cache() -> ResearchCache:
+    """Process-wide web-search cache, keyed by the search prompt's version."""
+    global _research_cache
+    if _research_cache is None:
+        _research_cache = ResearchCache(version=SEARCH_PROMPT.version)
+    return _research_cache
+
+_prefix_cache: Optional[PrefixCache] = None
+
+def get_prefix_cache() -> PrefixCache:
+    """Process-wide prompt-prefix cache (in-memory store for the offline model)."""
+    global _prefix_cache
+    if _prefix_cache is None:
+        _prefix_cache = PrefixCache(LocalPrefixStore() if OFFLINE_LLM else GeminiPrefixStore(GOOGLE_API_KEY))
+    return _prefix_cache
+
+async def agent_prompt(agent: PanelistConfig, messages: List[Any], max_output_tokens: int = MAX_TOKENS):
+    """
+    Build an agent's model and the prompt to send it, serving the stable
+    prefix from the prefix cache when it is large enough.
     
-    Design: Provides constructive criticism (not brutal rejection) by explaining
-    WHY risks exist and WHAT could be improved. Balances Aria's optimism with
-    pragmatic reality-checking.
+    The stable prefix is the instruction plus everything up to the Chief of
+    Staff's context report; it is identical in every round of a debate. The
+    instruction alone is the fallback (shared by all debates).
     
     Args:
-        state: BoardState with Aria's proposal and context data
+        agent: Panelist or Chair config
+        messages: Full prompt, starting with the agent's SystemMessage
+        max_output_tokens: Output cap for this turn (see `turn_budget`)
         
     Returns:
-        Updated state with Marcus's critique added to messages
+        (llm, prompt) where prompt may be only the suffix after the cached prefix
     """
-    logger.info("🔍 Marcus (Skeptic) analyzing proposal...")
-    
-    llm = ChatGoogleGenerativeAI(
-        model=DEFAULT_MODEL,
-        temperature=TEMPERATURE_ANALYTICAL,
-        google_api_key=GOOGLE_API_KEY,
-        max_output_tokens=MAX_TOKENS  # Prevent infinite repetition
+    cached_content, prompt = None, messages
+    if not agent.tools:
+        report = next((i for i, m in enumerate(messages) if getattr(m, "name", None) == "ChiefOfStaff"), None)
+        candidates = [(1, PREFIX_CACHE_INSTRUCTION_TTL_SECONDS)]
+        if report is not None:
+            candidates.insert(0, (report + 1, PREFIX_CACHE_DEBATE_TTL_SECONDS))
+        cached_content, prompt = await get_prefix_cache().split(agent.model, messages, candidates)
+    return make_llm(agent.model, agent.temperature, max_output_tokens, agent.tools, cached_content), prompt
+
+_instructions: Dict[Tuple[str, str], PromptTemplate] = {}
+
+def agent_instruction(agent: PanelistConfig) -> PromptTemplate:
+    """The agent's persona instruction as a registered, pre-rendered prompt."""
+    key = (agent.node, agent.instruction)
+    template = _instructions.get(key)
+    if template is None:
+        template = _instructions[key] = prompts.register_static(f"{agent.node}.instruction", agent.instruction)
+    return template
+
+def _ground_truth_fields(context: Dict[str, Any], question: str, turn: str) -> Dict[str, str]:
+    """Workspace records most relevant to the question and turn, packed into the token budget."""
+    selection = current_tenant().selector.select(context, question, turn, CONTEXT_TOKEN_BUDGET)
+    logger.info(f"🧭 Selected {len(selection.items)}/{selection.candidates} records ({selection.tokens} tokens): {', '.join(selection.sources)}")
+    return selection.fields()
+
+def _render_turn_prompt(
+    panelist: PanelistConfig, state: BoardState, question: str, template: Optional[PromptTemplate] = None,
+    context: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Fill a panelist's turn prompt with the question and, if asked for, ground-truth data."""
+    template = template or prompts.register(f"{panelist.node}.turn", panelist.turn_prompt)
+    fields = {"question": question}
+    if panelist.ground_truth:
+        # The turn being answered: the latest panelist message (e.g. Aria's proposal for Marcus)
+        turn = next((m.content for m in reversed(state["messages"]) if isinstance(m, AIMessage) and m.name != "ChiefOfStaff"), "")
+        fields.update(_ground_truth_fields(context if context is not None else state.get("context_data", {}), question, turn))
+    return template.render(**fields)
+
+@lru_cache(maxsize=None)
+def _chair_status(current_round: int, max_rounds: int, final: bool) -> HumanMessage:
+    # One message per round number, shared by every debate (never mutated)
+    return CHAIR_STATUS_PROMPT.human(
+        current_round=current_round,
+        max_rounds=max_rounds,
+        final_round_warning=FINAL_ROUND_WARNING if final else "",
     )
-    
-    # Format context data
-    context = state["context_data"]
-    data_summary = f"""
-**GROUND TRUTH DATA FOR ANALYSIS:**
 
-Projects: {json.dumps(context.get('projects', []), indent=2)}
-
-Calendar Events (next 30 days): {json.dumps(context.get('calendar_events', {}).get('events', [])[:10], indent=2)}
-
-Use this REAL data to validate Aria's proposal above.
-"""
+def chair_evidence(chair: PanelistConfig, state: BoardState, context: Optional[Dict[str, Any]] = None) -> Optional[HumanMessage]:
+    """Workspace records relevant to this round's arguments, within CHAIR_CONTEXT_TOKEN_BUDGET."""
+    context = context if context is not None else state.get("context_data") or {}
+    if CHAIR_CONTEXT_TOKEN_BUDGET <= 0 or not context:
+        return None
+    question = current_question(state)
+    round_turns = []
+    for message in reversed(state["messages"]):
+        if not isinstance(message, AIMessage) or message.name in (chair.name, "ChiefOfStaff"):
+            break
+        round_turns.append(message.content)
+    selection = current_tenant().selector.select(context, question, "\n".join(reversed(round_turns)), CHAIR_CONTEXT_TOKEN_BUDGET)
+    if not selection.items:
+        return None
+    return CHAIR_EVIDENCE_PROMPT.human(records=selection.render())
+
+def chair_prompt(
+    chair: PanelistConfig, messages: List[Any], current_round: int, evidence: Optional[HumanMessage] = None,
+    final: Optional[bool] = None, max_rounds: int = MAX_DEBATE_ROUNDS,
+) -> List[Any]:
+    """The Chair's full prompt: instruction, the debate so far, relevant records, and the round status."""
+    if final is None:
+        final = current_round >= max_rounds
+    status = _chair_status(current_round, max_rounds, final)
+    return [agent_instruction(chair).system_message, *messages, *((evidence,) if evidence is not None else ()), status]
+
+def turn_budget(state: BoardState, panel: PanelConfig, prompt: List[Any], seconds_left: Optional[float], final: bool = False) -> int:
+    """
+    `max_output_tokens` for one turn, from what the debate has left.
     
-    messages_with_system = [
-        SystemMessage(content=MARCUS_INSTRUCTION),
-        *state["messages"],
-        HumanMessage(content=data_summary)
-    ]
+    Args:
+        state: Current BoardState (its `budget` ledger and round count)
+        panel: Board config (turns per round)
+        prompt: The turn's full prompt, for its size
+        seconds_left: Time the turn has (None for no deadline)
+        final: Whether this is the debate's last round
+        
+    Returns:
+        Output cap between MIN_TURN_OUTPUT_TOKENS and MAX_TOKENS
+    """
+    budget = state.get("budget") or {}
+    current_round = state.get("round_count", 0) + 1
+    max_rounds = current_round if final else round_limit(state)
+    seats = len(panel.panelists) + 1
+    spoken = 0  # Panelists who already spoke this round
+    for message in reversed(state["messages"]):
+        if not isinstance(message, AIMessage) or message.name in (panel.chair.name, "ChiefOfStaff"):
+            break
+        spoken += 1
+    turns_left = seats - spoken + (max_rounds - current_round) * seats
+    prompt_tokens = sum(len(str(m.content)) for m in prompt) // 4
+    return turn_output_tokens(budget, MAX_TOKENS, prompt_tokens, current_round, max_rounds, turns_left, seconds_left)
+
+def debate_key(state: BoardState, config: Optional[RunnableConfig]) -> str:
+    """Identifies one debate: its thread plus the Chief of Staff report that opened it."""
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id", "")
+    return f"{thread_id}:{(state.get('context_data') or {}).get('timestamp', '')}"
+
+async def run_tools(panelist: PanelistConfig, panel: PanelConfig, llm, prompt: List[Any], debate: str) -> Tuple[List[Any], Optional[str]]:
+    """
+    Let a tool-using panelist look things up before answering.
     
+    Each model turn goes through the retry policy and the panel semaphore; the
+    tool calls it asks for run as one concurrent batch outside the semaphore,
+    with read-only results memoized for the rest of the debate.
+    
+    Returns:
+        (prompt extended with tool calls and results, the model's answer or
+        None if it was still calling tools after TOOL_MAX_STEPS turns)
+    """
     @retry_decorator
-    async def invoke_marcus():
-        return await llm.ainvoke(messages_with_system)
+    async def call_model(messages: List[Any]) -> AIMessage:
+        async with panel_semaphore(panel.max_concurrency):
+            start = time.perf_counter()
+            response = await hedged_call(lambda: llm.ainvoke(messages), key=panelist.node)
+        record_usage(
+            response.usage_metadata, time.perf_counter() - start,
+            prompt_tokens=sum(len(str(m.content)) for m in messages) // 4, output_tokens=len(response.text) // 4,
+        )
+        return response
+    
+    prompt, answer = await get_tool_runner().loop(call_model, prompt, _resolve_tools(panelist.tools), debate)
+    return prompt, (answer.text if answer is not None else None)
+
+def make_panelist_node(panelist: PanelistConfig, panel: PanelConfig):
+    """
+    Build the LangGraph node for one panelist.
+    
+    Each panelist node:
+    1. Renders its persona instruction, the debate so far and its turn prompt
+       (and, with tools, lets the model look things up first; see `run_tools`)
+    2. Waits for a slot on the shared panel semaphore (concurrency cap)
+    3. Streams a validated answer (hedged when enabled), bounded by the
+       per-node timeout and the round deadline set by the Chief of Staff or
+       the Chair
+    4. Falls back to its default stance (or drops out of the round) if it is
+       too slow, the call fails, or no valid answer comes back
+    
+    Design: Nodes return only their new message, never the whole state, so
+    independent panelists can run as parallel branches of the same superstep
+    without conflicting writes to `context_data`, `round_count` or `status`.
+    
+    Args:
+        panelist: Persona and prompting config for this seat
+        panel: Board config (concurrency cap)
+        
+    Returns:
+        Async node function for `StateGraph.add_node`
+    """
+    instruction = agent_instruction(panelist).system_message
+    turn_prompt = prompts.register(f"{panelist.node}.turn", panelist.turn_prompt) if panelist.turn_prompt else None
     
-    response = await invoke_marcus()
-    state["messages"].append(AIMessage(content=response.content, name="Marcus"))
+    async def panelist_node(state: BoardState, config: RunnableConfig) -> Dict[str, Any]:
+        logger.info(f"{panelist.icon} {panelist.name} ({panelist.title}) taking the floor...")
+        
+        user_question = current_question(state)
+        
+        messages_with_system = [instruction, *debate_messages(state)]
+        if turn_prompt is not None:
+            context = await debate_context(state) if panelist.ground_truth else None
+            messages_with_system.append(HumanMessage(content=_render_turn_prompt(panelist, state, user_question, turn_prompt, context)))
+        
+        seconds_left = remaining_time(state.get("round_deadline"))
+        max_output_tokens = turn_budget(state, panel, messages_with_system, seconds_left)
+        
+        async def speak() -> str:
+            llm, prompt = await agent_prompt(panelist, messages_with_system, max_output_tokens)
+            if panelist.tools:
+                prompt, answer = await run_tools(panelist, panel, llm, prompt, debate_key(state, config))
+                if answer is not None and check_response(answer, panelist.rules) is None:
+                    return answer
+                # Answer from what was looked up, without further tool calls
+                llm = make_llm(panelist.model, panelist.temperature, max_output_tokens, panelist.tools, tool_choice="none")
+            async with panel_semaphore(panel.max_concurrency):
+                text, problem = await generate_validated(llm, prompt, panelist.rules, panelist.node)
+            if problem is None:
+                return text
+            # Out of regenerations: a usable-but-flawed answer beats silence,
+            # but an empty one is replaced by the default stance (or dropped)
+            if panelist.default_stance is not None or not text.strip():
+                return panelist.default_stance
+            return text
+        
+        with metered() as meter:
+            try:
+                content = await with_deadline(speak(), panelist.node, seconds_left)
+            except asyncio.TimeoutError:
+                logger.warning(f"⏱️ {panelist.name} missed the round deadline")
+                content = panelist.default_stance
+            except Exception as e:
+                if panelist.default_stance is None:
+                    raise
+                logger.error(f"{panelist.name} failed to respond: {e}")
+                content = panelist.default_stance
+        
+        if content is None:
+            logger.warning(f"🚪 {panelist.name} dropped from this round")
+            return {"messages": [], "budget": meter.as_update()}
+        
+        return {"messages": [AIMessage(content=content, name=panelist.name)], "budget": meter.as_update()}
     
-    return state
+    panelist_node.__name__ = f"{panelist.node}_node"
+    return panelist_node
 
-async def chair_node(state: BoardState) -> BoardState:
+def make_chair_node(panel: PanelConfig):
     """
-    The Chair (Moderator Agent): Synthesis & Final Decision
+    Build the Chair (Moderator Agent) node: Synthesis & Final Decision
     
     Persona: Balanced, wise, decisive
     Temperature: 0.7 (balanced) for reasoned judgment
     
-    This agent is the final decision-maker who:
-    1. Reviews both Aria's optimistic case and Marcus's critical analysis
+    The Chair is the final decision-maker who:
+    1. Reviews every panelist's contribution for the round
     2. Weighs the data, risks, and opportunities fairly
     3. Makes a final SUPPORT, OPPOSE, or conditional decision
     4. Can trigger another debate round if more information is needed (max 3 rounds)
@@ -476,73 +895,95 @@ async def chair_node(state: BoardState) -> BoardState:
     - Round tracking prevents infinite loops (max MAX_DEBATE_ROUNDS)
     - Looks for keywords "DECISION: SUPPORT" or "DECISION: OPPOSE" in response
     - Updates state.status to signal workflow completion
+    - Opens the next round's deadline when asking for a revision, and makes
+      this round the final one if the latency or token budget cannot fit
+      another (see src/budget.py)
     
     Args:
-        state: BoardState with complete debate history
+        panel: Board config providing the Chair's persona and the round deadline
         
     Returns:
-        Updated state with Chair's decision and updated round_count/status
+        Async node function for `StateGraph.add_node`
     """
-    logger.info("⚖️  The Chair deliberating...")
-    
-    llm = ChatGoogleGenerativeAI(
-        model=DEFAULT_MODEL,
-        temperature=TEMPERATURE_BALANCED,
-        google_api_key=GOOGLE_API_KEY,
-        max_output_tokens=MAX_TOKENS
-    )
-    
-    current_round = state.get("round_count", 0) + 1
-    state["round_count"] = current_round
-    
-    debate_context = f"""
-**DEBATE STATUS:**
-- Current Round: {current_round} of {MAX_DEBATE_ROUNDS}
-
-{"⚠️  FINAL ROUND - You MUST produce a final decision (SUPPORT or OPPOSE) NOW." if current_round >= MAX_DEBATE_ROUNDS else ""}
-
-Review the debate. Decide:
-- **OPPOSE**: If the idea is reckless, risky, or unfeasible
-- **SUPPORT**: If the idea is viable (with conditions)
-- **NEEDS_REVISION**: If you need more information (only if NOT final round)
-
-Remember your instruction: Protect the user from financial ruin.
-"""
+    chair = panel.chair
+    agent_instruction(chair)  # Registered and pre-rendered once, at build time
     
-    messages_with_system = [
-        SystemMessage(content=CHAIR_INSTRUCTION),
-        *state["messages"],
-        HumanMessage(content=debate_context)
-    ]
-    
-    @retry_decorator
-    async def invoke_chair():
-        return await llm.ainvoke(messages_with_system)
-    
-    response = await invoke_chair()
-    state["messages"].append(AIMessage(content=response.content, name="TheChair"))
-    
-    response_lower = response.content.lower()
-    
-    # Check for decision keywords
-    if "decision: support" in response_lower or "decision: oppose" in response_lower:
-        state["status"] = "approved" # "approved" here means "debate finished", not necessarily "idea approved"
-    elif "approved" in response_lower: # Fallback for legacy behavior
-        state["status"] = "approved"
-    elif current_round >= MAX_DEBATE_ROUNDS:
-        state["status"] = "max_rounds"
-    else:
-        state["status"] = "needs_revision"
+    async def chair_node(state: BoardState) -> Dict[str, Any]:
+        logger.info(f"{chair.icon}  {chair.title} deliberating...")
+        
+        current_round = state.get("round_count", 0) + 1
+        max_rounds = round_limit(state)
+        update = {"round_count": current_round}
+        
+        # Another round needs both time and tokens; without either, the Chair must rule now
+        final = current_round >= max_rounds
+        if not final and should_close(state.get("budget") or {}, current_round):
+            logger.warning("💰 Token budget nearly spent, this round is the last")
+            final = True
+        elif not final and next_round_deadline(panel, state.get("debate_deadline"), max_rounds - current_round) is None:
+            logger.warning("⏱️ Latency budget nearly spent, this round is the last")
+            final = True
+        
+        messages_with_system = chair_prompt(
+            chair, debate_messages(state), current_round, chair_evidence(chair, state, await debate_context(state)), final, max_rounds
+        )
+        seconds_left = remaining_time(state.get("debate_deadline"), floor=CHAIR_MIN_SECONDS)
+        max_output_tokens = turn_budget(state, panel, messages_with_system, seconds_left, final)
+        
+        async def rule():
+            llm, prompt = await agent_prompt(chair, messages_with_system, max_output_tokens)
+            return await generate_validated(llm, prompt, chair.rules, chair.node)
+        
+        with metered() as meter:
+            try:
+                # The Chair always gets a minimum slot so a spent budget still yields a ruling attempt
+                content, _ = await with_deadline(rule(), chair.node, seconds_left)
+            except asyncio.TimeoutError:
+                logger.error(f"⏱️ {chair.title} ran out of time")
+                content = None
+        update["budget"] = meter.as_update()
+        
+        if content is None:
+            content = "⚠️ The board ran out of time before reaching a verdict. Please ask again or narrow the question."
+            update["messages"] = [AIMessage(content=content, name=chair.name)]
+            update["status"] = "max_rounds"
+            update["budget"] = finish_budget(update["budget"])
+            return update
+        
+        update["messages"] = [AIMessage(content=content, name=chair.name)]
+        
+        response_lower = content.lower()
+        
+        # Check for decision keywords
+        if "decision: support" in response_lower or "decision: oppose" in response_lower:
+            update["status"] = "approved" # "approved" here means "debate finished", not necessarily "idea approved"
+        elif "approved" in response_lower: # Fallback for legacy behavior
+            update["status"] = "approved"
+        elif final:
+            update["status"] = "max_rounds"
+        else:
+            round_deadline = next_round_deadline(panel, state.get("debate_deadline"), max_rounds - current_round)
+            if round_deadline is None:
+                logger.warning("⏱️ Latency budget spent, closing the debate")
+                update["status"] = "max_rounds"
+            else:
+                update["status"] = "needs_revision"
+                update["round_deadline"] = round_deadline
+        if update["status"] != "needs_revision":
+            update["budget"] = finish_budget(update["budget"])  # Replays report the duration, not the age
+        
+        # Only the changed keys: checkpoint writes stay proportional to this turn
+        return update
     
-    return state
+    return chair_node
 
-def decide_next_step(state: BoardState) -> Literal["visionary", "end"]:
+def decide_next_step(state: BoardState) -> Literal["continue", "end"]:
     """
     LangGraph Conditional Edge: Determines Workflow Path
     
     This function controls the debate loop by examining the current state:
     - If debate is complete ("approved" or "max_rounds"), end workflow
-    - Otherwise, loop back to Visionary for another debate round
+    - Otherwise, open another round with the panel
     
     Design: Implements iterative refinement pattern where ideas can be
     challenged and improved through multiple rounds of agent discussion.
@@ -551,7 +992,7 @@ def decide_next_step(state: BoardState) -> Literal["visionary", "end"]:
         state: Current BoardState with status field
         
     Returns:
-        "end" to terminate workflow, or "visionary" to continue debate
+        "end" to terminate workflow, or "continue" to start another round
     """
     status = state.get("status", "debating")
     
@@ -560,106 +1001,485 @@ def decide_next_step(state: BoardState) -> Literal["visionary", "end"]:
         return "end"
     else:
         logger.info("🔄 Continuing debate...")
-        return "visionary"
+        return "continue"
 
 # Graph Construction
-def create_roundtable_graph() -> StateGraph:
+def create_roundtable_graph(panel: PanelConfig = None) -> StateGraph:
     """
-    Construct the LangGraph Multi-Agent Workflow
+    Construct the LangGraph Multi-Agent Workflow from a panel config
     
-    Architecture:
+    Architecture (default panel):
     START → Chief of Staff → Aria → Marcus → Chair → [Conditional]
                                 ↑_________________|
                                 (if needs revision)
     
+    With a larger panel, independent panelists fan out in parallel after the
+    Chief of Staff, dependent panelists follow the ones they wait on, and the
+    Chair joins on every panelist nobody else depends on:
+    
+    START → Chief of Staff → {Panelist A, Panelist B, ...} → Chair → [Conditional]
+    
+    A follow-up whose context is still fresh starts at the panel directly
+    (see `follow_up_state`).
+    
     Key Features:
-    - Sequential agent flow ensures proper information passing
+    - Graph is generated from `PanelConfig`, not wired by hand
+    - Parallel branches keep round latency flat as the board grows
     - Conditional loops allow iterative debate refinement
-    - State persistence via AsyncSqliteSaver enables session recovery
+    - State persistence via DeltaSqliteSaver enables session recovery
     
+    Args:
+        panel: Board to seat (defaults to DEFAULT_PANEL)
+        
     Returns:
-        Compiled StateGraph ready for execution
+        StateGraph ready to compile
     """
+    panel = panel or DEFAULT_PANEL
     graph = StateGraph(BoardState)
     
-    graph.add_node("chief_of_staff", chief_of_staff_node)
-    graph.add_node("visionary", visionary_node)
-    graph.add_node("skeptic", skeptic_node)
-    graph.add_node("chair", chair_node)
-    
-    graph.add_edge(START, "chief_of_staff")
-    graph.add_edge("chief_of_staff", "visionary")
-    graph.add_edge("visionary", "skeptic")
-    graph.add_edge("skeptic", "chair")
-    
-    graph.add_conditional_edges(
-        "chair",
-        decide_next_step,
-        {
-            "visionary": "visionary",
-            "end": END
-        }
-    )
+    async def chief_node(state: BoardState) -> Dict[str, Any]:
+        update = await chief_of_staff_node(state)
+        # The first round's clock starts once the context report is ready; it
+        # always runs, even if gathering context ate into the budget
+        update["round_deadline"] = (
+            next_round_deadline(panel, state.get("debate_deadline"), round_limit(state))
+            or time.time() + MIN_ROUND_SECONDS
+        )
+        return update
+    
+    # Everything a node logs is tagged with its name (see src/log_pipeline.py)
+    graph.add_node("chief_of_staff", logged_node("chief_of_staff", chief_node))
+    for panelist in panel.panelists:
+        graph.add_node(panelist.node, logged_node(panelist.node, make_panelist_node(panelist, panel)))
+    graph.add_node(panel.chair.node, logged_node(panel.chair.node, make_chair_node(panel)))
+    
+    roots = panel.roots()
+    
+    def route_start(state: BoardState):
+        # Follow-ups arrive already "debating" when they reuse the earlier context
+        return roots if state.get("status") == "debating" else "chief_of_staff"
+    
+    graph.add_conditional_edges(START, route_start, ["chief_of_staff", *roots])
+    for node in roots:
+        graph.add_edge("chief_of_staff", node)
+    for panelist in panel.panelists:
+        if panelist.after:
+            graph.add_edge(list(panelist.after), panelist.node)
+    graph.add_edge(panel.sinks(), panel.chair.node)
+    
+    def route_after_chair(state: BoardState):
+        return roots if decide_next_step(state) == "continue" else END
+    
+    graph.add_conditional_edges(panel.chair.node, route_after_chair, [*roots, END])
     
     return graph
 
+
 # Main execution
-async def run_demo(question: str) -> List[Dict[str, str]]:
-    """Run a single question through THE ROUNDTABLE and return messages."""
+def new_thread_id(tenant: Optional[str] = None) -> str:
+    """Unique thread ID for a fresh debate (prevents state carryover), namespaced by tenant."""
+    return tenant_thread_id(tenant, f"debate_{uuid.uuid4().hex[:8]}")
+
+
+# Debates being driven by this process (thread_id -> set when the run ends).
+# A Streamlit page reload starts a new session while the old script run may
+# still be going; the new session waits for that run instead of driving the
+# same thread twice.
+_active_debates: Dict[str, threading.Event] = {}
+_active_debates_lock = threading.Lock()
+
+
+def _claim_debate(thread_id: str) -> Optional[threading.Event]:
+    """Claim a thread for this run; returns the owner's event if it is already being driven."""
+    with _active_debates_lock:
+        if thread_id in _active_debates:
+            return _active_debates[thread_id]
+        _active_debates[thread_id] = threading.Event()
+        return None
+
+
+def _release_debate(thread_id: str):
+    with _active_debates_lock:
+        done = _active_debates.pop(thread_id, None)
+    if done:
+        done.set()
+
+
+def transcript_from_state(values: Dict[str, Any], timestamp: Optional[str] = None) -> List[TranscriptEntry]:
+    """Agent messages of a checkpointed state, in the format returned by run_demo (debate totals on the last)."""
+    timestamp = timestamp or datetime.now().isoformat()
+    messages = [msg for msg in values.get("messages", []) if isinstance(msg, AIMessage)]
+    usage = usage_summary(values["budget"]) if values.get("budget") else None
+    return [
+        TranscriptEntry(msg.name or "Agent", msg.content, timestamp, usage if i == len(messages) - 1 else None)
+        for i, msg in enumerate(messages)
+    ]
+
+
+def context_is_fresh(context: Optional[Dict[str, Any]]) -> bool:
+    """Whether a follow-up may reuse a debate's context: recent enough, and the workspace unchanged since."""
+    if not context or "timestamp" not in context:
+        return False
+    age = (datetime.now() - datetime.fromisoformat(context["timestamp"])).total_seconds()
+    return age < FOLLOW_UP_CONTEXT_TTL_SECONDS and context.get("revision") == current_tenant().workspace.revision
+
+
+def compact_verdict(values: Dict[str, Any]) -> Optional[str]:
+    """The last question on a thread and the Chair's verdict on it, in at most FOLLOW_UP_VERDICT_CHARS."""
+    messages = values.get("messages", [])
+    question = current_question(values)
+    verdict = next(
+        (m.content for m in reversed(messages) if isinstance(m, AIMessage) and m.name == DEFAULT_PANEL.chair.name), None
+    )
+    if not question or verdict is None:
+        return None
+    verdict = " ".join(verdict.split())
+    if len(verdict) > FOLLOW_UP_VERDICT_CHARS:
+        verdict = verdict[:FOLLOW_UP_VERDICT_CHARS].rsplit(" ", 1)[0] + " …"
+    return f"- Q: {question}\n  Verdict: {verdict}"
+
+
+def follow_up_state(values: Dict[str, Any], question: str) -> Dict[str, Any]:
+    """
+    Graph input for a follow-up question on a finished debate's thread.
+    
+    The earlier debates are condensed into `earlier_verdicts`, the follow-up
+    runs at most FOLLOW_UP_ROUNDS rounds, and when the earlier context is
+    still fresh (`context_is_fresh`) the Chief of Staff is skipped.
+    
+    Args:
+        values: The thread's checkpointed state
+        question: The follow-up question
+        
+    Returns:
+        State update to stream into the graph
+    """
+    verdicts = list(values.get("earlier_verdicts") or [])
+    latest = compact_verdict(values)
+    if latest:
+        verdicts.append(latest)
+    debate_deadline = time.time() + DEBATE_LATENCY_BUDGET_SECONDS
+    update = {
+        "messages": [HumanMessage(content=question)],
+        "round_count": 0,
+        "max_rounds": FOLLOW_UP_ROUNDS,
+        "earlier_verdicts": verdicts[-FOLLOW_UP_MAX_VERDICTS:],
+        "status": "gathering",
+        "debate_deadline": debate_deadline,
+        "budget": new_budget(),
+    }
+    if context_is_fresh(values.get("context_data")):
+        logger.info("♻️ Follow-up reuses the earlier context, skipping the Chief of Staff")
+        update["status"] = "debating"
+        update["round_deadline"] = (
+            next_round_deadline(DEFAULT_PANEL, debate_deadline, FOLLOW_UP_ROUNDS) or time.time() + MIN_ROUND_SECONDS
+        )
+    return update
+
+
+# Called with each transcript entry as soon as its agent has spoken
+MessageCallback = Callable[[TranscriptEntry], None]
+
+
+def export_debate(
+    thread_id: str,
+    question: str,
+    entries: List[TranscriptEntry],
+    started_at: float,
+    kind: str = "debate",
+    first_round: int = 1,
+    panel: Optional[PanelConfig] = None,
+):
+    """Queue a finished run's rows for the analytics tables (batched; never blocks the debate)."""
+    panel = panel or DEFAULT_PANEL
+    nodes = {"ChiefOfStaff": "chief_of_staff", panel.chair.name: panel.chair.node}
+    nodes.update((p.name, p.node) for p in panel.panelists)
+    try:
+        get_exporter().record(*debate_rows(thread_id, question, entries, started_at, nodes, panel.chair.name, kind, first_round))
+    except Exception as e:
+        logger.warning(f"📊 Could not export debate {thread_id}: {e}")
+
+
+async def _stream_debate(
+    app, graph_input: Any, config: Dict[str, Any], on_message: Optional[MessageCallback] = None,
+    budget: Optional[Dict[str, Any]] = None,
+) -> List[TranscriptEntry]:
+    """
+    Drive the graph to the end, collecting each agent message as it is produced.
     
-    if not GOOGLE_API_KEY:
+    Each entry carries a `usage` dict: the turn's tokens and model seconds,
+    and the debate's running totals (starting from the `budget` ledger).
+    """
+    all_messages = []
+    ledger = dict(budget or {})
+    
+    async for event in app.astream(graph_input, config):
+        for node_name, node_output in event.items():
+            # "__metadata__" marks writes replayed from a checkpoint on resume
+            if node_name in ("__end__", "__metadata__") or not node_output:
+                continue
+            
+            delta = node_output.get("budget")
+            ledger = merge_budget(ledger, delta)
+            messages = node_output.get("messages", [])
+            if messages:
+                latest = messages[-1]
+                if isinstance(latest, AIMessage):
+                    agent_name = getattr(latest, 'name', node_name)
+                    entry = TranscriptEntry(agent_name, latest.content, usage=usage_summary(ledger, delta))
+                    all_messages.append(entry)
+                    if on_message:
+                        on_message(entry)
+    
+    return all_messages
+
+
+@asynccontextmanager
+async def open_roundtable(db_path: str = DB_PATH, panel: Optional[PanelConfig] = None):
+    """
+    Open the checkpointer and compile the graph once.
+
+    The compiled graph is stateless between runs (state lives in the
+    checkpointer, keyed by thread), so long-lived hosts such as the background
+    executor and the API share one instance across all concurrent debates.
+    """
+    async with DeltaSqliteSaver.from_conn_string(db_path) as checkpointer:
+        yield create_roundtable_graph(panel).compile(checkpointer=checkpointer)
+
+
+async def run_demo(
+    question: str,
+    thread_id: Optional[str] = None,
+    on_message: Optional[MessageCallback] = None,
+    app=None,
+    follow_up: bool = False,
+) -> List[TranscriptEntry]:
+    """
+    Run a single question through THE ROUNDTABLE and return messages.
+    
+    Args:
+        question: The user's question
+        thread_id: Checkpoint thread to run on; a fresh one is generated if
+            omitted. Pass one in to be able to `resume_debate` it later.
+            Its tenant (`new_thread_id(tenant)`) selects the workspace.
+        on_message: Called with each transcript entry as it is produced
+        app: Shared graph from `open_roundtable`; one is opened for this call if omitted
+        follow_up: Continue the finished debate on `thread_id` with this
+            question (see `follow_up_state`) instead of starting a new one
+    
+    Returns:
+        The transcript entries of this question's debate
+    """
+    
+    if not GOOGLE_API_KEY and not OFFLINE_LLM:
         raise ValueError("GOOGLE_API_KEY not found in environment!")
     
-    # Generate unique thread ID for each debate to prevent state carryover
-    import uuid
-    unique_thread_id = f"debate_{uuid.uuid4().hex[:8]}"
+    if follow_up and not thread_id:
+        raise ValueError("A follow-up needs the thread_id of the debate it follows.")
     
-    async with AsyncSqliteSaver.from_conn_string(DB_PATH) as checkpointer:
-        graph = create_roundtable_graph()
-        app = graph.compile(checkpointer=checkpointer)
-        
-        # Fresh initial state for each debate
-        initial_state = {
-            "messages": [HumanMessage(content=question)],
-            "context_data": {},
-            "round_count": 0,
-            "status": "gathering"
-        }
-        
-        config = {"configurable": {"thread_id": unique_thread_id}}
-        
-        all_messages = []
-        
-        async for event in app.astream(initial_state, config):
-            for node_name, node_output in event.items():
-                if node_name == "__end__":
-                    continue
+    if app is None:
+        async with open_roundtable() as app:
+            return await run_demo(question, thread_id, on_message, app, follow_up)
+    
+    thread_id = thread_id or new_thread_id()
+    tenant = get_tenants().get(tenant_of(thread_id))  # Checked before the thread is claimed
+    if _claim_debate(thread_id) is not None:
+        raise ValueError(f"Debate '{thread_id}' is already running.")
+    
+    with log_context(debate=thread_id), tenant_scope(tenant):
+        checkpointer = app.checkpointer
+        try:
+            config = {"configurable": {"thread_id": thread_id}}
+            
+            if follow_up:
+                snapshot = await app.aget_state(config)
+                if not snapshot.values:
+                    raise ValueError(f"No debate found for thread '{thread_id}'.")
+                if snapshot.next:
+                    raise ValueError(f"Debate '{thread_id}' has not finished; resume it before following up.")
+                initial_state = follow_up_state(snapshot.values, question)
+            else:
+                # Fresh initial state for each debate
+                initial_state = {
+                    "messages": [HumanMessage(content=question)],
+                    "context_data": {},
+                    "round_count": 0,
+                    "max_rounds": MAX_DEBATE_ROUNDS,
+                    "earlier_verdicts": [],
+                    "status": "gathering",
+                    "debate_deadline": time.time() + DEBATE_LATENCY_BUDGET_SECONDS,
+                    "budget": new_budget(),
+                }
+            
+            await checkpointer.athread_started(thread_id, question)
+            
+            try:
+                async with profiled(thread_id):
+                    all_messages = await _stream_debate(app, initial_state, config, on_message, initial_state["budget"])
+            except asyncio.CancelledError:
+                # Checkpoints so far are kept; the debate can still be resumed
+                await checkpointer.athread_finished(thread_id, status="cancelled")
+                raise
+            
+            await checkpointer.athread_finished(thread_id)
+            export_debate(
+                thread_id, question, all_messages, initial_state["budget"]["started_at"], "follow_up" if follow_up else "debate"
+            )
+            
+            if all_messages:
+                logger.info(f"💰 Debate usage: {json.dumps(all_messages[-1]['usage'])}")
+            logger.info(f"📈 Call metrics: {json.dumps(call_metrics())}")
+            logger.info(f"🗃️ Prefix cache: {json.dumps(get_prefix_cache().stats())}")
+        finally:
+            _release_debate(thread_id)
+    
+    # Prune and compact old debates off the event loop (at most once per interval);
+    # in the worker pool the checkpoint writer process does this instead
+    if isinstance(checkpointer, DeltaSqliteSaver) and checkpointer.db_path:
+        schedule_maintenance(checkpointer.db_path)
+    return all_messages
+
+
+async def resume_debate(
+    thread_id: str, on_message: Optional[MessageCallback] = None, app=None
+) -> List[TranscriptEntry]:
+    """
+    Continue an interrupted debate from its last completed node.
+    
+    Design: The checkpointer already holds every node that finished (including
+    panelists that finished within an interrupted round), so only the missing
+    work is redone. The deadlines stored in the checkpoint are stale by now, so
+    the resumed run gets a fresh latency budget. A finished debate is simply
+    replayed.
+    
+    Args:
+        thread_id: Thread the debate was started on
+        on_message: Called with each transcript entry, starting with those
+            already checkpointed
+        app: Shared graph from `open_roundtable`; one is opened for this call if omitted
+    
+    Returns:
+        The full transcript, in the format returned by run_demo
+    """
+    if app is None:
+        async with open_roundtable() as app:
+            return await resume_debate(thread_id, on_message, app)
+    
+    tenant = get_tenants().get(tenant_of(thread_id))
+    owner = _claim_debate(thread_id)
+    if owner is not None:
+        logger.info(f"🔌 Debate {thread_id} is still running, waiting for it to finish")
+        await asyncio.to_thread(owner.wait)
+        return await replay_debate(thread_id, app)
+    
+    with log_context(debate=thread_id), tenant_scope(tenant):
+        checkpointer = app.checkpointer
+        try:
+            config = {"configurable": {"thread_id": thread_id}}
+            
+            snapshot = await app.aget_state(config)
+            if not snapshot.values:
+                raise ValueError(f"No debate found for thread '{thread_id}'.")
+            
+            all_messages = transcript_from_state(snapshot.values, snapshot.created_at)
+            if on_message:
+                for entry in all_messages:
+                    on_message(entry)
+            if snapshot.next:
+                if not GOOGLE_API_KEY and not OFFLINE_LLM:
+                    raise ValueError("GOOGLE_API_KEY not found in environment!")
                 
-                messages = node_output.get("messages", [])
-                if messages:
-                    latest = messages[-1]
-                    if isinstance(latest, AIMessage):
-                        agent_name = getattr(latest, 'name', node_name)
-                        all_messages.append({
-                            "agent": agent_name,
-                            "content": latest.content,
-                            "timestamp": datetime.now().isoformat()
-                        })
-        
-        return all_messages
+                logger.info(f"🔁 Resuming debate {thread_id} at: {', '.join(snapshot.next)}")
+                debate_deadline = time.time() + DEBATE_LATENCY_BUDGET_SECONDS
+                rounds_left = round_limit(snapshot.values) - snapshot.values.get("round_count", 0)
+                refresh = {
+                    "debate_deadline": debate_deadline,
+                    "round_deadline": (
+                        next_round_deadline(DEFAULT_PANEL, debate_deadline, rounds_left)
+                        or time.time() + MIN_ROUND_SECONDS
+                    ),
+                }
+                # Command(update=...) applies the refresh and runs the pending tasks
+                started_at = time.time()
+                try:
+                    async with profiled(thread_id):
+                        resumed = await _stream_debate(app, Command(update=refresh), config, on_message, snapshot.values.get("budget"))
+                except asyncio.CancelledError:
+                    await checkpointer.athread_finished(thread_id, status="cancelled")
+                    raise
+                all_messages += resumed
+                export_debate(
+                    thread_id, current_question(snapshot.values), resumed, started_at, "resumed",
+                    snapshot.values.get("round_count", 0) + 1,
+                )
+                logger.info(f"📈 Call metrics: {json.dumps(call_metrics())}")
+            
+            await checkpointer.athread_finished(thread_id)
+        finally:
+            _release_debate(thread_id)
+    
+    return all_messages
+
+
+async def replay_debate(thread_id: str, app=None) -> List[TranscriptEntry]:
+    """
+    Re-render a debate's transcript from its latest checkpoint (no model calls).
+    
+    Args:
+        thread_id: Thread the debate was started on
+        app: Shared graph from `open_roundtable`; one is opened for this call if omitted
+    
+    Returns:
+        The transcript so far, in the format returned by run_demo
+    """
+    if app is None:
+        async with open_roundtable() as app:
+            return await replay_debate(thread_id, app)
+    
+    snapshot = await app.aget_state({"configurable": {"thread_id": thread_id}})
+    if not snapshot.values:
+        raise ValueError(f"No debate found for thread '{thread_id}'.")
+    return transcript_from_state(snapshot.values, snapshot.created_at)
 
 if __name__ == "__main__":
+    configure_logging()
     print("🎭 THE ROUNDTABLE - Demo Version")
     print("Using mock Notion data for testing\n")
     
-    question = input("👤 Ask a question: ").strip()
-    if not question:
-        question = "Should I take a 6-month sabbatical to travel the world next year?"
-    
-    print(f"\n🎭 Deliberating on: {question}\n")
-    print("="*70 + "\n")
-    
-    messages = asyncio.run(run_demo(question))
+    # python -m src.backend [--profile] [--resume THREAD_ID | --replay THREAD_ID | --follow-up THREAD_ID [QUESTION]]
+    profile = "--profile" in sys.argv
+    if profile:
+        sys.argv.remove("--profile")
+    
+    def run(coro):
+        """Run the debate, profiled as a whole (see src/profiling.py) with --profile."""
+        if not profile:
+            return asyncio.run(coro)
+        with profiling(f"cli-{time.strftime('%Y%m%d-%H%M%S')}"):
+            return asyncio.run(coro)
+    
+    if len(sys.argv) >= 3 and sys.argv[1] == "--follow-up":
+        thread_id = sys.argv[2]
+        question = " ".join(sys.argv[3:]).strip() or input("👤 Follow-up question: ").strip()
+        print(f"\n↪️ Following up on {thread_id}: {question}\n")
+        print("="*70 + "\n")
+        messages = run(run_demo(question, thread_id, follow_up=True))
+    elif len(sys.argv) == 3 and sys.argv[1] in ("--resume", "--replay"):
+        mode, thread_id = sys.argv[1], sys.argv[2]
+        print(f"🔁 {'Resuming' if mode == '--resume' else 'Replaying'} debate {thread_id}\n")
+        print("="*70 + "\n")
+        messages = run(resume_debate(thread_id) if mode == "--resume" else replay_debate(thread_id))
+    else:
+        question = input("👤 Ask a question: ").strip()
+        if not question:
+            question = "Should I take a 6-month sabbatical to travel the world next year?"
+        
+        thread_id = new_thread_id()
+        print(f"\n🎭 Deliberating on: {question}")
+        print(f"🧵 Thread: {thread_id} (resume with --resume {thread_id})\n")
+        print("="*70 + "\n")
+        
+        messages = run(run_demo(question, thread_id))
     
     for msg in messages:
         print(f"\n🤖 {msg['agent']}:")
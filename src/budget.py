@@ -0,0 +1,255 @@
+"""
+Per-Debate Budget Governor for THE ROUNDTABLE
+
+Every turn used to get the same MAX_TOKENS output cap, and MAX_DEBATE_ROUNDS
+was the only brake on a long debate. The governor keeps a ledger of what a
+debate has spent and sizes each turn from what is left:
+
+- The ledger lives in `BoardState["budget"]` (summed by the `merge_budget`
+  reducer, so parallel panelists can all report): input/output tokens, model
+  calls and model seconds, plus the debate's token budget, start time and
+  (stamped by the Chair's closing turn) finish time
+- Model calls report their usage to the node's `metered()` scope
+  (`record_usage`), so nodes only attach `meter.as_update()` to their return
+- `turn_output_tokens` sets `max_output_tokens` for a turn: middle rounds
+  get MIDDLE_ROUND_OUTPUT_SHARE of the cap, the remaining token budget is
+  split across the turns that may still run, and the answer must fit in
+  the time left at the debate's measured generation speed
+- `should_close` tells the Chair to make this round final when the next one
+  would not fit in the remaining tokens
+- Transcript entries carry each turn's usage and the debate's running totals
+
+Compare worst-case debates with and without a token budget (offline model):
+    python -m src.budget bench [--debates 5] [--token-budget 12000]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+DEBATE_TOKEN_BUDGET = int(os.getenv("DEBATE_TOKEN_BUDGET", "60000"))  # Input + output tokens; 0 for no limit
+MIN_TURN_OUTPUT_TOKENS = int(os.getenv("MIN_TURN_OUTPUT_TOKENS", "256"))
+MIDDLE_ROUND_OUTPUT_SHARE = float(os.getenv("MIDDLE_ROUND_OUTPUT_SHARE", "0.6"))
+OUTPUT_TOKENS_PER_SECOND = float(os.getenv("OUTPUT_TOKENS_PER_SECOND", "60"))  # Until the debate has measured its own
+TIME_SAFETY = 0.8  # Leave room for the prompt and network in the time-based cap
+CAP_STEP = 128  # Caps are rounded down to this, so tool-bound models stay cacheable
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "calls", "model_seconds")
+
+
+def new_budget(token_budget: int = DEBATE_TOKEN_BUDGET) -> Dict[str, Any]:
+    """A fresh ledger for a new debate."""
+    return {"started_at": time.time(), "token_budget": token_budget, **{name: 0 for name in USAGE_FIELDS}}
+
+
+def merge_budget(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """State reducer: usage deltas are summed; a new ledger (with `started_at`) replaces the old one."""
+    if not right:
+        return left or {}
+    if "started_at" in right:
+        return dict(right)
+    merged = dict(left or {})
+    for name, value in right.items():
+        merged[name] = merged.get(name, 0) + value if name in USAGE_FIELDS else value
+    return merged
+
+
+def finish_budget(delta: Dict[str, Any]) -> Dict[str, Any]:
+    """A closing turn's ledger delta, stamped with the debate's finish time."""
+    return dict(delta, finished_at=time.time())
+
+
+def spent_tokens(budget: Dict[str, Any]) -> int:
+    return int(budget.get("input_tokens", 0) + budget.get("output_tokens", 0))
+
+
+def remaining_tokens(budget: Dict[str, Any]) -> Optional[int]:
+    """Tokens left in the debate's budget, or None when it has no token limit."""
+    limit = budget.get("token_budget") or 0
+    return max(0, limit - spent_tokens(budget)) if limit > 0 else None
+
+
+def output_rate(budget: Dict[str, Any]) -> float:
+    """Output tokens per model second this debate has seen (or the configured default)."""
+    seconds, tokens = budget.get("model_seconds", 0), budget.get("output_tokens", 0)
+    return tokens / seconds if seconds > 0 and tokens > 0 else OUTPUT_TOKENS_PER_SECOND
+
+
+def turn_output_tokens(
+    budget: Dict[str, Any],
+    cap: int,
+    prompt_tokens: int,
+    current_round: int,
+    max_rounds: int,
+    turns_left: int,
+    seconds_left: Optional[float] = None,
+) -> int:
+    """
+    `max_output_tokens` for the next turn.
+
+    Args:
+        budget: The debate's ledger (`BoardState["budget"]`)
+        cap: Largest answer any turn may produce (MAX_TOKENS)
+        prompt_tokens: Estimated size of this turn's prompt
+        current_round: Round being played (1-based)
+        max_rounds: Rounds the debate may run
+        turns_left: Model turns that may still run, this one included
+        seconds_left: Time this turn has (None for no deadline)
+
+    Returns:
+        The cap for this turn, never below MIN_TURN_OUTPUT_TOKENS
+    """
+    limit = float(cap)
+    if 1 < current_round < max_rounds:
+        limit *= MIDDLE_ROUND_OUTPUT_SHARE
+    remaining = remaining_tokens(budget)
+    if remaining is not None:
+        limit = min(limit, remaining / max(1, turns_left) - prompt_tokens)
+    if seconds_left is not None:
+        limit = min(limit, seconds_left * TIME_SAFETY * output_rate(budget))
+    limit = max(MIN_TURN_OUTPUT_TOKENS, min(cap, limit))
+    return int(max(MIN_TURN_OUTPUT_TOKENS, limit // CAP_STEP * CAP_STEP))
+
+
+def should_close(budget: Dict[str, Any], current_round: int) -> bool:
+    """Whether the round being ruled on must be the last: another would not fit the token budget."""
+    remaining = remaining_tokens(budget)
+    if remaining is None or current_round < 1:
+        return False
+    per_round = spent_tokens(budget) / current_round
+    return remaining < per_round * 1.5  # This ruling plus a whole further round
+
+
+def usage_summary(budget: Dict[str, Any], delta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Per-turn usage (from `delta`) and the debate's running totals, for transcript entries.
+
+    A finished debate's `debate_seconds` is its duration (so replays report
+    how long it took); only a running one is measured up to now.
+    """
+    summary = {}
+    if delta:
+        summary.update(
+            input_tokens=int(delta.get("input_tokens", 0)),
+            output_tokens=int(delta.get("output_tokens", 0)),
+            seconds=round(delta.get("model_seconds", 0.0), 2),
+        )
+    started, finished = budget.get("started_at"), budget.get("finished_at")
+    summary.update(
+        debate_tokens=spent_tokens(budget),
+        debate_seconds=round((finished or time.time()) - started, 2) if started else None,
+        tokens_left=remaining_tokens(budget),
+    )
+    return summary
+
+
+# --- Metering ---
+
+class UsageMeter:
+    """Usage of the model calls made inside one `metered()` scope."""
+
+    def __init__(self):
+        self.usage = {name: 0 for name in USAGE_FIELDS}
+
+    def add(self, input_tokens: int, output_tokens: int, seconds: float):
+        self.usage["input_tokens"] += input_tokens
+        self.usage["output_tokens"] += output_tokens
+        self.usage["calls"] += 1
+        self.usage["model_seconds"] += seconds
+
+    def as_update(self) -> Dict[str, Any]:
+        """Ledger delta for the node's state update."""
+        return dict(self.usage, model_seconds=round(self.usage["model_seconds"], 3))
+
+
+_meter: contextvars.ContextVar[Optional[UsageMeter]] = contextvars.ContextVar("roundtable_usage_meter", default=None)
+
+
+@contextmanager
+def metered() -> Iterator[UsageMeter]:
+    """Collect the usage of model calls made in this scope (including tasks it starts)."""
+    meter = UsageMeter()
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+
+
+def record_usage(usage: Optional[Dict[str, Any]], seconds: float, prompt_tokens: int = 0, output_tokens: int = 0):
+    """
+    Add one model call to the current meter (no-op outside `metered()`).
+
+    Provider-reported `usage` (usage_metadata) wins; the estimates are used
+    when the provider reported nothing.
+    """
+    meter = _meter.get()
+    if meter is None:
+        return
+    if usage:
+        meter.add(int(usage.get("input_tokens", 0)), int(usage.get("output_tokens", 0)), seconds)
+    else:
+        meter.add(prompt_tokens, output_tokens, seconds)
+
+
+# --- Benchmark ---
+
+async def _bench(debates: int) -> Dict[str, Any]:
+    from .backend import open_roundtable, run_demo
+
+    latencies, tokens, rounds = [], [], []
+    path = "bench_budget.db"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    async with open_roundtable(path) as app:
+        for i in range(debates):
+            start = time.perf_counter()
+            messages = await run_demo(f"Should I take a 6-month sabbatical to travel the world next year? (variant {i})", app=app)
+            latencies.append(time.perf_counter() - start)
+            tokens.append(messages[-1]["usage"]["debate_tokens"])
+            rounds.append(sum(1 for m in messages if m["agent"] == "TheChair"))
+    return {"latencies": latencies, "tokens": tokens, "rounds": rounds}
+
+
+def _bench_child(token_budget: int, debates: int, results):
+    os.environ["DEBATE_TOKEN_BUDGET"] = str(token_budget)
+    results.put(asyncio.run(_bench(debates)))
+
+
+def run_benchmark(debates: int = 5, token_budget: int = 12000):
+    """Tokens, rounds and latency per worst-case debate, with and without a token budget."""
+    import multiprocessing
+
+    os.environ["ROUNDTABLE_OFFLINE_LLM"] = "1"
+    os.environ.setdefault("OFFLINE_LLM_INPUT_SECONDS_PER_1K_TOKENS", "0.04")
+    ctx = multiprocessing.get_context("spawn")  # Settings are read at import time
+    print(f"💰 Worst-case debates (the offline Chair asks for every round it may), {debates} per configuration")
+    for label, budget in (("no budget", 0), (f"{token_budget} tokens", token_budget)):
+        queue = ctx.Queue()
+        child = ctx.Process(target=_bench_child, args=(budget, debates, queue))
+        child.start()
+        result = queue.get()
+        child.join()
+        print(f"   {label:<14} tokens avg {sum(result['tokens']) / debates:7.0f} max {max(result['tokens']):6d}  "
+              f"rounds {sum(result['rounds']) / debates:.1f}  latency avg {sum(result['latencies']) / debates:.2f}s "
+              f"max {max(result['latencies']):.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-debate budget governor")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Worst-case tokens and latency with and without a token budget")
+    bench_cmd.add_argument("--debates", type=int, default=5)
+    bench_cmd.add_argument("--token-budget", type=int, default=12000)
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(args.debates, args.token_budget)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,578 @@
+"""
+Checkpoint Store Maintenance for THE ROUNDTABLE
+
+Every debate runs on its own `debate_<uuid>` thread and LangGraph writes a
+checkpoint after every node, so `roundtable_demo.db` grows without bound. This
+module keeps it in check:
+
+- A small thread registry (`roundtable_threads`) records when each debate
+  started and finished, so maintenance knows which threads are done
+- Retention: threads older than CHECKPOINT_RETENTION_DAYS, or beyond the newest
+  CHECKPOINT_MAX_THREADS, are deleted outright
+- Compaction: finished threads keep only their latest checkpoint (enough to
+  re-read the transcript) instead of one per node
+- Shared workspace records (`ContextStore`, in the session store) that no
+  debate has stored or shared within the retention window are deleted: the
+  checkpoints that referenced them are gone
+- Space reclaim: in incremental auto-vacuum mode, freed pages are returned
+  after each pass. New databases start in that mode; an existing one is
+  switched over once, explicitly, with the `vacuum` command (it rewrites the
+  whole file, so it never happens as a side effect of a pass). A full VACUUM
+  is available from the CLI too
+
+Maintenance runs automatically after a debate at most once per
+CHECKPOINT_MAINTENANCE_INTERVAL seconds, on a worker thread with its own
+connection.
+
+CLI:
+    python -m src.checkpoint_maintenance stats [--threads 20]
+    python -m src.checkpoint_maintenance prune [--dry-run]
+    python -m src.checkpoint_maintenance vacuum [--full]
+    python -m src.checkpoint_maintenance bench [--debates 10000]
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+CHECKPOINT_RETENTION_DAYS = float(os.getenv("CHECKPOINT_RETENTION_DAYS", "30"))
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "1000"))
+CHECKPOINT_MAINTENANCE_INTERVAL = float(os.getenv("CHECKPOINT_MAINTENANCE_INTERVAL", "3600"))
+STALE_THREAD_SECONDS = 24 * 3600  # Unregistered threads idle this long are treated as finished
+INCREMENTAL_VACUUM_PAGES = 0  # 0 = release every free page
+
+logger = logging.getLogger(__name__)
+
+# uuid6 checkpoint ids embed a 100ns timestamp counted from the Gregorian epoch
+_UUID6_EPOCH_OFFSET = 0x01B21DD213814000
+
+REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roundtable_threads (
+    thread_id TEXT PRIMARY KEY,
+    question TEXT,
+    status TEXT NOT NULL DEFAULT 'running',
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS roundtable_maintenance (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_run_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class MaintenanceReport:
+    """Outcome of one maintenance pass."""
+    threads_deleted: int = 0
+    threads_compacted: int = 0
+    checkpoints_deleted: int = 0
+    writes_deleted: int = 0
+    workspace_contexts_deleted: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    seconds: float = 0.0
+
+
+def checkpoint_time(checkpoint_id: str) -> Optional[float]:
+    """Epoch seconds encoded in a uuid6 checkpoint id (None if it isn't one)."""
+    try:
+        value = int(checkpoint_id.replace("-", ""), 16)
+    except (AttributeError, ValueError):
+        return None
+    timestamp = ((value >> 80) << 12) | ((value >> 64) & 0x0FFF)
+    return (timestamp - _UUID6_EPOCH_OFFSET) / 1e7
+
+
+# --- Registry (written from run_demo on the checkpointer's connection) ---
+
+async def record_thread_started(conn, thread_id: str, question: str):
+    """Register a new debate thread (aiosqlite connection)."""
+    await conn.executescript(REGISTRY_SCHEMA)
+    await conn.execute(
+        "INSERT OR REPLACE INTO roundtable_threads (thread_id, question, status, created_at) VALUES (?, ?, 'running', ?)",
+        (thread_id, question, time.time()),
+    )
+    await conn.commit()
+
+
+async def record_thread_finished(conn, thread_id: str, status: str = "finished"):
+    """Mark a debate thread as finished so maintenance may compact it."""
+    await conn.execute(
+        "UPDATE roundtable_threads SET status = ?, finished_at = ? WHERE thread_id = ?",
+        (status, time.time(), thread_id),
+    )
+    await conn.commit()
+
+
+def thread_info(db_path: str, thread_id: str) -> Optional[Dict[str, Any]]:
+    """Registry row for a debate thread (question, status, timestamps), or None."""
+    if not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute("SELECT * FROM roundtable_threads WHERE thread_id = ?", (thread_id,)).fetchone()
+    except sqlite3.OperationalError:
+        return None  # No debate has registered yet
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
+# --- Maintenance (synchronous, own connection) ---
+
+def connect(db_path: str, read_only: bool = False) -> sqlite3.Connection:
+    """
+    Open the checkpoint DB for maintenance (never rewrites the file).
+
+    Args:
+        db_path: Path to the checkpoint database
+        read_only: Open without write access (dry runs, stats); nothing is created
+    """
+    if read_only:
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+    conn = sqlite3.connect(db_path, timeout=30)
+    if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # Free on an empty file; later it takes a VACUUM
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(REGISTRY_SCHEMA)
+    return conn
+
+
+def _incremental(conn: sqlite3.Connection) -> bool:
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def _incremental_vacuum(conn: sqlite3.Connection):
+    if not _incremental(conn):
+        return  # Not converted yet (see `vacuum`): freed pages stay in the file for reuse
+    # executescript steps the pragma to completion; Cursor.execute frees one page per call
+    conn.executescript(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES});")
+
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def _has_checkpoint_tables(conn: sqlite3.Connection) -> bool:
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return {"checkpoints", "writes"} <= names
+
+
+def _has_delta_tables(conn: sqlite3.Connection) -> bool:
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return {"checkpoint_messages", "checkpoint_blobs", "checkpoint_blob_refs"} <= names
+
+
+def _db_bytes(db_path: str) -> int:
+    return sum(os.path.getsize(path) for path in (db_path, db_path + "-wal") if os.path.exists(path))
+
+
+def _registry(conn: sqlite3.Connection) -> Dict[str, str]:
+    """Status per registered thread ({} before any debate registered)."""
+    if not _has_table(conn, "roundtable_threads"):
+        return {}
+    return {row[0]: row[1] for row in conn.execute("SELECT thread_id, status FROM roundtable_threads")}
+
+
+def _thread_last_seen(conn: sqlite3.Connection) -> Dict[str, float]:
+    """Latest checkpoint time per thread."""
+    last_seen = {}
+    for thread_id, checkpoint_id in conn.execute("SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id"):
+        last_seen[thread_id] = checkpoint_time(checkpoint_id) or 0.0
+    return last_seen
+
+
+def _delete_threads(conn: sqlite3.Connection, thread_ids: List[str], report: MaintenanceReport, dry_run: bool = False):
+    # One set-based delete per table instead of a round trip per thread (the temp table works read-only too)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS expired_threads (thread_id TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM expired_threads")
+    conn.executemany("INSERT OR IGNORE INTO expired_threads VALUES (?)", ((t,) for t in thread_ids))
+    if dry_run:
+        for table in ("checkpoints", "writes"):
+            count = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE thread_id IN (SELECT thread_id FROM expired_threads)"
+            ).fetchone()[0]
+            if table == "checkpoints":
+                report.checkpoints_deleted += count
+            else:
+                report.writes_deleted += count
+        report.threads_deleted += len(thread_ids)
+        return
+    report.checkpoints_deleted += conn.execute(
+        "DELETE FROM checkpoints WHERE thread_id IN (SELECT thread_id FROM expired_threads)"
+    ).rowcount
+    report.writes_deleted += conn.execute(
+        "DELETE FROM writes WHERE thread_id IN (SELECT thread_id FROM expired_threads)"
+    ).rowcount
+    conn.execute("DELETE FROM roundtable_threads WHERE thread_id IN (SELECT thread_id FROM expired_threads)")
+    if _has_delta_tables(conn):
+        # Messages and blob refs stored by DeltaSqliteSaver; blobs go once no thread refers to them
+        for table in ("checkpoint_messages", "checkpoint_blob_refs"):
+            conn.execute(f"DELETE FROM {table} WHERE thread_id IN (SELECT thread_id FROM expired_threads)")
+        conn.execute("DELETE FROM checkpoint_blobs WHERE hash NOT IN (SELECT hash FROM checkpoint_blob_refs)")
+    report.threads_deleted += len(thread_ids)
+
+
+def _compact_thread(conn: sqlite3.Connection, thread_id: str, report: MaintenanceReport, dry_run: bool = False) -> bool:
+    """Keep only the latest checkpoint (per namespace) of a finished thread."""
+    if dry_run:
+        deleted = conn.execute(
+            """SELECT COUNT(*) FROM checkpoints WHERE thread_id = ? AND checkpoint_id NOT IN (
+                   SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? GROUP BY checkpoint_ns)""",
+            (thread_id, thread_id),
+        ).fetchone()[0]
+        report.writes_deleted += conn.execute(
+            """SELECT COUNT(*) FROM writes WHERE thread_id = ? AND checkpoint_id NOT IN (
+                   SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? GROUP BY checkpoint_ns)""",
+            (thread_id, thread_id),
+        ).fetchone()[0]
+        report.checkpoints_deleted += deleted
+        return deleted > 0
+    deleted = conn.execute(
+        """DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id < (
+               SELECT MAX(c.checkpoint_id) FROM checkpoints c
+               WHERE c.thread_id = checkpoints.thread_id AND c.checkpoint_ns = checkpoints.checkpoint_ns)""",
+        (thread_id,),
+    ).rowcount
+    report.writes_deleted += conn.execute(
+        """DELETE FROM writes WHERE thread_id = ? AND checkpoint_id NOT IN (
+               SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?)""",
+        (thread_id, thread_id),
+    ).rowcount
+    report.checkpoints_deleted += deleted
+    return deleted > 0
+
+
+def run_maintenance(
+    db_path: str,
+    retention_days: float = CHECKPOINT_RETENTION_DAYS,
+    max_threads: int = CHECKPOINT_MAX_THREADS,
+    dry_run: bool = False,
+    context_store: Optional[Any] = None,
+) -> MaintenanceReport:
+    """
+    Apply retention, compact finished threads and release free pages.
+
+    Args:
+        db_path: Path to the checkpoint database
+        retention_days: Delete threads whose last checkpoint is older than this
+        max_threads: Keep at most this many threads (newest first)
+        dry_run: Report what would be removed, on a read-only connection
+        context_store: ContextStore whose workspace records expire with the threads
+
+    Returns:
+        MaintenanceReport with counts and file size before/after
+    """
+    start = time.perf_counter()
+    report = MaintenanceReport(bytes_before=_db_bytes(db_path))
+    if context_store is not None:
+        # A day of slack: records are stored as a debate starts, its last checkpoint comes later
+        report.workspace_contexts_deleted = context_store.prune((retention_days + 1) * 86400, dry_run)
+    if dry_run and not os.path.exists(db_path):
+        report.bytes_after = report.bytes_before
+        return report
+    conn = connect(db_path, read_only=dry_run)
+    try:
+        if not _has_checkpoint_tables(conn):
+            report.bytes_after = report.bytes_before
+            return report
+
+        now = time.time()
+        last_seen = _thread_last_seen(conn)
+        registry = _registry(conn)
+
+        # 1. Retention by age, then by count (newest threads survive)
+        cutoff = now - retention_days * 86400
+        expired = [t for t, seen in last_seen.items() if seen < cutoff]
+        survivors = sorted((t for t, seen in last_seen.items() if seen >= cutoff), key=last_seen.get, reverse=True)
+        expired += survivors[max_threads:]
+        _delete_threads(conn, expired, report, dry_run)
+
+        # 2. Compaction of finished threads
+        for thread_id in survivors[:max_threads]:
+            status = registry.get(thread_id)
+            finished = status not in (None, "running") or (
+                status is None and now - last_seen[thread_id] > STALE_THREAD_SECONDS
+            )
+            if finished and _compact_thread(conn, thread_id, report, dry_run):
+                report.threads_compacted += 1
+
+        if not dry_run:
+            conn.execute(
+                "INSERT OR REPLACE INTO roundtable_maintenance (id, last_run_at) VALUES (1, ?)", (now,)
+            )
+            conn.commit()
+            # 3. Hand freed pages back to the filesystem
+            _incremental_vacuum(conn)
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+    report.bytes_after = _db_bytes(db_path)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+_maintenance_lock = threading.Lock()
+
+
+def schedule_maintenance(db_path: str):
+    """
+    Run a maintenance pass on a daemon thread if one is due and none is running.
+    
+    Design: Called after each debate; the interval check keeps the cost to one
+    small query per debate, and the worker thread keeps pruning and vacuuming
+    off the event loop.
+    """
+    if _maintenance_lock.locked() or not maintenance_due(db_path):
+        return
+
+    def worker():
+        from .session_memory import get_context_store
+
+        if not _maintenance_lock.acquire(blocking=False):
+            return
+        try:
+            report = run_maintenance(db_path, context_store=get_context_store())
+            logger.info(f"🧹 Checkpoint maintenance: {asdict(report)}")
+        except sqlite3.Error as e:
+            logger.error(f"Checkpoint maintenance failed: {e}")
+        finally:
+            _maintenance_lock.release()
+
+    threading.Thread(target=worker, name="checkpoint-maintenance", daemon=True).start()
+
+
+def maintenance_due(db_path: str, interval: float = CHECKPOINT_MAINTENANCE_INTERVAL) -> bool:
+    """Whether the last maintenance pass is older than `interval` seconds."""
+    if not os.path.exists(db_path):
+        return False
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.executescript(REGISTRY_SCHEMA)
+        row = conn.execute("SELECT last_run_at FROM roundtable_maintenance WHERE id = 1").fetchone()
+    finally:
+        conn.close()
+    return row is None or time.time() - row[0] >= interval
+
+
+def vacuum(db_path: str, full: bool = False):
+    """
+    Release free pages (incremental) or rebuild the whole file (full).
+
+    A database not yet in incremental auto-vacuum mode is switched to it here,
+    which takes one full rewrite (and blocks writers while it runs).
+    """
+    conn = connect(db_path)
+    try:
+        if not _incremental(conn):
+            logger.info("🧹 Switching the checkpoint DB to incremental auto-vacuum (one full VACUUM)")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            full = True  # The mode change only takes effect through a VACUUM
+        if full:
+            conn.execute("VACUUM")
+        else:
+            _incremental_vacuum(conn)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def store_stats(db_path: str, top_threads: int = 20) -> Dict[str, Any]:
+    """
+    Size and per-thread statistics for the checkpoint DB.
+
+    Returns:
+        Dict with file size, page usage, row counts and the largest threads
+    """
+    conn = connect(db_path, read_only=True)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        stats: Dict[str, Any] = {
+            "file_bytes": _db_bytes(db_path),
+            "page_count": conn.execute("PRAGMA page_count").fetchone()[0],
+            "free_pages": conn.execute("PRAGMA freelist_count").fetchone()[0],
+            "page_size": page_size,
+            "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}[conn.execute("PRAGMA auto_vacuum").fetchone()[0]],
+            "threads": 0,
+            "checkpoints": 0,
+            "writes": 0,
+            "largest_threads": [],
+        }
+        if not _has_checkpoint_tables(conn):
+            return stats
+
+        stats["checkpoints"] = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        stats["writes"] = conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+        registry = _registry(conn)
+        per_thread = conn.execute(
+            """SELECT c.thread_id, COUNT(*), MIN(c.checkpoint_id), MAX(c.checkpoint_id),
+                      SUM(LENGTH(c.checkpoint) + IFNULL(LENGTH(c.metadata), 0)),
+                      (SELECT COUNT(*) FROM writes w WHERE w.thread_id = c.thread_id),
+                      (SELECT IFNULL(SUM(LENGTH(w.value)), 0) FROM writes w WHERE w.thread_id = c.thread_id)
+               FROM checkpoints c GROUP BY c.thread_id"""
+        ).fetchall()
+        stats["threads"] = len(per_thread)
+        rows = []
+        for thread_id, count, first_id, last_id, ckpt_bytes, write_count, write_bytes in per_thread:
+            rows.append({
+                "thread_id": thread_id,
+                "status": registry.get(thread_id, "unregistered"),
+                "checkpoints": count,
+                "writes": write_count,
+                "bytes": (ckpt_bytes or 0) + write_bytes,
+                "first_at": checkpoint_time(first_id),
+                "last_at": checkpoint_time(last_id),
+            })
+        rows.sort(key=lambda r: r["bytes"], reverse=True)
+        stats["largest_threads"] = rows[:top_threads]
+        return stats
+    finally:
+        conn.close()
+
+
+def _print_stats(stats: Dict[str, Any]):
+    print(f"📦 File size: {stats['file_bytes'] / 1e6:.2f} MB "
+          f"({stats['page_count']} pages × {stats['page_size']} B, {stats['free_pages']} free, auto_vacuum={stats['auto_vacuum']})")
+    print(f"🧵 Threads: {stats['threads']}  Checkpoints: {stats['checkpoints']}  Writes: {stats['writes']}")
+    if stats["largest_threads"]:
+        print(f"\n{'thread_id':<24} {'status':<13} {'ckpts':>6} {'writes':>7} {'KB':>9}  last checkpoint")
+        for row in stats["largest_threads"]:
+            last = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["last_at"])) if row["last_at"] else "?"
+            print(f"{row['thread_id']:<24} {row['status']:<13} {row['checkpoints']:>6} {row['writes']:>7} {row['bytes'] / 1024:>9.1f}  {last}")
+
+
+# --- Benchmark ---
+
+def _bench_insert_debate(conn: sqlite3.Connection, thread_id: str, started_at: float, nodes: int, base_bytes: int) -> float:
+    """Write one synthetic debate the way AsyncSqliteSaver does; returns mean seconds per checkpoint."""
+    elapsed = 0.0
+    parent = None
+    for step in range(nodes):
+        ts = int((started_at + step) * 1e7) + _UUID6_EPOCH_OFFSET
+        value = ((ts >> 12) << 80) | (0x6 << 76) | ((ts & 0x0FFF) << 64) | (0x8 << 60) | step
+        hex_id = f"{value:032x}"
+        checkpoint_id = f"{hex_id[:8]}-{hex_id[8:12]}-{hex_id[12:16]}-{hex_id[16:20]}-{hex_id[20:]}"
+        # Full transcript re-serialized each step, as with the default serializer
+        blob = os.urandom(base_bytes * (step + 1))
+        start = time.perf_counter()
+        conn.execute(
+            "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata) VALUES (?, '', ?, ?, 'msgpack', ?, ?)",
+            (thread_id, checkpoint_id, parent, blob, b'{"source": "loop"}'),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) VALUES (?, '', ?, 'task', 0, 'messages', 'msgpack', ?)",
+            (thread_id, checkpoint_id, blob[:base_bytes]),
+        )
+        conn.commit()
+        elapsed += time.perf_counter() - start
+        parent = checkpoint_id
+    return elapsed / nodes
+
+
+def run_benchmark(debates: int = 10000, nodes: int = 8, base_bytes: int = 2048, db_path: str = "bench_checkpoints.db"):
+    """
+    Fill a scratch DB with `debates` synthetic debates, then measure maintenance.
+
+    Reports file size and per-checkpoint write latency before and after a
+    maintenance pass with the default retention settings.
+    """
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    conn = connect(db_path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL DEFAULT '', checkpoint_id TEXT NOT NULL,
+            parent_checkpoint_id TEXT, type TEXT, checkpoint BLOB, metadata BLOB,
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id));
+        CREATE TABLE IF NOT EXISTS writes (
+            thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL DEFAULT '', checkpoint_id TEXT NOT NULL,
+            task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, type TEXT, value BLOB,
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx));
+    """)
+
+    print(f"⏳ Writing {debates} synthetic debates ({nodes} checkpoints each)...")
+    now = time.time()
+    first_latency = last_latency = 0.0
+    for i in range(debates):
+        thread_id = f"debate_{i:08x}"
+        # Spread debates over the last 60 days so age-based retention has work to do
+        started_at = now - 60 * 86400 * (debates - i) / debates
+        conn.execute(
+            "INSERT INTO roundtable_threads (thread_id, question, status, created_at, finished_at) VALUES (?, 'bench', 'finished', ?, ?)",
+            (thread_id, started_at, started_at + nodes),
+        )
+        latency = _bench_insert_debate(conn, thread_id, started_at, nodes, base_bytes)
+        if i < 100:
+            first_latency += latency / 100
+        if i >= debates - 100:
+            last_latency += latency / 100
+    conn.close()
+
+    before = _db_bytes(db_path)
+    report = run_maintenance(db_path)
+
+    conn = connect(db_path)
+    after_latency = sum(
+        _bench_insert_debate(conn, f"after_{i}", time.time(), nodes, base_bytes) for i in range(100)
+    ) / 100
+    conn.close()
+
+    print(f"\n📊 Checkpoint store benchmark ({debates} debates)")
+    print(f"   Size before maintenance: {before / 1e6:.1f} MB")
+    print(f"   Size after maintenance:  {report.bytes_after / 1e6:.1f} MB ({report.seconds:.1f}s)")
+    print(f"   Threads deleted: {report.threads_deleted}, compacted: {report.threads_compacted}, "
+          f"checkpoints removed: {report.checkpoints_deleted}")
+    print(f"   Write latency per checkpoint: first 100 debates {first_latency * 1000:.2f} ms, "
+          f"last 100 {last_latency * 1000:.2f} ms, after maintenance {after_latency * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain THE ROUNDTABLE checkpoint database")
+    parser.add_argument("--db", default=os.getenv("ROUNDTABLE_DB_PATH", "roundtable_demo.db"), help="Checkpoint DB path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    stats_cmd = sub.add_parser("stats", help="Report size and per-thread stats")
+    stats_cmd.add_argument("--threads", type=int, default=20, help="Largest threads to list")
+
+    prune_cmd = sub.add_parser("prune", help="Apply retention and compact finished threads")
+    prune_cmd.add_argument("--dry-run", action="store_true")
+    prune_cmd.add_argument("--retention-days", type=float, default=CHECKPOINT_RETENTION_DAYS)
+    prune_cmd.add_argument("--max-threads", type=int, default=CHECKPOINT_MAX_THREADS)
+
+    vacuum_cmd = sub.add_parser("vacuum", help="Release free pages (switches an existing DB to incremental mode once)")
+    vacuum_cmd.add_argument("--full", action="store_true", help="Rebuild the whole file (blocks writers)")
+
+    bench_cmd = sub.add_parser("bench", help="Benchmark maintenance on synthetic debates")
+    bench_cmd.add_argument("--debates", type=int, default=10000)
+    bench_cmd.add_argument("--bench-db", default="bench_checkpoints.db")
+
+    args = parser.parse_args()
+    if args.command == "stats":
+        _print_stats(store_stats(args.db, args.threads))
+    elif args.command == "prune":
+        from .session_memory import get_context_store
+
+        report = run_maintenance(
+            args.db, args.retention_days, args.max_threads, dry_run=args.dry_run, context_store=get_context_store()
+        )
+        print(("🔎 Dry run: " if args.dry_run else "🧹 ") + ", ".join(f"{k}={v}" for k, v in asdict(report).items()))
+    elif args.command == "vacuum":
+        before = _db_bytes(args.db)
+        vacuum(args.db, full=args.full)
+        print(f"🧹 {before / 1e6:.2f} MB → {_db_bytes(args.db) / 1e6:.2f} MB")
+    elif args.command == "bench":
+        run_benchmark(args.debates, db_path=args.bench_db)
+
+
+if __name__ == "__main__":
+    main()
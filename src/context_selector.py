@@ -0,0 +1,402 @@
+"""
+Query-Aware Context Selection for THE ROUNDTABLE
+
+Marcus used to receive every project plus the first ten calendar events,
+which are mostly "Team Standup", whatever the question. This module picks
+the workspace records that matter for the current turn instead:
+
+- Every project, task, upcoming event and note becomes a `ContextItem` with
+  a provenance id ("project:proj-001", "event:event-deadline-1", ...) that
+  stays on the record in the prompt, so a claim can be traced to its source
+- Items are scored against the question and the turn being answered (e.g.
+  Aria's proposal for Marcus, the round's arguments for the Chair): BM25
+  over the item text, question terms weighted above turn terms, plus a small
+  prior for high-priority / critical / urgent records
+- With CONTEXT_EMBEDDING_MODEL set (a sentence-transformers model name) and
+  the package installed, cosine similarity from local embeddings is blended in
+- The best items are packed greedily into a token budget
+  (CONTEXT_TOKEN_BUDGET for ground-truth panelists, CHAIR_CONTEXT_TOKEN_BUDGET
+  for the Chair's evidence, 0 disables it)
+
+The index (term statistics, embeddings) is built once per workspace snapshot
+(the report's content-addressed `workspace_ref`) and shared by every turn of
+every debate on it, so selection stays fast with thousands of workspace items.
+
+Inspect a selection, or time selection on a synthetic workspace:
+    python -m src.context_selector explain "Should I take a sabbatical next year?"
+    python -m src.context_selector bench [--items 100,1000,10000]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+CHAIR_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAIR_CONTEXT_TOKEN_BUDGET", "400"))
+CONTEXT_EMBEDDING_MODEL = os.getenv("CONTEXT_EMBEDDING_MODEL", "")
+INDEX_CACHE_SIZE = 16
+
+QUESTION_WEIGHT = 1.0
+TURN_WEIGHT = 0.4  # The turn is long and noisy; the question says what matters
+EMBEDDING_WEIGHT = 0.5
+PRIORITY_PRIOR = 0.15  # Relative to the best lexical match
+BM25_K1, BM25_B = 1.2, 0.75
+
+# Record kind -> (context_data key, provenance prefix, prompt field)
+KINDS = (
+    ("projects", "project", "projects"),
+    ("tasks", "task", "tasks"),
+    ("calendar_events", "event", "calendar_events"),
+    ("notes", "note", "notes"),
+)
+PRIORITY_VALUES = {"high", "critical", "urgent"}
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in into is it its me my "
+    "next of on or our should so than that the their them then there these this to up was we what "
+    "when where which who why will with would you your".split()
+)
+_WORD = re.compile(r"[a-z0-9]+")
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word stems (crude plural stripping), without stopwords."""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if word in _STOPWORDS or len(word) < 2:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (4 characters per token), as in the prefix cache."""
+    return max(1, len(text) // 4)
+
+
+@dataclass(frozen=True)
+class ContextItem:
+    """
+    One workspace record as it would appear in a prompt.
+
+    Attributes:
+        source: Provenance id, "<kind>:<record id>"
+        field: Prompt field the record is rendered into
+        record: The record, with `source` as its first key
+        rendered: Compact JSON of `record`
+        tokens: Estimated prompt tokens of `rendered`
+        prior: Score bonus for high-priority / critical records
+    """
+    source: str
+    field: str
+    record: Dict[str, Any]
+    rendered: str
+    tokens: int
+    prior: float
+
+
+@dataclass(frozen=True)
+class Selection:
+    """Items chosen for one turn, best first, and what the full context would have cost."""
+    items: Tuple[ContextItem, ...]
+    tokens: int
+    candidate_tokens: int
+    candidates: int
+
+    @property
+    def sources(self) -> List[str]:
+        return [item.source for item in self.items]
+
+    def fields(self) -> Dict[str, str]:
+        """Prompt fields: one JSON line per selected record, grouped by kind."""
+        grouped: Dict[str, List[str]] = {name: [] for _, _, name in KINDS}
+        for item in self.items:
+            grouped[item.field].append(item.rendered)
+        return {name: "\n".join(lines) if lines else "(nothing relevant)" for name, lines in grouped.items()}
+
+    def render(self) -> str:
+        """All selected records as one block (the Chair's evidence)."""
+        return "\n".join(item.rendered for item in self.items)
+
+
+def workspace_items(context: Dict[str, Any]) -> List[ContextItem]:
+    """Turn a Chief of Staff `context_data` dict into scoreable items."""
+    items = []
+    for key, prefix, field in KINDS:
+        records = context.get(key) or []
+        if isinstance(records, dict):  # calendar_events: {"events": [...], "total": ..., "summary": ...}
+            records = records.get("events", [])
+        for record in records:
+            source = f"{prefix}:{record.get('id', len(items))}"
+            tagged = {"source": source, **{k: v for k, v in record.items() if k != "id"}}
+            rendered = json.dumps(tagged, ensure_ascii=False, default=str)
+            prior = PRIORITY_PRIOR if str(record.get("priority") or record.get("status") or "").lower() in PRIORITY_VALUES else 0.0
+            items.append(ContextItem(source, field, tagged, rendered, estimate_tokens(rendered), prior))
+    return items
+
+
+def _item_text(item: ContextItem) -> str:
+    return " ".join(str(v) for k, v in item.record.items() if k != "source")
+
+
+class _Embedder:
+    """Optional local sentence embeddings (sentence-transformers), loaded on first use."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+        self._failed = not model_name
+        self._lock = threading.Lock()
+
+    def encode(self, texts: Sequence[str]):
+        if self._failed:
+            return None
+        with self._lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+                except Exception as e:  # Not installed, or the model can't be loaded: lexical only
+                    logger.warning(f"🧭 Embeddings disabled ({self.model_name}): {e!r}")
+                    self._failed = True
+                    return None
+        return self._model.encode(list(texts), normalize_embeddings=True)
+
+
+class ContextIndex:
+    """BM25 statistics (and optional embeddings) over one context's items."""
+
+    def __init__(self, items: List[ContextItem], embedder: Optional[_Embedder] = None):
+        self.items = items
+        self.embedder = embedder
+        self._terms = [Counter(tokenize(_item_text(item))) for item in items]
+        self._lengths = [sum(terms.values()) for terms in self._terms]
+        self._avg_length = (sum(self._lengths) / len(items)) if items else 1.0
+        doc_freq = Counter(term for terms in self._terms for term in terms)
+        self._idf = {term: math.log(1 + (len(items) - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+        # Inverted index: only items sharing a query term are scored
+        self._postings: Dict[str, List[int]] = {}
+        for i, terms in enumerate(self._terms):
+            for term in terms:
+                self._postings.setdefault(term, []).append(i)
+        self._vectors = embedder.encode([_item_text(item) for item in items]) if embedder and items else None
+
+    def scores(self, query: Dict[str, float], query_text: str = "") -> List[float]:
+        """Relevance of every item to weighted query terms, normalised to the best match."""
+        lexical = [0.0] * len(self.items)
+        for term, weight in query.items():
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i in self._postings[term]:
+                tf = self._terms[i][term]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[i] / self._avg_length)
+                lexical[i] += weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = max(lexical, default=0.0) or 1.0
+        scores = [score / best + item.prior for score, item in zip(lexical, self.items)]
+        if self._vectors is not None and query_text:
+            query_vector = self.embedder.encode([query_text])
+            if query_vector is not None:
+                similarities = self._vectors @ query_vector[0]
+                scores = [s + EMBEDDING_WEIGHT * max(0.0, float(sim)) for s, sim in zip(scores, similarities)]
+        return scores
+
+
+class ContextSelector:
+    """Picks the most relevant workspace records for a turn within a token budget."""
+
+    def __init__(self, embedding_model: str = CONTEXT_EMBEDDING_MODEL, embedder: Optional[_Embedder] = None):
+        # Selectors may share one embedder (the model is loaded once per process)
+        self.embedder = embedder or (_Embedder(embedding_model) if embedding_model else None)
+        self.counters: Counter = Counter()
+        self._indexes: "OrderedDict[Any, ContextIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index(self, context: Dict[str, Any]) -> ContextIndex:
+        """
+        The index for a context report, built once per workspace content and then
+        shared: keyed by the content-addressed `workspace_ref`, so follow-ups and
+        concurrent debates on the same snapshot reuse it (the report's timestamp
+        for contexts that carry their records inline).
+        """
+        key = context.get("workspace_ref") or context.get("timestamp")
+        with self._lock:
+            index = self._indexes.get(key) if key is not None else None
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        index = ContextIndex(workspace_items(context), self.embedder)
+        self.counters["indexes_built"] += 1
+        if key is not None:
+            with self._lock:
+                self._indexes[key] = index
+                while len(self._indexes) > INDEX_CACHE_SIZE:
+                    self._indexes.popitem(last=False)
+        return index
+
+    def select(self, context: Dict[str, Any], question: str, turn: str = "", budget: int = CONTEXT_TOKEN_BUDGET) -> Selection:
+        """
+        Score every item against the question and turn, then pack the best into `budget`.
+
+        Args:
+            context: Chief of Staff `context_data`
+            question: The user's question
+            turn: Text the agent is responding to (may be empty)
+            budget: Maximum estimated tokens of selected records
+
+        Returns:
+            Selection of the highest-scoring items that fit, best first;
+            items with no relevance and no priority are never included
+        """
+        index = self.index(context)
+        query: Dict[str, float] = {}
+        for text, weight in ((question, QUESTION_WEIGHT), (turn, TURN_WEIGHT)):
+            for term, count in Counter(tokenize(text)).items():
+                query[term] = query.get(term, 0.0) + weight * (1 + math.log(count))
+        scores = index.scores(query, f"{question}\n{turn}".strip())
+
+        chosen, used = [], 0
+        for i in sorted(range(len(index.items)), key=lambda i: -scores[i]):
+            if scores[i] <= 0 or used >= budget:
+                break
+            item = index.items[i]
+            if used + item.tokens <= budget:
+                chosen.append(item)
+                used += item.tokens
+
+        selection = Selection(tuple(chosen), used, sum(item.tokens for item in index.items), len(index.items))
+        self.counters["selections"] += 1
+        self.counters["tokens_selected"] += selection.tokens
+        self.counters["tokens_available"] += selection.candidate_tokens
+        return selection
+
+    def cached_indexes(self) -> List[ContextIndex]:
+        with self._lock:
+            return list(self._indexes.values())
+
+    def clear(self):
+        """Drop every cached index (memory pressure); they are rebuilt on the next selection."""
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Selections made and the share of available context tokens actually sent."""
+        counters = dict(self.counters)
+        available = counters.get("tokens_available", 0)
+        counters["sent_share"] = round(counters.get("tokens_selected", 0) / available, 3) if available else 0.0
+        return counters
+
+
+_selector: Optional[ContextSelector] = None
+_selector_lock = threading.Lock()
+
+
+def get_context_selector() -> ContextSelector:
+    """Process-wide selector (shares indexes across the debate's turns)."""
+    global _selector
+    with _selector_lock:
+        if _selector is None:
+            _selector = ContextSelector()
+        return _selector
+
+
+# --- CLI ---
+
+def _mock_context() -> Dict[str, Any]:
+    from .mock_data import get_mock_data
+
+    workspace = get_mock_data()
+    return {
+        "projects": workspace.get_all_projects(),
+        "tasks": workspace.get_all_tasks(),
+        "calendar_events": workspace.get_calendar_events(days_ahead=30),
+        "notes": workspace.notes,
+        "timestamp": "mock",
+    }
+
+
+def _synthetic_context(size: int) -> Dict[str, Any]:
+    import random
+
+    rng = random.Random(size)
+    words = ("budget launch hiring travel sabbatical renovation course deadline investor review client "
+             "marketing visa flights savings mortgage contractor conference offsite product roadmap").split()
+    per_kind = max(1, size // 4)
+    return {
+        "projects": [{"id": f"proj-{i}", "title": " ".join(rng.sample(words, 3)).title(), "priority": rng.choice(["High", "Medium", "Low"]),
+                      "budget": f"${rng.randint(1, 200) * 1000:,}", "description": " ".join(rng.sample(words, 8))} for i in range(per_kind)],
+        "tasks": [{"id": f"task-{i}", "title": " ".join(rng.sample(words, 4)), "status": rng.choice(["Todo", "Urgent", "In Progress"])} for i in range(per_kind)],
+        "calendar_events": {"events": [{"id": f"event-{i}", "title": rng.choice(["Team Standup", " ".join(rng.sample(words, 3))]),
+                                        "date": f"2026-01-{1 + i % 28:02d}", "type": rng.choice(["Meeting", "Deadline"])} for i in range(per_kind)]},
+        "notes": [{"id": f"note-{i}", "title": " ".join(rng.sample(words, 2)), "content": " ".join(rng.sample(words, 12))} for i in range(per_kind)],
+        "timestamp": f"synthetic-{size}",
+    }
+
+
+def _legacy_tokens(context: Dict[str, Any]) -> int:
+    # Marcus's ground truth before selection: every project plus the first ten events
+    return estimate_tokens(json.dumps(context.get("projects", []), indent=2)) + \
+        estimate_tokens(json.dumps(context.get("calendar_events", {}).get("events", [])[:10], indent=2))
+
+
+def explain(question: str, turn: str = "", budget: int = CONTEXT_TOKEN_BUDGET):
+    """Print what Marcus would be shown for `question` on the mock workspace."""
+    context = _mock_context()
+    selector = ContextSelector()
+    selection = selector.select(context, question, turn, budget)
+    print(f"🧭 {len(selection.items)}/{selection.candidates} items, {selection.tokens} tokens "
+          f"(budget {budget}; all items {selection.candidate_tokens}, previous ground truth {_legacy_tokens(context)})")
+    for item in selection.items:
+        print(f"   {item.source:<28} {item.tokens:>4} tok  {item.record.get('title', '')}")
+
+
+def run_benchmark(sizes=(100, 1000, 10000), budget: int = CONTEXT_TOKEN_BUDGET, turns: int = 6):
+    """Index build and per-turn selection time at growing workspace sizes."""
+    question = "Should I take a sabbatical to travel while the product launch budget is under review?"
+    turn = "Aria proposes a six month sabbatical, flights in spring, and hiring a contractor to cover the launch."
+    print(f"🧭 Context selection (budget {budget} tokens, {turns} turns per debate)")
+    for size in sizes:
+        context = _synthetic_context(size)
+        selector = ContextSelector()
+        start = time.perf_counter()
+        selector.index(context)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(turns):
+            selection = selector.select(context, question, turn, budget)
+        per_turn = (time.perf_counter() - start) / turns
+        print(f"   {size:>6} items: index {built * 1000:7.1f} ms  select {per_turn * 1000:6.2f} ms/turn  "
+              f"sent {selection.tokens:>5} tok of {selection.candidate_tokens:>7} "
+              f"(all projects + 10 events: {_legacy_tokens(context)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query-aware context selection")
+    sub = parser.add_subparsers(dest="command", required=True)
+    explain_cmd = sub.add_parser("explain", help="Show the records selected for a question (mock workspace)")
+    explain_cmd.add_argument("question")
+    explain_cmd.add_argument("--turn", default="", help="Text of the turn being answered")
+    explain_cmd.add_argument("--budget", type=int, default=CONTEXT_TOKEN_BUDGET)
+    bench_cmd = sub.add_parser("bench", help="Selection time and tokens at growing workspace sizes")
+    bench_cmd.add_argument("--items", default="100,1000,10000")
+    bench_cmd.add_argument("--budget", type=int, default=CONTEXT_TOKEN_BUDGET)
+    args = parser.parse_args()
+    if args.command == "explain":
+        explain(args.question, args.turn, args.budget)
+    elif args.command == "bench":
+        run_benchmark(tuple(int(s) for s in args.items.split(",")), args.budget)
+
+
+if __name__ == "__main__":
+    main()
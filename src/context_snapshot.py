@@ -0,0 +1,273 @@
+"""
+Workspace Context Snapshots for THE ROUNDTABLE
+
+The Chief of Staff used to re-read the whole workspace for every debate (all
+projects, all tasks, the 30-day calendar) and recompute the report's summary
+figures. With a real Notion workspace each of those reads is an API call,
+even when nothing changed since the last debate. This module keeps the last
+context instead:
+
+- A `ContextSnapshot` holds the items, the upcoming-event window and the
+  summary stats, stamped with the workspace revision it reflects
+- Unchanged workspace (same revision, same day): the snapshot is reused as
+  is, with no reads at all
+- Changed workspace: only the items edited since the snapshot's revision are
+  applied (`changes_since`), and only the affected stats are updated: project
+  figures by subtracting the old item's contribution and adding the new one,
+  the event window only when events changed or the day rolled over
+- When the change log cannot tell what changed, everything is reloaded
+
+Search results depend on the question, so they are still read per debate.
+
+Compare workspace reads across debates, full refetch vs snapshots:
+    python -m src.context_snapshot bench [--debates 50] [--edit-every 10] [--call-ms 150]
+"""
+
+import argparse
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+UPCOMING_EVENT_DAYS = 30
+
+PROJECT_STATS = ("project_count", "high_priority_count", "total_budget")
+
+
+def _budget(project: Dict[str, Any]) -> int:
+    budget = project.get("budget")
+    return int(budget.replace("$", "").replace(",", "")) if budget else 0
+
+
+def _project_stats(project: Dict[str, Any]) -> Tuple[int, int, int]:
+    """One project's contribution to (project_count, high_priority_count, total_budget)."""
+    return 1, int(project.get("priority") == "High"), _budget(project)
+
+
+def _event_window(events: Dict[str, Dict[str, Any]], day: str, days_ahead: int) -> Dict[str, Any]:
+    cutoff = (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+    upcoming = [e for e in events.values() if e["date"] <= cutoff]
+    return {
+        "events": upcoming,
+        "total": len(upcoming),
+        "summary": f"{len(upcoming)} events in the next {days_ahead} days",
+    }
+
+
+@dataclass(frozen=True)
+class ContextSnapshot:
+    """
+    The workspace as of `revision`, with its report figures precomputed.
+
+    Attributes:
+        revision: Workspace revision the snapshot reflects
+        day: Date the upcoming-event window was computed for
+        projects / tasks / events: Items by id, in workspace order
+        calendar: Upcoming-event window, shaped like `get_calendar_events`
+        stats: project_count, high_priority_count, total_budget, event_count,
+            critical_count, meeting_count
+    """
+    revision: int
+    day: str
+    projects: Dict[str, Dict[str, Any]]
+    tasks: Dict[str, Dict[str, Any]]
+    events: Dict[str, Dict[str, Any]]
+    calendar: Dict[str, Any]
+    stats: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def project_list(self) -> List[Dict[str, Any]]:
+        return list(self.projects.values())
+
+    @property
+    def task_list(self) -> List[Dict[str, Any]]:
+        return list(self.tasks.values())
+
+
+class ContextSnapshotService:
+    """Keeps the latest `ContextSnapshot` of a workspace up to date incrementally."""
+
+    def __init__(self, workspace, days_ahead: int = UPCOMING_EVENT_DAYS):
+        self.workspace = workspace
+        self.days_ahead = days_ahead
+        self.counters: Counter = Counter()
+        self._snapshot: Optional[ContextSnapshot] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> ContextSnapshot:
+        """The snapshot for the workspace as it is now (reads only what changed)."""
+        with self._lock:
+            snapshot, day = self._snapshot, datetime.now().strftime("%Y-%m-%d")
+            if snapshot is not None and snapshot.revision == self.workspace.revision and snapshot.day == day:
+                self.counters["reused"] += 1
+                return snapshot
+            changes = self.workspace.changes_since(snapshot.revision) if snapshot is not None else None
+            if changes is None:
+                self._snapshot = self._load(day)
+                self.counters["full_loads"] += 1
+            else:
+                self._snapshot = self._apply(snapshot, changes, day)
+                self.counters["incremental"] += 1
+            return self._snapshot
+
+    def cached(self) -> Optional[ContextSnapshot]:
+        """The last snapshot, if any (no workspace reads)."""
+        return self._snapshot
+
+    def reset(self):
+        """Drop the snapshot (memory pressure); the next `current` reloads the workspace."""
+        with self._lock:
+            self._snapshot = None
+            self.counters["resets"] += 1
+
+    def _load(self, day: str) -> ContextSnapshot:
+        revision = self.workspace.revision  # Read first: edits racing the load are picked up next time
+        projects = {p["id"]: dict(p) for p in self.workspace.get_all_projects()}
+        tasks = {t["id"]: dict(t) for t in self.workspace.get_all_tasks()}
+        events = {e["id"]: dict(e) for e in self.workspace.get_all_calendar_events()}
+        self.counters["workspace_reads"] += 3
+        totals = [sum(column) for column in zip((0, 0, 0), *(_project_stats(p) for p in projects.values()))]
+        calendar = _event_window(events, day, self.days_ahead)
+        return ContextSnapshot(
+            revision=revision, day=day, projects=projects, tasks=tasks, events=events, calendar=calendar,
+            stats={**dict(zip(PROJECT_STATS, totals)), **self._event_stats(calendar)},
+        )
+
+    def _apply(self, snapshot: ContextSnapshot, changes: Dict[str, Dict[str, Any]], day: str) -> ContextSnapshot:
+        revision = self.workspace.revision
+        stats = dict(snapshot.stats)
+        projects, tasks, events = snapshot.projects, snapshot.tasks, snapshot.events
+
+        if "projects" in changes:
+            projects = dict(projects)
+            totals = [stats[name] for name in PROJECT_STATS]
+            for item_id, item in changes["projects"].items():
+                old = projects.pop(item_id, None) if item is None else projects.get(item_id)
+                if old is not None:
+                    totals = [t - c for t, c in zip(totals, _project_stats(old))]
+                if item is not None:
+                    projects[item_id] = item
+                    totals = [t + c for t, c in zip(totals, _project_stats(item))]
+            stats.update(zip(PROJECT_STATS, totals))
+        if "tasks" in changes:
+            tasks = self._merge(tasks, changes["tasks"])
+        if "calendar_events" in changes:
+            events = self._merge(events, changes["calendar_events"])
+
+        calendar = snapshot.calendar
+        if events is not snapshot.events or day != snapshot.day:
+            calendar = _event_window(events, day, self.days_ahead)
+            stats.update(self._event_stats(calendar))
+        self.counters["items_applied"] += sum(len(items) for items in changes.values())
+        return ContextSnapshot(revision=revision, day=day, projects=projects, tasks=tasks, events=events, calendar=calendar, stats=stats)
+
+    @staticmethod
+    def _merge(items: Dict[str, Dict[str, Any]], changed: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        merged = dict(items)
+        for item_id, item in changed.items():
+            if item is None:
+                merged.pop(item_id, None)
+            else:
+                merged[item_id] = item
+        return merged
+
+    @staticmethod
+    def _event_stats(calendar: Dict[str, Any]) -> Dict[str, int]:
+        events = calendar["events"]
+        return {
+            "event_count": len(events),
+            "critical_count": sum(1 for e in events if e.get("priority") == "Critical"),
+            "meeting_count": sum(1 for e in events if e.get("type") == "Meeting"),
+        }
+
+
+_service: Optional[ContextSnapshotService] = None
+_service_lock = threading.Lock()
+
+
+def get_context_service() -> ContextSnapshotService:
+    """Process-wide snapshot service over the shared workspace."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            from .mock_data import get_mock_data
+            _service = ContextSnapshotService(get_mock_data())
+        return _service
+
+
+# --- Benchmark ---
+
+class _SlowWorkspace:
+    """A workspace whose list reads cost `call_seconds`, like Notion API calls."""
+
+    def __init__(self, workspace, call_seconds: float):
+        self._workspace = workspace
+        self.call_seconds = call_seconds
+        self.calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self._workspace, name)
+
+    def _read(self, items):
+        self.calls += 1
+        time.sleep(self.call_seconds)
+        return items
+
+    def get_all_projects(self):
+        return self._read(self._workspace.get_all_projects())
+
+    def get_all_tasks(self):
+        return self._read(self._workspace.get_all_tasks())
+
+    def get_all_calendar_events(self):
+        return self._read(self._workspace.get_all_calendar_events())
+
+    def get_calendar_events(self, days_ahead: int = UPCOMING_EVENT_DAYS):
+        return self._read(self._workspace.get_calendar_events(days_ahead))
+
+    def changes_since(self, revision: int):
+        return self._read(self._workspace.changes_since(revision)) if revision != self._workspace.revision else {}
+
+
+def run_benchmark(debates: int = 50, edit_every: int = 10, call_ms: float = 150.0):
+    """Workspace reads and context time per debate: full refetch vs snapshots."""
+    from .mock_data import MockNotionData
+
+    results = {}
+    for label in ("full refetch", "snapshots"):
+        workspace = _SlowWorkspace(MockNotionData(), call_ms / 1000)
+        service = ContextSnapshotService(workspace)
+        start = time.perf_counter()
+        for i in range(debates):
+            if edit_every and i and i % edit_every == 0:
+                project = dict(workspace.projects[0], budget=f"${10000 + i:,}")
+                workspace.upsert("projects", project)
+            if label == "full refetch":
+                workspace.get_all_projects()
+                workspace.get_all_tasks()
+                workspace.get_calendar_events(UPCOMING_EVENT_DAYS)
+            else:
+                service.current()
+        results[label] = (workspace.calls, time.perf_counter() - start)
+
+    print(f"🗂️  {debates} debates, one project edit every {edit_every}, {call_ms:g} ms per workspace call")
+    for label, (calls, seconds) in results.items():
+        print(f"   {label:<13} {calls:>4} workspace calls  {seconds / debates * 1000:7.1f} ms/debate")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Workspace context snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Workspace reads per debate, full refetch vs snapshots")
+    bench_cmd.add_argument("--debates", type=int, default=50)
+    bench_cmd.add_argument("--edit-every", type=int, default=10)
+    bench_cmd.add_argument("--call-ms", type=float, default=150.0)
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(args.debates, args.edit_every, args.call_ms)
+
+
+if __name__ == "__main__":
+    main()
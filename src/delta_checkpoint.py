@@ -0,0 +1,356 @@
+"""
+Delta-Encoded Checkpoints for THE ROUNDTABLE
+
+The stock AsyncSqliteSaver re-serializes every channel on every checkpoint, so
+the growing transcript (`messages`) and the large, unchanging Chief of Staff
+report (`context_data`) are written again after every node: O(rounds²) bytes
+per debate.
+
+`DeltaSqliteSaver` stores them by reference instead:
+- Messages are stored once per thread, keyed by message id, in
+  `checkpoint_messages`; checkpoints keep only the ordered id list
+- `context_data` (and any other large channel value) is stored once,
+  content-addressed by SHA-256, in `checkpoint_blobs`
+
+Reads rehydrate the references transparently, so `aget_state`, resume from a
+thread id and history listing behave exactly as with the stock saver, and
+checkpoints written before this saver existed still load unchanged.
+
+Assumption: messages are immutable once they have an id. That holds for this
+graph, where nodes only ever append to the transcript.
+
+The ids already written are remembered for at most STORED_MESSAGE_THREADS
+threads (least recently written first out) and forgotten when a thread
+finishes; a thread written again after that offers its messages once more
+and the database ignores the ones it already has.
+
+Benchmark (offline model stand-in):
+    python -m src.delta_checkpoint bench [--debates 20]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from .checkpoint_maintenance import record_thread_finished, record_thread_started
+
+_REF = "__roundtable_ref__"
+REF_CHANNELS = ("context_data",)  # Channels stored content-addressed
+MESSAGE_CHANNEL = "messages"
+STORED_MESSAGE_THREADS = int(os.getenv("STORED_MESSAGE_THREADS", "256"))  # Threads whose written ids are remembered
+
+DELTA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint_messages (
+    thread_id TEXT NOT NULL,
+    message_id TEXT NOT NULL,
+    type TEXT,
+    blob BLOB,
+    PRIMARY KEY (thread_id, message_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+    hash TEXT PRIMARY KEY,
+    type TEXT,
+    blob BLOB
+);
+CREATE TABLE IF NOT EXISTS checkpoint_blob_refs (
+    thread_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (thread_id, hash)
+);
+"""
+
+
+class DeltaSqliteSaver(AsyncSqliteSaver):
+    """AsyncSqliteSaver that persists messages append-only and large values once."""
+
+    def __init__(self, conn, *, serde=None):
+        super().__init__(conn, serde=serde)
+        self.db_path: Optional[str] = None  # Set by `from_conn_string`; where checkpoint maintenance runs
+        # thread_id -> message ids already persisted (saves re-serializing them), LRU-bounded
+        self._stored_messages: "OrderedDict[str, Set[str]]" = OrderedDict()
+
+    @classmethod
+    @asynccontextmanager
+    async def from_conn_string(cls, conn_string: str) -> AsyncIterator["DeltaSqliteSaver"]:
+        async with super().from_conn_string(conn_string) as saver:
+            saver.db_path = conn_string
+            yield saver
+
+    async def setup(self) -> None:
+        if self.is_setup:
+            return
+        await super().setup()
+        async with self.lock:
+            await self.conn.executescript(DELTA_SCHEMA)
+            await self.conn.commit()
+
+    # --- Encoding ---
+
+    def _encode_messages(self, thread_id: str, messages: List[Any], rows: List[tuple]) -> Any:
+        if not isinstance(messages, list) or any(getattr(m, "id", None) is None for m in messages):
+            # Writes from a node may carry messages before ids are assigned; keep those inline
+            return messages
+        stored = self._stored_messages.setdefault(thread_id, set())
+        self._stored_messages.move_to_end(thread_id)
+        while len(self._stored_messages) > STORED_MESSAGE_THREADS:
+            self._stored_messages.popitem(last=False)
+        for message in messages:
+            if message.id not in stored:
+                type_, blob = self.serde.dumps_typed(message)
+                rows.append(("message", (thread_id, message.id, type_, blob)))
+                stored.add(message.id)
+        return {_REF: MESSAGE_CHANNEL, "ids": [m.id for m in messages]}
+
+    def _encode_blob(self, thread_id: str, value: Any, rows: List[tuple]) -> Any:
+        type_, blob = self.serde.dumps_typed(value)
+        digest = hashlib.sha256(blob).hexdigest()
+        # Always offered (INSERT OR IGNORE): maintenance may have collected an
+        # orphaned copy since this process last wrote it
+        rows.append(("blob", (digest, type_, blob)))
+        rows.append(("blob_ref", (thread_id, digest)))
+        return {_REF: "blob", "hash": digest}
+
+    def _encode_value(self, thread_id: str, channel: str, value: Any, rows: List[tuple]) -> Any:
+        if channel == MESSAGE_CHANNEL:
+            return self._encode_messages(thread_id, value, rows)
+        if channel in REF_CHANNELS and value:
+            return self._encode_blob(thread_id, value, rows)
+        return value
+
+    async def _write_rows(self, rows: List[tuple]):
+        messages = [r for kind, r in rows if kind == "message"]
+        blobs = [r for kind, r in rows if kind == "blob"]
+        refs = [r for kind, r in rows if kind == "blob_ref"]
+        async with self.lock:
+            if messages:
+                await self.conn.executemany(
+                    "INSERT OR IGNORE INTO checkpoint_messages (thread_id, message_id, type, blob) VALUES (?, ?, ?, ?)", messages
+                )
+            if blobs:
+                await self.conn.executemany("INSERT OR IGNORE INTO checkpoint_blobs (hash, type, blob) VALUES (?, ?, ?)", blobs)
+            if refs:
+                await self.conn.executemany("INSERT OR IGNORE INTO checkpoint_blob_refs (thread_id, hash) VALUES (?, ?)", refs)
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        await self.setup()
+        thread_id = str(config["configurable"]["thread_id"])
+        rows: List[tuple] = []
+        values = {
+            channel: self._encode_value(thread_id, channel, value, rows)
+            for channel, value in checkpoint["channel_values"].items()
+        }
+        # Referenced rows go first so a crash never leaves a dangling reference
+        await self._write_rows(rows)
+        encoded = {**checkpoint, "channel_values": values}
+        return await super().aput(config, encoded, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self.setup()
+        thread_id = str(config["configurable"]["thread_id"])
+        rows: List[tuple] = []
+        encoded = [(channel, self._encode_value(thread_id, channel, value, rows)) for channel, value in writes]
+        await self._write_rows(rows)
+        await super().aput_writes(config, encoded, task_id, task_path)
+
+    # --- Decoding ---
+
+    @staticmethod
+    def _collect_refs(value: Any, message_ids: Set[str], hashes: Set[str]):
+        if isinstance(value, dict) and _REF in value:
+            if value[_REF] == MESSAGE_CHANNEL:
+                message_ids.update(value["ids"])
+            else:
+                hashes.add(value["hash"])
+
+    async def _load_refs(self, thread_id: str, message_ids: Set[str], hashes: Set[str]):
+        messages, blobs = {}, {}
+        async with self.lock, self.conn.cursor() as cur:
+            ids = list(message_ids)
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                await cur.execute(
+                    f"SELECT message_id, type, blob FROM checkpoint_messages WHERE thread_id = ? AND message_id IN ({','.join('?' * len(batch))})",
+                    (thread_id, *batch),
+                )
+                for message_id, type_, blob in await cur.fetchall():
+                    messages[message_id] = self.serde.loads_typed((type_, blob))
+            for digest in hashes:
+                await cur.execute("SELECT type, blob FROM checkpoint_blobs WHERE hash = ?", (digest,))
+                row = await cur.fetchone()
+                if row:
+                    blobs[digest] = self.serde.loads_typed(row)
+        return messages, blobs
+
+    @staticmethod
+    def _resolve(value: Any, messages: Dict[str, Any], blobs: Dict[str, Any]) -> Any:
+        if isinstance(value, dict) and _REF in value:
+            if value[_REF] == MESSAGE_CHANNEL:
+                return [messages[i] for i in value["ids"]]
+            return blobs[value["hash"]]
+        return value
+
+    async def _decode(self, tuple_: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        if tuple_ is None:
+            return None
+        message_ids: Set[str] = set()
+        hashes: Set[str] = set()
+        for value in tuple_.checkpoint["channel_values"].values():
+            self._collect_refs(value, message_ids, hashes)
+        for _, _, value in tuple_.pending_writes or []:
+            self._collect_refs(value, message_ids, hashes)
+        if not message_ids and not hashes:
+            return tuple_
+
+        thread_id = str(tuple_.config["configurable"]["thread_id"])
+        messages, blobs = await self._load_refs(thread_id, message_ids, hashes)
+        checkpoint = {
+            **tuple_.checkpoint,
+            "channel_values": {
+                channel: self._resolve(value, messages, blobs)
+                for channel, value in tuple_.checkpoint["channel_values"].items()
+            },
+        }
+        pending = [
+            (task_id, channel, self._resolve(value, messages, blobs))
+            for task_id, channel, value in tuple_.pending_writes or []
+        ]
+        return tuple_._replace(checkpoint=checkpoint, pending_writes=pending)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._decode(await super().aget_tuple(config))
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        # Materialize first: decoding needs the connection the listing cursor holds
+        tuples = [t async for t in super().alist(config, filter=filter, before=before, limit=limit)]
+        for tuple_ in tuples:
+            yield await self._decode(tuple_)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await super().adelete_thread(thread_id)
+        async with self.lock:
+            await self.conn.execute("DELETE FROM checkpoint_messages WHERE thread_id = ?", (str(thread_id),))
+            await self.conn.execute("DELETE FROM checkpoint_blob_refs WHERE thread_id = ?", (str(thread_id),))
+            await self.conn.commit()
+        self._stored_messages.pop(str(thread_id), None)
+
+    # --- Thread registry (see checkpoint_maintenance) ---
+
+    async def athread_started(self, thread_id: str, question: str) -> None:
+        async with self.lock:
+            await record_thread_started(self.conn, thread_id, question)
+
+    async def athread_finished(self, thread_id: str, status: str = "finished") -> None:
+        self._stored_messages.pop(str(thread_id), None)
+        async with self.lock:
+            await record_thread_finished(self.conn, thread_id, status)
+
+
+# --- Benchmark ---
+
+def _table_bytes(db_path: str) -> Dict[str, int]:
+    """Bytes of serialized payload per table (nothing is deleted during the bench, so this equals bytes written)."""
+    columns = {
+        "checkpoints": "LENGTH(checkpoint) + IFNULL(LENGTH(metadata), 0)",
+        "writes": "LENGTH(value)",
+        "checkpoint_messages": "LENGTH(blob)",
+        "checkpoint_blobs": "LENGTH(blob)",
+    }
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return {
+            table: conn.execute(f"SELECT IFNULL(SUM({expr}), 0) FROM {table}").fetchone()[0]
+            for table, expr in columns.items() if table in tables
+        }
+    finally:
+        conn.close()
+
+
+async def _bench_saver(saver_cls, db_path: str, debates: int, question: str) -> Dict[str, Any]:
+    from langchain_core.messages import HumanMessage
+    from .backend import create_roundtable_graph, DEBATE_LATENCY_BUDGET_SECONDS
+
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    start = time.perf_counter()
+    async with saver_cls.from_conn_string(db_path) as checkpointer:
+        app = create_roundtable_graph().compile(checkpointer=checkpointer)
+        for i in range(debates):
+            config = {"configurable": {"thread_id": f"bench_{i}"}}
+            initial_state = {
+                "messages": [HumanMessage(content=question)],
+                "context_data": {},
+                "round_count": 0,
+                "status": "gathering",
+                "debate_deadline": time.time() + DEBATE_LATENCY_BUDGET_SECONDS,
+            }
+            await app.ainvoke(initial_state, config)
+        # Read-back check: resuming a thread must see the full transcript
+        state = await app.aget_state({"configurable": {"thread_id": "bench_0"}})
+    elapsed = time.perf_counter() - start
+    sizes = _table_bytes(db_path)
+    return {"bytes": sum(sizes.values()), "tables": sizes, "seconds": elapsed, "messages": len(state.values["messages"])}
+
+
+def run_benchmark(debates: int = 20, rounds: int = 3):
+    """Compare bytes written per debate by the stock and delta savers, using the offline model."""
+    os.environ["ROUNDTABLE_OFFLINE_LLM"] = "1"
+    os.environ["MAX_DEBATE_ROUNDS"] = str(rounds)
+    question = "Should I take a 6-month sabbatical to travel the world next year?"
+
+    results = {}
+    for label, saver_cls in (("stock", AsyncSqliteSaver), ("delta", DeltaSqliteSaver)):
+        results[label] = asyncio.run(_bench_saver(saver_cls, f"bench_{label}.db", debates, question))
+
+    print(f"📊 Checkpoint bytes written per debate ({debates} debates, offline model)")
+    for label, result in results.items():
+        tables = ", ".join(f"{t}={b / debates / 1024:.1f}KB" for t, b in result["tables"].items())
+        print(f"   {label:<6} {result['bytes'] / debates / 1024:8.1f} KB/debate  ({tables})  "
+              f"{result['seconds']:.1f}s, read-back {result['messages']} messages")
+    saved = 1 - results["delta"]["bytes"] / max(1, results["stock"]["bytes"])
+    print(f"   delta encoding writes {saved:.0%} fewer bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta checkpoint benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Bytes written per debate, stock vs delta saver")
+    bench_cmd.add_argument("--debates", type=int, default=20)
+    bench_cmd.add_argument("--rounds", type=int, default=3, help="MAX_DEBATE_ROUNDS for the run")
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(args.debates, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
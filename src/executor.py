@@ -0,0 +1,336 @@
+"""
+Background Debate Executor for THE ROUNDTABLE
+
+Runs debates off the caller's thread. One persistent event loop lives in a
+daemon worker thread; callers (Streamlit script runs, one per widget
+interaction and per session) only enqueue jobs and poll them:
+
+- `submit` / `resume` enqueue a debate and return a `DebateJob` immediately
+- Worker coroutines take jobs from a `FairQueue`, at most
+  MAX_CONCURRENT_DEBATES at a time, so all sessions share one engine (one
+  loop, one panel semaphore, one set of latency metrics); tenants get fair
+  shares of the slots and interactive debates go before batch ones
+- Each agent message is appended to the job as soon as it is spoken, so the
+  UI can render the debate incrementally; once a debate finishes its
+  transcript moves to the session store (memory-bounded, spilled to disk)
+- `cancel` drops a queued job or cancels a running one; its checkpoints are
+  kept, so it can be resumed later
+- The loop opens one checkpointer and compiles the graph once
+  (`open_roundtable`); every debate runs on that shared instance
+- Admission control: `submit` raises `QueueFullError` once
+  MAX_QUEUED_DEBATES jobs are already waiting, or the tenant or the batch
+  share of the queue is full (see `fair_queue.admission_error`)
+
+Job IDs are the debate's checkpoint thread IDs, which carry the tenant.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .backend import DB_PATH, new_thread_id, open_roundtable, replay_debate, resume_debate, run_demo
+from .fair_queue import PRIORITIES, FairQueue, admission_error
+from .session_memory import TranscriptEntry, get_session_store
+from .tenants import tenant_of, validate_tenant
+
+MAX_CONCURRENT_DEBATES = int(os.getenv("MAX_CONCURRENT_DEBATES", "4"))
+MAX_QUEUED_DEBATES = int(os.getenv("MAX_QUEUED_DEBATES", "32"))  # Waiting jobs before submit is refused
+JOB_RETENTION_SECONDS = 3600  # Finished jobs stay pollable this long
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "finished", "failed", "cancelled")
+
+
+class QueueFullError(RuntimeError):
+    """Raised by `submit` when the job queue (or the tenant's or batch share of it) is full."""
+
+
+@dataclass
+class DebateJob:
+    """
+    One debate submitted to the executor.
+
+    Attributes:
+        job_id: The debate's checkpoint thread ID
+        question: The user's question ("" when resuming)
+        resume: Whether the job continues an existing thread
+        follow_up: Whether the question follows up the finished debate on the thread
+        priority: "interactive" (someone is waiting on it) or "batch"
+        tenant: Tenant the debate belongs to (from the job ID)
+        status: One of JOB_STATUSES
+        messages: Transcript entries produced so far (None once handed to the session store)
+        error: Failure message, if the job failed
+    """
+    job_id: str
+    question: str
+    resume: bool = False
+    follow_up: bool = False
+    priority: str = "interactive"
+    tenant: str = field(init=False)
+    status: str = "queued"
+    messages: Optional[List[TranscriptEntry]] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    # Resolved (with the status) when the job ends; awaitable from any loop via asyncio.wrap_future
+    finished: concurrent.futures.Future = field(default_factory=concurrent.futures.Future, repr=False)
+
+    def __post_init__(self):
+        if self.priority not in PRIORITIES:
+            raise ValueError(f"'priority' must be one of {', '.join(PRIORITIES)}.")
+        self.tenant = tenant_of(self.job_id)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("finished", "failed", "cancelled")
+
+    def snapshot(self) -> List[TranscriptEntry]:
+        """Copy of the transcript so far, safe to read from another thread."""
+        with self._lock:
+            messages = self.messages
+            if messages is not None:
+                return list(messages)
+        return get_session_store().get(self.job_id) or []
+
+    def _append(self, entry: TranscriptEntry):
+        with self._lock:
+            self.messages.append(entry)
+
+    def _spill(self):
+        """Hand the finished transcript to the session store (blocking); kept in the job if that fails."""
+        try:
+            get_session_store().put(self.job_id, self.messages)
+        except Exception as e:
+            logger.warning(f"💾 Could not store the transcript of {self.job_id}: {e}")
+            return
+        with self._lock:
+            self.messages = None
+
+    def _end(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        if not self.finished.done():
+            self.finished.set_result(status)
+
+    def to_dict(self, include_messages: bool = True) -> Dict[str, Any]:
+        """JSON-ready view of the job."""
+        data = {
+            "id": self.job_id,
+            "question": self.question,
+            "tenant": self.tenant,
+            "priority": self.priority,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if include_messages:
+            data["messages"] = [dict(entry) for entry in self.snapshot()]
+        return data
+
+
+def new_job(
+    question: str, thread_id: Optional[str] = None, follow_up: bool = False,
+    tenant: Optional[str] = None, priority: str = "interactive",
+) -> DebateJob:
+    """A job for a new debate of `tenant` (or a follow-up on `thread_id`, which must belong to it)."""
+    tenant = validate_tenant(tenant or (tenant_of(thread_id) if thread_id else None))
+    if thread_id and tenant_of(thread_id) != tenant:
+        raise ValueError(f"Debate '{thread_id}' does not belong to tenant '{tenant}'.")
+    return DebateJob(job_id=thread_id or new_thread_id(tenant), question=question, follow_up=follow_up, priority=priority)
+
+
+class DebateExecutor:
+    """Job queue plus a persistent event loop running in a worker thread."""
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_DEBATES,
+        max_queued: int = MAX_QUEUED_DEBATES,
+        db_path: Optional[str] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.db_path = db_path or DB_PATH
+        self.max_queued = max_queued
+        self.counters: Counter = Counter()
+        self._app = None
+        self._jobs: Dict[str, DebateJob] = {}
+        self._jobs_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="debate-executor", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    # --- Worker thread ---
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = FairQueue(self.max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._stack = AsyncExitStack()
+        self._app = self._loop.run_until_complete(self._stack.enter_async_context(open_roundtable(self.db_path)))
+        self._workers = [self._loop.create_task(self._worker(i)) for i in range(self.max_concurrency)]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _worker(self, index: int):
+        while True:
+            job = self._queue.pop()  # Jobs cancelled while waiting are skipped
+            if job is None:
+                # Pushes and pops both happen on this loop, so no wakeup is lost in between
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            try:
+                job.status = "running"
+                job._task = asyncio.create_task(self._run(job))
+                try:
+                    await job._task
+                except asyncio.CancelledError:
+                    pass  # Only the job was cancelled; the worker keeps serving
+            finally:
+                self._queue.done(job)
+                self._wakeup.set()
+
+    def _push(self, job: DebateJob):
+        self._queue.push(job)
+        self._wakeup.set()
+
+    async def _run(self, job: DebateJob):
+        try:
+            if job.resume:
+                await resume_debate(job.job_id, on_message=job._append, app=self._app)
+            else:
+                await run_demo(job.question, job.job_id, on_message=job._append, app=self._app, follow_up=job.follow_up)
+            await asyncio.to_thread(job._spill)
+            job._end("finished")
+        except asyncio.CancelledError:
+            job._end("cancelled")
+            logger.info(f"🛑 Debate {job.job_id} cancelled")
+            raise
+        except Exception as e:
+            job._end("failed", str(e))
+            logger.error(f"❌ Debate {job.job_id} failed: {e}")
+        finally:
+            self.counters[job.status] += 1
+
+    # --- Caller side (any thread) ---
+
+    def _enqueue(self, job: DebateJob) -> DebateJob:
+        with self._jobs_lock:
+            self._prune()
+            problem = admission_error((j for j in self._jobs.values() if j.status == "queued"), job, self.max_queued)
+            if problem:
+                self.counters["rejected"] += 1
+                raise QueueFullError(problem)
+            if job.job_id in self._jobs and not self._jobs[job.job_id].done:
+                raise ValueError(f"Debate '{job.job_id}' is already running.")
+            self._jobs[job.job_id] = job
+            self.counters["submitted"] += 1
+        self._loop.call_soon_threadsafe(self._push, job)
+        return job
+
+    def submit(
+        self, question: str, thread_id: Optional[str] = None, follow_up: bool = False,
+        tenant: Optional[str] = None, priority: str = "interactive",
+    ) -> DebateJob:
+        """Queue a new debate (or a follow-up on `thread_id`); returns at once with the job (job_id = thread ID)."""
+        return self._enqueue(new_job(question, thread_id, follow_up, tenant, priority))
+
+    def resume(self, thread_id: str) -> DebateJob:
+        """
+        Attach to a debate: the live job if this executor is still running it,
+        otherwise a new job that resumes (or replays) it from its checkpoints.
+        """
+        with self._jobs_lock:
+            job = self._jobs.get(thread_id)
+        if job and not job.done:
+            return job
+        validate_tenant(tenant_of(thread_id))
+        return self._enqueue(DebateJob(job_id=thread_id, question="", resume=True))
+
+    def replay(self, thread_id: str) -> concurrent.futures.Future:
+        """Transcript of a debate from its checkpoints, read on the shared graph (no model calls)."""
+        return asyncio.run_coroutine_threadsafe(replay_debate(thread_id, app=self._app), self._loop)
+
+    def get(self, job_id: str) -> Optional[DebateJob]:
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if it already ended."""
+        job = self.get(job_id)
+        if job is None or job.done:
+            return False
+        if job.status == "queued":
+            job._end("cancelled")
+            self.counters["cancelled"] += 1
+            return True
+
+        def cancel_task():
+            if job._task is not None:
+                job._task.cancel()
+
+        self._loop.call_soon_threadsafe(cancel_task)
+        return True
+
+    def jobs(self) -> List[DebateJob]:
+        with self._jobs_lock:
+            return list(self._jobs.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, capacity and lifetime job counters."""
+        statuses = Counter(job.status for job in self.jobs())
+        return {
+            "running": statuses["running"],
+            "queued": statuses["queued"],
+            "max_concurrency": self.max_concurrency,
+            "max_queued": self.max_queued,
+            "totals": dict(self.counters),
+            "scheduler": self._queue.stats(),
+        }
+
+    def shutdown(self):
+        """Cancel everything and stop the loop (mainly for scripts and benchmarks)."""
+        for job in self.jobs():
+            self.cancel(job.job_id)
+
+        async def stop():
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            await self._stack.aclose()
+            self._loop.stop()
+
+        asyncio.run_coroutine_threadsafe(stop(), self._loop)
+        self._thread.join(timeout=5)
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [j.job_id for j in self._jobs.values() if j.done and (j.finished_at or 0) < cutoff]:
+            del self._jobs[job_id]
+
+
+_executor: Optional[DebateExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> DebateExecutor:
+    """Process-wide executor shared by every Streamlit session."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = DebateExecutor()
+        return _executor
@@ -0,0 +1,267 @@
+"""
+Fair-Share Debate Scheduling for THE ROUNDTABLE
+
+With one FIFO queue, a tenant that submits a batch of 50 debates holds every
+slot until the batch drains, and another user's interactive question waits
+behind all of it. `FairQueue` replaces the FIFO in the executor and the
+worker pool:
+
+- Each tenant has its own queues, one per priority ("interactive" for a user
+  waiting on the page, "batch" for scripted runs)
+- Interactive debates always go first. Among tenants, the next slot goes to
+  the one with the fewest running debates per unit of weight (TENANT_WEIGHTS),
+  ties to the one served least recently, so tenants take turns
+- Batch debates never take the last RESERVED_INTERACTIVE_SLOTS slots, so an
+  interactive debate starts as soon as any slot frees up; a batch debate
+  that has waited BATCH_MAX_WAIT_SECONDS is promoted to interactive, so
+  batches are never starved either
+- Admission (`admission_error`): a tenant may have at most
+  MAX_QUEUED_PER_TENANT debates waiting, and batch debates may fill only
+  BATCH_QUEUE_SHARE of the shared queue, leaving room for interactive ones
+
+Running debates are never preempted; fairness applies when a slot frees up.
+
+Compare an interactive tenant's wait behind another tenant's batch, FIFO vs fair:
+    python -m src.fair_queue bench [--batch 24] [--interactive 4] [--slots 4]
+"""
+
+import argparse
+import itertools
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+PRIORITIES = ("interactive", "batch")
+RESERVED_INTERACTIVE_SLOTS = int(os.getenv("RESERVED_INTERACTIVE_SLOTS", "1"))
+BATCH_MAX_WAIT_SECONDS = float(os.getenv("BATCH_MAX_WAIT_SECONDS", "60"))
+MAX_QUEUED_PER_TENANT = int(os.getenv("MAX_QUEUED_PER_TENANT", "16"))
+BATCH_QUEUE_SHARE = float(os.getenv("BATCH_QUEUE_SHARE", "0.75"))
+
+
+def _parse_weights(spec: str) -> Dict[str, float]:
+    """"acme=2,beta=0.5" -> {"acme": 2.0, "beta": 0.5} (unlisted tenants weigh 1)."""
+    weights = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        tenant, _, weight = part.partition("=")
+        weights[tenant.strip()] = max(0.01, float(weight or 1))
+    return weights
+
+
+TENANT_WEIGHTS = _parse_weights(os.getenv("TENANT_WEIGHTS", ""))
+
+
+def admission_error(queued: Iterable[Any], job: Any, max_queued: int) -> Optional[str]:
+    """
+    Why `job` may not join the queue, or None if it may.
+
+    Args:
+        queued: Jobs currently waiting (each with `tenant` and `priority`)
+        job: The job being submitted
+        max_queued: Size of the shared queue
+    """
+    total = tenant_total = batch_total = 0
+    for waiting in queued:
+        total += 1
+        tenant_total += waiting.tenant == job.tenant
+        batch_total += waiting.priority == "batch"
+    if total >= max_queued:
+        return f"{max_queued} debates are already waiting; try again later."
+    if tenant_total >= MAX_QUEUED_PER_TENANT:
+        return f"Tenant '{job.tenant}' already has {MAX_QUEUED_PER_TENANT} debates waiting; try again later."
+    if job.priority == "batch" and batch_total >= max(1, int(max_queued * BATCH_QUEUE_SHARE)):
+        return "The batch share of the queue is full; try again later."
+    return None
+
+
+class FairQueue:
+    """
+    Per-tenant, two-priority job queue that also tracks running jobs.
+
+    Jobs need `job_id`, `tenant`, `priority` and `done` (jobs already done when
+    popped, e.g. cancelled while waiting, are dropped). Thread-safe; callers
+    `push` jobs, `pop` one whenever a slot may be free, and report `done`.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        reserved_interactive: int = RESERVED_INTERACTIVE_SLOTS,
+        weights: Optional[Dict[str, float]] = None,
+        batch_max_wait: float = BATCH_MAX_WAIT_SECONDS,
+    ):
+        self.capacity = max(1, capacity)
+        # With a single slot nothing can be reserved: batch work would never run
+        self.batch_slots = max(1, self.capacity - reserved_interactive)
+        self.weights = TENANT_WEIGHTS if weights is None else weights
+        self.batch_max_wait = batch_max_wait
+        self.counters: Counter = Counter()
+        self._queues: Dict[str, Dict[str, Deque[Tuple[float, Any]]]] = {}
+        self._running: Dict[str, Tuple[str, str]] = {}  # job_id -> (tenant, priority it ran as)
+        self._tenant_running: Counter = Counter()
+        self._batch_running = 0
+        self._served: Dict[str, int] = {}
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+
+    def push(self, job: Any):
+        with self._lock:
+            queues = self._queues.setdefault(job.tenant, {p: deque() for p in PRIORITIES})
+            queues[job.priority if job.priority in PRIORITIES else "interactive"].append((time.monotonic(), job))
+
+    def pop(self) -> Optional[Any]:
+        """The next job to run, or None if the queue is empty or every eligible slot is taken."""
+        with self._lock:
+            if len(self._running) >= self.capacity:
+                return None
+            now = time.monotonic()
+            interactive: List[Tuple[str, str]] = []
+            batch: List[str] = []
+            for tenant, queues in list(self._queues.items()):
+                for priority in PRIORITIES:
+                    queue = queues[priority]
+                    while queue and queue[0][1].done:
+                        queue.popleft()  # Cancelled while waiting
+                if not any(queues.values()):
+                    del self._queues[tenant]
+                elif queues["interactive"]:
+                    interactive.append((tenant, "interactive"))
+                elif queues["batch"] and now - queues["batch"][0][0] >= self.batch_max_wait:
+                    interactive.append((tenant, "batch"))  # Waited long enough: promoted
+                elif queues["batch"]:
+                    batch.append(tenant)
+            if interactive:
+                tenant, source = min(interactive, key=lambda c: self._share(c[0]))
+                return self._start(tenant, source, "interactive")
+            if batch and self._batch_running < self.batch_slots:
+                return self._start(min(batch, key=self._share), "batch", "batch")
+            return None
+
+    def done(self, job: Any):
+        """Free the slot of a job returned by `pop` (ignored for jobs that never ran)."""
+        with self._lock:
+            entry = self._running.pop(job.job_id, None)
+            if entry is None:
+                return
+            tenant, priority = entry
+            self._tenant_running[tenant] -= 1
+            if priority == "batch":
+                self._batch_running -= 1
+
+    def _share(self, tenant: str) -> Tuple[float, int]:
+        return self._tenant_running[tenant] / self.weights.get(tenant, 1.0), self._served.get(tenant, -1)
+
+    def _start(self, tenant: str, source: str, priority: str) -> Any:
+        _, job = self._queues[tenant][source].popleft()
+        if not any(self._queues[tenant].values()):
+            del self._queues[tenant]
+        self._running[job.job_id] = (tenant, priority)
+        self._tenant_running[tenant] += 1
+        self._batch_running += priority == "batch"
+        self._served[tenant] = next(self._turns)
+        self.counters[priority] += 1
+        self.counters["promoted"] += source != priority
+        return job
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(q) for queues in self._queues.values() for q in queues.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Waiting and running debates per tenant, plus lifetime starts by priority."""
+        with self._lock:
+            tenants = {
+                tenant: {"running": self._tenant_running[tenant], **{p: 0 for p in PRIORITIES}}
+                for tenant in set(self._queues) | {t for t, n in self._tenant_running.items() if n}
+            }
+            for tenant, queues in self._queues.items():
+                for priority, queue in queues.items():
+                    tenants[tenant][priority] = sum(1 for _, job in queue if not job.done)
+            return {
+                "capacity": self.capacity,
+                "batch_slots": self.batch_slots,
+                "batch_running": self._batch_running,
+                "tenants": tenants,
+                "started": dict(self.counters),
+            }
+
+
+# --- Benchmark ---
+
+class _SimJob:
+    def __init__(self, job_id: str, tenant: str, priority: str, submitted: float):
+        self.job_id, self.tenant, self.priority, self.submitted = job_id, tenant, priority, submitted
+        self.done = False
+
+
+def simulate(batch: int, interactive: int, slots: int, debate_seconds: float, fair: bool) -> Dict[str, Any]:
+    """
+    Event-driven simulation: tenant "bulk" submits `batch` batch debates at t=0,
+    tenant "alice" one interactive debate every `debate_seconds / 2` after that.
+
+    Returns:
+        Alice's mean and worst wait and the time the whole batch finished
+    """
+    jobs = [_SimJob(f"bulk.{i}", "bulk", "batch", 0.0) for i in range(batch)]
+    jobs += [_SimJob(f"alice.{i}", "alice", "interactive", 0.1 + i * debate_seconds / 2) for i in range(interactive)]
+    pending = sorted(jobs, key=lambda j: j.submitted)
+    fifo: Deque[_SimJob] = deque()
+    queue = FairQueue(slots, batch_max_wait=float("inf"))
+    running: List[Tuple[float, _SimJob]] = []
+    started: Dict[str, float] = {}
+    finished: Dict[str, float] = {}
+    now = 0.0
+    while pending or fifo or len(queue) or running:
+        # Admit everything submitted by now, then fill free slots
+        while pending and pending[0].submitted <= now:
+            job = pending.pop(0)
+            if fair:
+                queue.push(job)
+            else:
+                fifo.append(job)
+        while len(running) < slots:
+            job = queue.pop() if fair else (fifo.popleft() if fifo else None)
+            if job is None:
+                break
+            started[job.job_id] = now
+            running.append((now + debate_seconds, job))
+        events = [end for end, _ in running] + ([pending[0].submitted] if pending else [])
+        now = min(events)
+        for end, job in [r for r in running if r[0] <= now]:
+            running.remove((end, job))
+            finished[job.job_id] = end
+            if fair:
+                queue.done(job)
+    waits = [started[j.job_id] - j.submitted for j in jobs if j.tenant == "alice"]
+    return {
+        "mean_wait": round(sum(waits) / len(waits), 2) if waits else 0.0,
+        "max_wait": round(max(waits), 2) if waits else 0.0,
+        "batch_done": round(max(finished[j.job_id] for j in jobs if j.tenant == "bulk"), 2) if batch else 0.0,
+    }
+
+
+def run_benchmark(batch: int = 24, interactive: int = 4, slots: int = 4, debate_seconds: float = 10.0):
+    print(f"⚖️ {batch} batch debates (tenant bulk) + {interactive} interactive (tenant alice), "
+          f"{slots} slots, {debate_seconds:g}s per debate\n")
+    for label, fair in (("FIFO", False), ("fair", True)):
+        result = simulate(batch, interactive, slots, debate_seconds, fair)
+        print(f"   {label:>5}: alice waits {result['mean_wait']:>6}s mean, {result['max_wait']:>6}s worst; "
+              f"batch done at {result['batch_done']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fair-share debate scheduling")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Interactive wait behind another tenant's batch, FIFO vs fair")
+    bench_cmd.add_argument("--batch", type=int, default=24)
+    bench_cmd.add_argument("--interactive", type=int, default=4)
+    bench_cmd.add_argument("--slots", type=int, default=4)
+    bench_cmd.add_argument("--debate-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(args.batch, args.interactive, args.slots, args.debate_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Import-Time Budget Check for THE ROUNDTABLE
+
+Cold start matters: the CLI, every Streamlit server, every API worker and
+every worker-pool process pays it. This check imports each entry module in a
+fresh interpreter under `python -X importtime` and fails when:
+
+- the cumulative import time is over IMPORT_BUDGET_MS, or
+- a heavy dependency that should only load on first use (the model SDKs,
+  the Notion client) was imported anyway
+
+Run it (exit status 1 on any violation, so it can gate CI):
+    python -m src.import_budget [--budget-ms 1500] [--runs 3] [--modules src.backend src.agents]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Sequence
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+DEFAULT_MODULES = ("src.backend", "src.agents")
+# Imported lazily (inside make_llm, get_llm_*, the tool functions); never at import time
+DEFERRED_MODULES = ("langchain_google_genai", "langchain_google_vertexai", "notion_client", "google.api_core.exceptions")
+
+
+def measure_import(module: str) -> Dict[str, float]:
+    """
+    Import `module` in a fresh interpreter and parse the `-X importtime` report.
+
+    Returns:
+        Dict mapping every imported module to its cumulative import time in ms
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"`import {module}` failed:\n{result.stderr.strip().splitlines()[-1]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative_us) / 1000
+    return times
+
+
+def check(modules: Sequence[str], budget_ms: float, runs: int) -> List[str]:
+    """Measure each module (best of `runs`) and return the list of violations."""
+    problems = []
+    for module in modules:
+        samples = [measure_import(module) for _ in range(max(1, runs))]
+        best = min(sample[module] for sample in samples)
+        loaded = [m for m in DEFERRED_MODULES if any(m in sample for sample in samples)]
+        slowest = sorted(
+            ((name, ms) for name, ms in samples[0].items() if name.count(".") == 0 and name != module),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:3]
+        status = "✅" if best <= budget_ms and not loaded else "❌"
+        print(f"{status} import {module}: {best:.0f} ms (budget {budget_ms:.0f} ms)  "
+              f"heaviest packages: {', '.join(f'{n} {ms:.0f}ms' for n, ms in slowest)}")
+        if best > budget_ms:
+            problems.append(f"import {module} took {best:.0f} ms (budget {budget_ms:.0f} ms)")
+        for name in loaded:
+            problems.append(f"import {module} eagerly imported {name}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when entry modules import too slowly")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module (best time counts)")
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_MODULES))
+    args = parser.parse_args()
+
+    problems = check(args.modules, args.budget_ms, args.runs)
+    for problem in problems:
+        print(f"   ⚠️  {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Latency Controls for THE ROUNDTABLE
+
+Deadlines and hedged requests for model calls. Retries (tenacity) cover calls
+that *fail*; this module covers calls that are merely *slow*:
+
+- `with_deadline` bounds a call (including its retries and backoff) by the
+  time left for the node or the debate
+- `hedged_call` optionally fires a second, identical request once the first
+  has been outstanding longer than the observed p95 for that node, and takes
+  whichever answer arrives first
+- `call_metrics` reports per-node latency percentiles, timeouts, and how often
+  a hedge beat the original request
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+NODE_TIMEOUT_SECONDS = float(os.getenv("NODE_TIMEOUT_SECONDS", "60"))
+DEBATE_LATENCY_BUDGET_SECONDS = float(os.getenv("DEBATE_LATENCY_BUDGET_SECONDS", "300"))
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "0").lower() in ("1", "true", "yes")
+HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("HEDGE_DEFAULT_DELAY_SECONDS", "8"))
+HEDGE_MIN_SAMPLES = 20  # Observations needed before trusting the p95
+LATENCY_WINDOW = 200  # Recent successful calls kept per node
+
+T = TypeVar("T")
+
+
+@dataclass
+class CallStats:
+    """Rolling latency window and counters for one node's model calls."""
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    calls: int = 0
+    timeouts: int = 0
+    hedges_fired: int = 0
+    hedge_wins: int = 0
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+_stats: Dict[str, CallStats] = {}
+
+
+def _stats_for(key: str) -> CallStats:
+    if key not in _stats:
+        _stats[key] = CallStats()
+    return _stats[key]
+
+
+def hedge_delay(key: str) -> float:
+    """How long to wait on the original request before hedging it."""
+    stats = _stats_for(key)
+    if len(stats.latencies) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY_SECONDS
+    return stats.percentile(95)
+
+
+def remaining_time(deadline: Optional[float], cap: float = NODE_TIMEOUT_SECONDS, floor: float = 0.0) -> float:
+    """
+    Seconds a node may spend on a call.
+
+    Args:
+        deadline: Epoch seconds by which the work must finish (None for no deadline)
+        cap: Per-node timeout
+        floor: Minimum time granted even when the deadline has passed
+
+    Returns:
+        min(cap, time left until deadline), but at least `floor`
+    """
+    if not deadline:
+        return cap
+    return max(floor, min(cap, deadline - time.time()))
+
+
+async def with_deadline(call: Awaitable[T], key: str, timeout: float) -> T:
+    """Await `call`, raising asyncio.TimeoutError (and counting it) after `timeout` seconds."""
+    try:
+        return await asyncio.wait_for(call, timeout=max(0.0, timeout))
+    except asyncio.TimeoutError:
+        _stats_for(key).timeouts += 1
+        raise
+
+
+async def hedged_call(make_call: Callable[[], Awaitable[T]], key: str, hedge: bool = None) -> T:
+    """
+    Run a model call, hedging it with a duplicate request if it runs long.
+
+    Design: The hedge fires after the node's p95 latency, so only the slowest
+    ~5% of calls pay for a second request. The first successful answer wins and
+    the other request is cancelled. If every attempt fails, the original
+    request's exception is raised so the retry policy can classify it.
+
+    Args:
+        make_call: Zero-argument factory returning a fresh call coroutine
+        key: Metrics key (usually the node name)
+        hedge: Override HEDGE_REQUESTS for this call
+
+    Returns:
+        Result of the first attempt to succeed
+    """
+    stats = _stats_for(key)
+    stats.calls += 1
+    hedge = HEDGE_REQUESTS if hedge is None else hedge
+
+    async def timed():
+        start = time.perf_counter()
+        result = await make_call()
+        return result, time.perf_counter() - start
+
+    primary = asyncio.ensure_future(timed())
+    attempts = [primary]
+    try:
+        if hedge:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay(key))
+            if not done:
+                stats.hedges_fired += 1
+                attempts.append(asyncio.ensure_future(timed()))
+
+        pending = set(attempts)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in sorted(done, key=attempts.index):
+                if attempt.exception() is None:
+                    result, elapsed = attempt.result()
+                    stats.latencies.append(elapsed)
+                    if attempt is not primary:
+                        stats.hedge_wins += 1
+                    return result
+        raise primary.exception()
+    finally:
+        for attempt in attempts:
+            if not attempt.done():
+                attempt.cancel()
+
+
+def record_latency(key: str, seconds: float, ok: bool = True):
+    """Record a call made outside `hedged_call` (e.g. a tool); failures count as timeouts."""
+    stats = _stats_for(key)
+    stats.calls += 1
+    if ok:
+        stats.latencies.append(seconds)
+    else:
+        stats.timeouts += 1
+
+
+def call_metrics() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of per-node call latency, timeout and hedging metrics."""
+    snapshot = {}
+    for key, stats in _stats.items():
+        snapshot[key] = {
+            "calls": stats.calls,
+            "timeouts": stats.timeouts,
+            "hedges_fired": stats.hedges_fired,
+            "hedge_wins": stats.hedge_wins,
+            "hedge_win_rate": stats.hedge_wins / stats.hedges_fired if stats.hedges_fired else 0.0,
+            "p50_seconds": stats.percentile(50),
+            "p95_seconds": stats.percentile(95),
+        }
+    return snapshot
+
+
+def reset_call_metrics():
+    """Clear all collected latency metrics."""
+    _stats.clear()
@@ -0,0 +1,383 @@
+"""
+Non-blocking Logging Pipeline for THE ROUNDTABLE
+
+Every node logs a line or two per turn. With the stock setup, each of those
+writes to the console synchronously, on the event loop. With many concurrent
+debates, a slow terminal, pipe or log shipper stalls every debate. The
+entry points call `configure_logging()`, which sets up:
+
+- A `QueueHandler` on the root logger: callers only put the record on a
+  bounded in-memory queue (LOG_QUEUE_SIZE). A full queue drops the record
+  and counts it instead of blocking
+- A background `QueueListener` thread that formats and writes the records
+- Records stamped with the debate (checkpoint thread ID) and graph node they
+  were logged from (`log_context`, set by `run_demo` and each node), as
+  `debate` / `node` fields of JSON lines (LOG_FORMAT=json) or a
+  `[debate node]` suffix on text lines
+- Sampling of high-volume lines: past LOG_SAMPLE_BURST INFO/DEBUG records
+  per call site in LOG_SAMPLE_WINDOW_SECONDS, only one in LOG_SAMPLE_RATE is
+  kept (with a `suppressed` count). Warnings and errors are never sampled
+
+LOG_QUEUE=0 logs synchronously instead (the previous behaviour).
+
+Event loop stalls with a slow log sink, synchronous vs queued, 100 concurrent debates:
+    python -m src.log_pipeline bench [--debates 100] [--sink-ms 2]
+"""
+
+import argparse
+import asyncio
+import atexit
+import contextvars
+import copy
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+LOG_QUEUE = os.getenv("LOG_QUEUE", "1").lower() in ("1", "true", "yes")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # Records waiting for the writer before new ones are dropped
+LOG_SAMPLE_BURST = int(os.getenv("LOG_SAMPLE_BURST", "50"))  # INFO/DEBUG records per call site per window, all kept
+LOG_SAMPLE_RATE = int(os.getenv("LOG_SAMPLE_RATE", "10"))  # Past the burst, keep one in this many (1 = no sampling)
+LOG_SAMPLE_WINDOW_SECONDS = float(os.getenv("LOG_SAMPLE_WINDOW_SECONDS", "10"))
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_debate: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("roundtable_log_debate", default=None)
+_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("roundtable_log_node", default=None)
+
+# Graph node each running task works for, for the profiler's sampler thread
+# (which cannot read another task's context): set by `logged_node`, inherited by tasks it starts
+_task_nodes: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+_stats: Dict[str, int] = {"dropped": 0, "suppressed": 0}
+
+
+# --- Context ---
+
+@contextmanager
+def log_context(debate: Optional[str] = None, node: Optional[str] = None) -> Iterator[None]:
+    """Stamp records logged in this scope (and tasks it starts) with the debate and/or node."""
+    tokens = [(var, var.set(value)) for var, value in ((_debate, debate), (_node, node)) if value is not None]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def logged_node(node: str, fn):
+    """Wrap a graph node function so everything it logs (and every task it starts) carries its node name."""
+    @functools.wraps(fn)  # Keeps the signature LangGraph inspects (e.g. the `config` parameter)
+    async def node_with_context(*args, **kwargs):
+        task = asyncio.current_task()
+        _track_task_nodes(task.get_loop())
+        previous = _task_nodes.get(task)
+        _task_nodes[task] = node
+        try:
+            with log_context(node=node):
+                return await fn(*args, **kwargs)
+        finally:
+            if previous is None:
+                _task_nodes.pop(task, None)
+            else:
+                _task_nodes[task] = previous
+
+    return node_with_context
+
+
+def task_node(task: Optional[asyncio.Task]) -> Optional[str]:
+    """Graph node `task` runs for (or was started by), if any; safe to call from another thread."""
+    try:
+        return _task_nodes.get(task) if task is not None else None
+    except (TypeError, RuntimeError):  # Mapping changed under the sampler
+        return None
+
+
+def _track_task_nodes(loop: asyncio.AbstractEventLoop):
+    """Install (once per loop) a task factory that gives new tasks their creator's node, e.g. the model calls."""
+    factory = loop.get_task_factory()
+    if getattr(factory, "tracks_nodes", False):
+        return
+
+    def node_task_factory(loop, coro, **kwargs):
+        task = factory(loop, coro, **kwargs) if factory else asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        node = context.get(_node) if context is not None else _node.get()
+        if node is not None:
+            _task_nodes[task] = node
+        return task
+
+    node_task_factory.tracks_nodes = True
+    loop.set_task_factory(node_task_factory)
+
+
+class ContextFilter(logging.Filter):
+    """Adds `debate` and `node` from the caller's context (runs in the calling thread, before the queue)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.debate = _debate.get()
+        record.node = _node.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps every warning and error, and thins out INFO/DEBUG call sites that fire in bursts."""
+
+    def __init__(self, burst: int = LOG_SAMPLE_BURST, rate: int = LOG_SAMPLE_RATE, window: float = LOG_SAMPLE_WINDOW_SECONDS):
+        super().__init__()
+        self.burst, self.rate, self.window = burst, max(1, rate), window
+        self._sites: Dict[Tuple[str, int], list] = {}  # call site -> [window start, seen, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate == 1:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.get((record.pathname, record.lineno))
+            if site is None or now - site[0] > self.window:
+                site = self._sites[(record.pathname, record.lineno)] = [now, 0, 0]
+            site[1] += 1
+            if site[1] <= self.burst or (site[1] - self.burst) % self.rate == 0:
+                if site[2]:
+                    record.suppressed, site[2] = site[2], 0
+                return True
+            site[2] += 1
+            _stats["suppressed"] += 1
+            return False
+
+
+class RoundtableFormatter(logging.Formatter):
+    """Text lines with a `[debate node]` suffix, or one JSON object per record."""
+
+    def __init__(self, fmt: str = LOG_FORMAT):
+        super().__init__(TEXT_FORMAT)
+        self.json = fmt == "json"
+
+    def format(self, record: logging.LogRecord) -> str:
+        debate, node = getattr(record, "debate", None), getattr(record, "node", None)
+        suppressed = getattr(record, "suppressed", 0)
+        if not self.json:
+            line = super().format(record)
+            context = " ".join(part for part in (debate, node) if part)
+            extras = (f" [{context}]" if context else "") + (f" (+{suppressed} similar suppressed)" if suppressed else "")
+            if not extras:
+                return line
+            head, sep, tail = line.partition("\n")  # Keep a traceback below the context
+            return head + extras + sep + tail
+        data: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "debate": debate,
+            "node": node,
+            "pid": record.process,
+        }
+        if suppressed:
+            data["suppressed"] = suppressed
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: a record that finds the queue full is dropped and counted."""
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _stats["dropped"] += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the args and render the traceback now (the record crosses threads);
+        # the formatting itself, and its I/O, is left to the listener
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# --- Setup ---
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure_logging(
+    level: Any = LOG_LEVEL,
+    stream: Optional[TextIO] = None,
+    use_queue: bool = LOG_QUEUE,
+    sample_rate: int = LOG_SAMPLE_RATE,
+):
+    """
+    Root logging setup for entry points (CLI, Streamlit, API, worker processes).
+
+    Safe to call repeatedly (Streamlit calls it on every script run); only
+    the first call in a process installs the handlers.
+
+    Args:
+        level: Root log level (LOG_LEVEL)
+        stream: Where records are written (stderr by default)
+        use_queue: Hand records to a background writer thread (LOG_QUEUE)
+        sample_rate: Keep one in this many records of a bursting call site (LOG_SAMPLE_RATE)
+    """
+    global _listener, _configured
+    with _configure_lock:
+        if _configured:
+            return
+        _configured = True
+        sink = logging.StreamHandler(stream or sys.stderr)
+        sink.setFormatter(RoundtableFormatter())
+        front: logging.Handler = sink
+        if use_queue:
+            front = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+            _listener = logging.handlers.QueueListener(front.queue, sink, respect_handler_level=True)
+            _listener.start()
+            atexit.register(stop_logging)
+        front.addFilter(ContextFilter())
+        front.addFilter(SamplingFilter(rate=sample_rate))
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(front)
+
+
+def stop_logging():
+    """Write out everything still queued and stop the writer thread (at exit, and in worker processes)."""
+    global _listener
+    with _configure_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def logging_stats() -> Dict[str, int]:
+    """Records dropped on a full queue, suppressed by sampling, and currently queued."""
+    queued = _listener.queue.qsize() if _listener is not None else 0
+    return {**_stats, "queued": queued}
+
+
+# --- Benchmark ---
+
+class SlowStream:
+    """A log sink that takes `latency` seconds per write, like a slow terminal, pipe or shipper."""
+
+    def __init__(self, path: str, latency: float):
+        self.file = open(path, "w")
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text: str):
+        time.sleep(self.latency)
+        self.lines += 1
+        self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+
+async def _bench(debates: int, sink_ms: float, use_queue: bool, sample_rate: int) -> Dict[str, Any]:
+    import asyncio
+
+    from .backend import open_roundtable, run_demo
+
+    sink = SlowStream(os.devnull, sink_ms / 1000)
+    configure_logging(stream=sink, use_queue=use_queue, sample_rate=sample_rate)
+    path = "bench_logging.db"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        # How late the loop runs a 10 ms timer: the stall every other coroutine sees too
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    async with open_roundtable(path) as app:
+        monitor = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(run_demo(f"Should I take a 6-month sabbatical to travel the world next year? (variant {i})", app=app) for i in range(debates)),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await monitor
+    stop_logging()
+    lags.sort()
+    return {
+        "seconds": elapsed,
+        "failed": sum(isinstance(r, BaseException) for r in results),
+        "lag_p50_ms": lags[len(lags) // 2] * 1000,
+        "lag_p99_ms": lags[int(len(lags) * 0.99)] * 1000,
+        "lag_max_ms": lags[-1] * 1000,
+        "lines": sink.lines,
+        **logging_stats(),
+    }
+
+
+def _bench_child(debates: int, sink_ms: float, use_queue: bool, sample_rate: int, results):
+    import asyncio
+
+    results.put(asyncio.run(_bench(debates, sink_ms, use_queue, sample_rate)))
+
+
+def run_benchmark(debates: int = 100, sink_ms: float = 2.0):
+    """Event loop lag and wall time of concurrent offline debates, per logging configuration."""
+    import multiprocessing
+
+    os.environ["ROUNDTABLE_OFFLINE_LLM"] = "1"
+    os.environ.setdefault("ANALYTICS_EXPORT", "0")
+    ctx = multiprocessing.get_context("spawn")  # Logging is configured once per process
+    print(f"🪵 {debates} concurrent debates, log sink {sink_ms} ms per line")
+    configurations = (
+        ("synchronous, every line (previous)", False, 1),
+        ("synchronous, sampled", False, LOG_SAMPLE_RATE),
+        ("queued, sampled", True, LOG_SAMPLE_RATE),
+    )
+    for label, use_queue, sample_rate in configurations:
+        results = ctx.Queue()
+        child = ctx.Process(target=_bench_child, args=(debates, sink_ms, use_queue, sample_rate, results))
+        child.start()
+        r = results.get()
+        child.join()
+        print(f"   {label:<35} {r['seconds']:6.2f}s  loop lag p50 {r['lag_p50_ms']:6.1f} ms  p99 {r['lag_p99_ms']:7.1f} ms  "
+              f"max {r['lag_max_ms']:7.1f} ms  lines {r['lines']:5d}  suppressed {r['suppressed']:5d}  "
+              f"dropped {r['dropped']:4d}  failed {r['failed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Event loop lag under concurrent debates, synchronous vs queued logging")
+    bench_cmd.add_argument("--debates", type=int, default=100)
+    bench_cmd.add_argument("--sink-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(args.debates, args.sink_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,15 @@ This module simulates Notion data without requiring actual API credentials.
 Perfect for testing and demonstrations.
 """
 
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import random
+import threading
+
+# Editable collections, and how many edits are remembered for `changes_since`
+COLLECTIONS = ("projects", "tasks", "calendar_events")
+CHANGE_LOG_SIZE = 1000
 
 class MockNotionData:
     """Simulates Notion API responses with realistic mock data."""
@@ -17,6 +23,61 @@ class MockNotionData:
         self.tasks = self._generate_tasks()
         self.calendar_events = self._generate_calendar_events()
         self.notes = self._generate_notes()
+        # Bumped on every change so UI caches keyed by it never go stale
+        self.revision = 0
+        # (revision, collection, item id); collection None = unknown change, reload everything
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)
+        self._lock = threading.Lock()
+    
+    def touch(self):
+        """Record that workspace data changed (invalidates revision-keyed caches)."""
+        with self._lock:
+            self.revision += 1
+            self._changes.append((self.revision, None, None))
+    
+    def upsert(self, collection: str, item: Dict[str, Any]):
+        """Create or replace an item (matched by "id"), like editing a Notion page."""
+        with self._lock:
+            items = getattr(self, collection)
+            index = next((i for i, existing in enumerate(items) if existing["id"] == item["id"]), None)
+            if index is None:
+                items.append(item)
+            else:
+                items[index] = item
+            self._record(collection, item["id"])
+    
+    def delete(self, collection: str, item_id: str):
+        """Remove an item (archiving a Notion page)."""
+        with self._lock:
+            setattr(self, collection, [item for item in getattr(self, collection) if item["id"] != item_id])
+            self._record(collection, item_id)
+    
+    def _record(self, collection: str, item_id: str):
+        if collection not in COLLECTIONS:
+            raise ValueError(f"Unknown collection '{collection}'; expected one of {COLLECTIONS}.")
+        self.revision += 1
+        self._changes.append((self.revision, collection, item_id))
+    
+    def changes_since(self, revision: int) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Items changed after `revision` (like a Notion `last_edited_time` query).
+        
+        Returns:
+            {collection: {item_id: item, or None if deleted}} for the edited
+            collections, or None when the change log cannot tell (too old, or
+            an untracked `touch`): the caller must reload everything
+        """
+        with self._lock:
+            if revision == self.revision:
+                return {}
+            logged = [change for change in self._changes if change[0] > revision]
+            if len(logged) != self.revision - revision or any(collection is None for _, collection, _ in logged):
+                return None
+            changed: Dict[str, Dict[str, Any]] = {}
+            for _, collection, item_id in logged:
+                current = next((item for item in getattr(self, collection) if item["id"] == item_id), None)
+                changed.setdefault(collection, {})[item_id] = dict(current) if current is not None else None
+            return changed
     
     def _generate_projects(self) -> List[Dict[str, Any]]:
         """Generate mock project data."""
@@ -224,7 +285,26 @@ class MockNotionData:
     def get_all_tasks(self) -> List[Dict[str, Any]]:
         """Get all tasks."""
         return self.tasks
+    
+    def get_all_calendar_events(self) -> List[Dict[str, Any]]:
+        """Get every calendar event, past and upcoming."""
+        return self.calendar_events
+
+
+# Global instance, built on first use rather than at import
+_mock_data = None
+
+
+def get_mock_data() -> MockNotionData:
+    """The shared workspace (created on first call)."""
+    global _mock_data
+    if _mock_data is None:
+        _mock_data = MockNotionData()
+    return _mock_data
 
 
-# Global instance for easy access
-mock_data = MockNotionData()
+def __getattr__(name: str):
+    # Keeps `from src.mock_data import mock_data` working without an import-time constructor
+    if name == "mock_data":
+        return get_mock_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
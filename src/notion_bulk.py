@@ -0,0 +1,471 @@
+"""
+Bulk Notion Writes for THE ROUNDTABLE
+
+Planning answers can schedule dozens of events. Created one tool call at a
+time, each event re-resolved the calendar database, waited for its page, and
+a retried agent turn created every event again. `create_events` does the
+whole batch at once:
+
+- The calendar database is resolved once for the batch (by the caller)
+- Pages are created concurrently, at most NOTION_MAX_CONCURRENCY at a time,
+  through a process-wide `RateLimiter` that keeps every Notion request under
+  NOTION_RATE_LIMIT_PER_SECOND (Notion allows ~3 requests/second on average);
+  a 429 pauses the limiter for the server's Retry-After and the request is
+  retried
+- Each event gets an idempotency key (given, or a hash of database, title
+  and times) that is claimed in a local SQLite store before the page is
+  created and records the page id after. An event whose key is already
+  there (a retried turn, a duplicate in the batch, a concurrent call) is
+  skipped instead of created twice. A failed create releases its claim. A
+  key claimed by a create still in flight is waited on (up to
+  IN_FLIGHT_WAIT_SECONDS): it is skipped once that create records its page,
+  created here if that create fails, and otherwise reported as in progress,
+  never as already created
+
+The behaviour is tested against a local mock Notion server in
+tests/test_notion_bulk.py (`check` runs those tests); `bench` compares
+one-at-a-time creation with the bulk path:
+    python -m src.notion_bulk check
+    python -m src.notion_bulk bench [--events 30] [--latency-ms 250]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+NOTION_RATE_LIMIT_PER_SECOND = float(os.getenv("NOTION_RATE_LIMIT_PER_SECOND", "3"))
+NOTION_RATE_BURST = int(os.getenv("NOTION_RATE_BURST", "3"))
+NOTION_MAX_CONCURRENCY = int(os.getenv("NOTION_MAX_CONCURRENCY", "6"))
+NOTION_MAX_RETRIES = 4
+NOTION_IDEMPOTENCY_PATH = os.getenv("NOTION_IDEMPOTENCY_PATH", "notion_idempotency.db")
+IDEMPOTENCY_TTL_SECONDS = 30 * 24 * 3600
+CLAIM_TIMEOUT_SECONDS = 600  # A claim with no page after this long is from a crashed writer
+IN_FLIGHT_WAIT_SECONDS = float(os.getenv("NOTION_IN_FLIGHT_WAIT_SECONDS", "15"))  # For another create of the same key
+IN_FLIGHT_POLL_SECONDS = 0.2
+RETRYABLE_CODES = {"rate_limited", "internal_server_error", "service_unavailable", "conflict_error"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notion_idempotency (
+    key TEXT PRIMARY KEY,
+    page_id TEXT,
+    summary TEXT NOT NULL,
+    claimed_at REAL NOT NULL
+);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every Notion request in the process.
+
+    Tokens may go negative: each caller reserves the next slot and sleeps
+    until it, so waiters are served in arrival order without polling.
+    """
+
+    def __init__(self, rate: float = NOTION_RATE_LIMIT_PER_SECOND, burst: int = NOTION_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self):
+        """Wait for the next request slot."""
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold every caller back for `seconds` (the server said Retry-After)."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class IdempotencyStore:
+    """Idempotency keys of created pages (SQLite, one short-lived connection per call)."""
+
+    def __init__(self, path: str = NOTION_IDEMPOTENCY_PATH):
+        self.path = path
+        self._schema_ready = False
+        self._db_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def claim(self, key: str, summary: str) -> Tuple[bool, Optional[str]]:
+        """
+        Reserve `key` for a create.
+
+        Returns:
+            (True, None) if the caller now owns the key and should create the
+            page; (False, page id or None while another create is in flight)
+            if it is taken
+        """
+        now = time.time()
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM notion_idempotency WHERE claimed_at < ?", (now - IDEMPOTENCY_TTL_SECONDS,))
+                conn.execute(
+                    "DELETE FROM notion_idempotency WHERE key = ? AND page_id IS NULL AND claimed_at < ?",
+                    (key, now - CLAIM_TIMEOUT_SECONDS),
+                )
+                claimed = conn.execute(
+                    "INSERT OR IGNORE INTO notion_idempotency (key, page_id, summary, claimed_at) VALUES (?, NULL, ?, ?)",
+                    (key, summary, now),
+                ).rowcount == 1
+                row = None if claimed else conn.execute("SELECT page_id FROM notion_idempotency WHERE key = ?", (key,)).fetchone()
+                conn.commit()
+            finally:
+                conn.close()
+        return claimed, (row[0] if row else None)
+
+    def complete(self, key: str, page_id: str):
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                conn.execute("UPDATE notion_idempotency SET page_id = ? WHERE key = ?", (page_id, key))
+                conn.commit()
+            finally:
+                conn.close()
+
+    def release(self, key: str):
+        """Give up a claim whose create failed, so a retry may create the page."""
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM notion_idempotency WHERE key = ? AND page_id IS NULL", (key,))
+                conn.commit()
+            finally:
+                conn.close()
+
+
+def idempotency_key(database_id: str, event: Dict[str, Any]) -> str:
+    """The event's own `idempotency_key`, or a hash of the database, title and times."""
+    if event.get("idempotency_key"):
+        return str(event["idempotency_key"])
+    parts = (database_id, event.get("summary", "").strip().lower(), event.get("start_time", ""), event.get("end_time", ""))
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+def event_page(database_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+    """Page payload for an event; assumes the "Name" (title) and "Date" (date) properties."""
+    date = {"start": event["start_time"]}
+    if event.get("end_time"):
+        date["end"] = event["end_time"]
+    page = {
+        "parent": {"database_id": database_id},
+        "properties": {
+            "Name": {"title": [{"text": {"content": event["summary"]}}]},
+            "Date": {"date": date},
+        },
+    }
+    if event.get("description"):
+        page["children"] = [{
+            "object": "block",
+            "type": "paragraph",
+            "paragraph": {"rich_text": [{"type": "text", "text": {"content": event["description"]}}]},
+        }]
+    return page
+
+
+@dataclass
+class BulkResult:
+    """Outcome of a bulk create, per event (in request order within each list)."""
+    created: List[Tuple[str, str]] = field(default_factory=list)  # (summary, page id)
+    skipped: List[Tuple[str, Optional[str]]] = field(default_factory=list)  # (summary, existing page id)
+    failed: List[Tuple[str, str]] = field(default_factory=list)  # (summary, error)
+    in_progress: List[Tuple[str, str]] = field(default_factory=list)  # (summary, idempotency key): another create still running
+
+    def describe(self, db_name: str) -> str:
+        counts = f"created {len(self.created)}, already existed {len(self.skipped)}"
+        if self.in_progress:
+            counts += f", still being created by another call {len(self.in_progress)}"
+        lines = [f"Database '{db_name}': {counts}, failed {len(self.failed)}."]
+        lines += [f"- created: {summary}" for summary, _ in self.created]
+        lines += [f"- already created: {summary}" for summary, _ in self.skipped]
+        lines += [f"- not confirmed yet (another call is creating it, check again later): {summary}" for summary, _ in self.in_progress]
+        lines += [f"- FAILED: {summary} ({error})" for summary, error in self.failed]
+        return "\n".join(lines)
+
+
+_limiter: Optional[RateLimiter] = None
+_store: Optional[IdempotencyStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter for Notion requests."""
+    global _limiter
+    with _shared_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _store
+    with _shared_lock:
+        if _store is None:
+            _store = IdempotencyStore()
+        return _store
+
+
+async def rate_limited(call: Callable[[], Awaitable[Any]], limiter: Optional[RateLimiter] = None) -> Any:
+    """Run a Notion request under the shared limiter, retrying 429s and transient errors."""
+    limiter = limiter or get_rate_limiter()
+    for attempt in range(NOTION_MAX_RETRIES + 1):
+        await limiter.acquire()
+        try:
+            return await call()
+        except Exception as e:
+            code = getattr(e, "code", None)
+            if code not in RETRYABLE_CODES or attempt == NOTION_MAX_RETRIES:
+                raise
+            headers = getattr(e, "headers", None) or {}
+            retry_after = float(headers.get("retry-after", 2 ** attempt * 0.5))
+            if code == "rate_limited":
+                limiter.pause(retry_after)
+            else:
+                await asyncio.sleep(retry_after)
+            logger.info(f"📅 Notion {code}, retrying in {retry_after:.1f}s (attempt {attempt + 1}/{NOTION_MAX_RETRIES})")
+
+
+async def create_events(
+    notion,
+    database_id: str,
+    events: Sequence[Dict[str, Any]],
+    limiter: Optional[RateLimiter] = None,
+    store: Optional[IdempotencyStore] = None,
+    concurrency: int = NOTION_MAX_CONCURRENCY,
+) -> BulkResult:
+    """
+    Create a page per event in `database_id`, concurrently and at most once per idempotency key.
+
+    Args:
+        notion: notion_client.AsyncClient
+        database_id: Calendar database (resolved once by the caller)
+        events: Dicts with summary, start_time, optional end_time,
+            description and idempotency_key
+        limiter: Request limiter (default: the process-wide one)
+        store: Idempotency store (default: NOTION_IDEMPOTENCY_PATH)
+        concurrency: Maximum creates in flight
+
+    Returns:
+        BulkResult listing created, skipped (already created), failed and
+        in-progress (claimed by another create that has not finished) events
+    """
+    store = store or get_idempotency_store()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    result = BulkResult()
+    outcomes: List[Tuple[str, str, Any]] = [("", "", None)] * len(events)
+
+    async def create(i: int, event: Dict[str, Any]):
+        summary = event.get("summary", "")
+        key = idempotency_key(database_id, event)
+        claimed, page_id = await asyncio.to_thread(store.claim, key, summary)
+        # Another create holds the key: wait for its page, or for it to fail and release the claim
+        deadline = time.monotonic() + IN_FLIGHT_WAIT_SECONDS
+        while not claimed and page_id is None and time.monotonic() < deadline:
+            await asyncio.sleep(IN_FLIGHT_POLL_SECONDS)
+            claimed, page_id = await asyncio.to_thread(store.claim, key, summary)
+        if not claimed:
+            outcomes[i] = ("skipped", summary, page_id) if page_id else ("in_progress", summary, key)
+            return
+        try:
+            async with semaphore:
+                page = await rate_limited(lambda: notion.pages.create(**event_page(database_id, event)), limiter)
+        except Exception as e:
+            await asyncio.to_thread(store.release, key)
+            outcomes[i] = ("failed", summary, str(e))
+            return
+        await asyncio.to_thread(store.complete, key, page["id"])
+        outcomes[i] = ("created", summary, page["id"])
+
+    await asyncio.gather(*(create(i, event) for i, event in enumerate(events)))
+    for outcome, summary, detail in outcomes:
+        getattr(result, outcome).append((summary, detail))
+    return result
+
+
+# --- Local mock Notion server (tests and benchmark) ---
+
+class MockNotionServer:
+    """
+    Minimal Notion API on localhost: database search and page creation.
+
+    Requests beyond `rate` per second (bucket of `burst`) get a 429
+    rate_limited error with Retry-After, like the real API; every request
+    takes `latency` seconds.
+    """
+
+    def __init__(self, latency: float = 0.25, rate: float = NOTION_RATE_LIMIT_PER_SECOND, burst: int = 10):
+        self.latency = latency
+        self.bucket = RateLimiter(rate, burst)
+        self.pages: List[Dict[str, Any]] = []
+        self.counters: Counter = Counter()
+        self.request_times: List[float] = []
+        self.port = 0
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _app(self):
+        from starlette.applications import Starlette
+        from starlette.requests import Request
+        from starlette.responses import JSONResponse
+        from starlette.routing import Route
+
+        async def limited(request: Request) -> Optional[JSONResponse]:
+            self.counters["requests"] += 1
+            self.request_times.append(time.monotonic())
+            if self.bucket._reserve() > 0:
+                self.bucket._tokens += 1  # Rejected requests don't consume capacity
+                self.counters["rate_limited"] += 1
+                return JSONResponse(
+                    {"object": "error", "status": 429, "code": "rate_limited", "message": "Rate limited"},
+                    status_code=429, headers={"Retry-After": "1"},
+                )
+            await asyncio.sleep(self.latency)
+            return None
+
+        async def search(request: Request):
+            rejected = await limited(request)
+            if rejected:
+                return rejected
+            self.counters["searches"] += 1
+            return JSONResponse({"object": "list", "results": [
+                {"object": "database", "id": "db-calendar", "title": [{"plain_text": "Calendar"}]},
+            ]})
+
+        async def create_page(request: Request):
+            rejected = await limited(request)
+            if rejected:
+                return rejected
+            body = await request.json()
+            page = {"object": "page", "id": f"page-{len(self.pages) + 1}", **body}
+            self.pages.append(page)
+            return JSONResponse(page)
+
+        return Starlette(routes=[Route("/v1/search", search, methods=["POST"]), Route("/v1/pages", create_page, methods=["POST"])])
+
+    def __enter__(self) -> "MockNotionServer":
+        import socket
+        import uvicorn
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(self._app(), host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def peak_rate(self, window: float = 1.0) -> int:
+        """Most requests the server accepted or rejected within any `window` seconds."""
+        times, peak, start = self.request_times, 0, 0
+        for end in range(len(times)):
+            while times[end] - times[start] > window:
+                start += 1
+            peak = max(peak, end - start + 1)
+        return peak
+
+
+def _events(count: int, tag: str) -> List[Dict[str, Any]]:
+    return [
+        {"summary": f"{tag} session {i + 1}", "start_time": f"2026-02-{1 + i % 28:02d}T09:00:00", "end_time": f"2026-02-{1 + i % 28:02d}T10:00:00"}
+        for i in range(count)
+    ]
+
+
+async def _bulk(server: MockNotionServer, events, store: IdempotencyStore) -> Tuple[BulkResult, float]:
+    from notion_client import AsyncClient
+
+    notion = AsyncClient(auth="mock", base_url=server.base_url)
+    start = time.perf_counter()
+    search = await rate_limited(lambda: notion.search(query="Calendar"))
+    result = await create_events(notion, search["results"][0]["id"], events, store=store)
+    return result, time.perf_counter() - start
+
+
+async def _one_by_one(server: MockNotionServer, events) -> float:
+    # The single-event tool before bulk creation: resolve the database, then create, per event
+    from notion_client import AsyncClient
+
+    notion = AsyncClient(auth="mock", base_url=server.base_url)
+    start = time.perf_counter()
+    for event in events:
+        search = await rate_limited(lambda: notion.search(query="Calendar"))
+        await rate_limited(lambda: notion.pages.create(**event_page(search["results"][0]["id"], event)))
+    return time.perf_counter() - start
+
+
+def run_check() -> int:
+    """Run the mock-server tests in tests/test_notion_bulk.py; returns pytest's exit status."""
+    import pytest
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return int(pytest.main(["-q", os.path.join(root, "tests", "test_notion_bulk.py")]))
+
+
+def run_benchmark(count: int = 30, latency_ms: float = 250.0):
+    """Wall time to schedule `count` events: one tool call per event vs one bulk call."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with MockNotionServer(latency=latency_ms / 1000) as server:
+            serial = asyncio.run(_one_by_one(server, _events(count, "Serial")))
+            result, bulk = asyncio.run(_bulk(server, _events(count, "Bulk"), IdempotencyStore(os.path.join(tmp, "bench.db"))))
+    print(f"📅 {count} events, {latency_ms:g} ms per Notion request, {NOTION_RATE_LIMIT_PER_SECOND:g} requests/s")
+    print(f"   one by one  {serial:6.1f}s ({2 * count} requests)")
+    print(f"   bulk        {bulk:6.1f}s ({count + 1} requests, {len(result.created)} created)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk Notion event creation")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("check", help="Run the mock Notion server tests (tests/test_notion_bulk.py)")
+    bench_cmd = sub.add_parser("bench", help="One-by-one vs bulk event creation time")
+    bench_cmd.add_argument("--events", type=int, default=30)
+    bench_cmd.add_argument("--latency-ms", type=float, default=250.0)
+    args = parser.parse_args()
+    if args.command == "check":
+        raise SystemExit(run_check())
+    elif args.command == "bench":
+        run_benchmark(args.events, args.latency_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Offline Model Stand-in for THE ROUNDTABLE
+
+A deterministic chat model that mimics the shape of each agent's answers
+(the Chief of Staff's YES/NO decision and search report, the panelists'
+proposals and critiques, the Chair's DECISION line) without network access or
+credentials. Benchmarks, load tests and local profiling run the real graph
+with this model so results are reproducible.
+
+Enable it with `ROUNDTABLE_OFFLINE_LLM=1`; `OFFLINE_LLM_LATENCY_SECONDS`
+simulates provider latency (default 0.05s per call) and
+`OFFLINE_LLM_INPUT_SECONDS_PER_1K_TOKENS` the time spent reading the prompt
+(default 0). A prefix served from the local prefix cache (`cached_prefix`) is
+read back into the prompt but not charged input time, like a provider cache.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+OFFLINE_LLM = os.getenv("ROUNDTABLE_OFFLINE_LLM", "0").lower() in ("1", "true", "yes")
+OFFLINE_LLM_LATENCY_SECONDS = float(os.getenv("OFFLINE_LLM_LATENCY_SECONDS", "0.05"))
+OFFLINE_LLM_INPUT_SECONDS_PER_1K_TOKENS = float(os.getenv("OFFLINE_LLM_INPUT_SECONDS_PER_1K_TOKENS", "0"))
+
+_VOCABULARY = (
+    "budget", "timeline", "savings", "deadline", "opportunity", "risk", "runway", "calendar",
+    "milestone", "growth", "career", "project", "commitment", "buffer", "priority", "upside",
+    "contingency", "network", "skills", "momentum", "cashflow", "tradeoff", "evidence", "plan",
+)
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    return content if isinstance(content, str) else str(content)
+
+
+def _tokens(messages: List[BaseMessage]) -> int:
+    return sum(len(_text(m)) for m in messages) // 4
+
+
+def _prose(seed: str, sentences: int) -> str:
+    """Varied, non-repeating filler text derived from `seed`."""
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    lines = []
+    for i in range(sentences):
+        words = [_VOCABULARY[(digest[(i * 3 + j) % len(digest)] + i * 7 + j) % len(_VOCABULARY)] for j in range(6)]
+        lines.append(f"Point {i + 1}: the {words[0]} and {words[1]} suggest the {words[2]} matters more than the {words[3]}, so weigh {words[4]} against {words[5]}.")
+    return " ".join(lines)
+
+
+class OfflineChatModel(BaseChatModel):
+    """Deterministic, network-free stand-in for ChatGoogleGenerativeAI."""
+
+    model: str = "offline"
+    temperature: float = 0.0
+    max_output_tokens: Optional[int] = None
+    latency_seconds: float = OFFLINE_LLM_LATENCY_SECONDS
+    input_seconds_per_1k_tokens: float = OFFLINE_LLM_INPUT_SECONDS_PER_1K_TOKENS
+    cached_prefix: List[BaseMessage] = []  # Stands in for the provider's cached content
+
+    @property
+    def _llm_type(self) -> str:
+        return "roundtable-offline"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "OfflineChatModel":
+        # The stand-in never emits tool calls, so binding is a no-op
+        return self
+
+    def _delay(self, messages: List[BaseMessage]) -> float:
+        return self.latency_seconds + _tokens(messages) / 1000 * self.input_seconds_per_1k_tokens
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        system = next((_text(m) for m in messages if isinstance(m, SystemMessage)), "")
+        last = _text(messages[-1]) if messages else ""
+        seed = f"{self.model}:{self.temperature}:{len(messages)}:{last[-200:]}"
+
+        if "Respond with ONLY one word" in last:
+            external = any(word in last.lower() for word in ("buy", "price", "movie", "stock", "market"))
+            return "YES" if external else "NO"
+        if "research assistant" in last:
+            return "**Web Search Results:**\n" + _prose(seed, 4)
+        if "The Chair" in system or "DEBATE STATUS" in last:
+            if "DEBATE STATUS" in last and "FINAL ROUND" not in last:
+                # Worst case for benchmarks: the board uses every round it is allowed
+                return "NEEDS_REVISION: " + _prose(seed, 3)
+            verdict = "OPPOSE" if int(hashlib.sha256(seed.encode()).hexdigest(), 16) % 3 == 0 else "SUPPORT"
+            icon = "❌" if verdict == "OPPOSE" else "✅"
+            return f"**{icon} DECISION: {verdict}**\n\n" + _prose(seed, 5)
+        return _prose(seed, 8)
+
+    def _result(self, messages: List[BaseMessage]) -> AIMessage:
+        text = self._answer([*self.cached_prefix, *messages])
+        if self.max_output_tokens:
+            text = text[: self.max_output_tokens * 4]
+        cached_tokens = _tokens(self.cached_prefix)
+        input_tokens = cached_tokens + _tokens(messages)
+        return AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": len(text) // 4,
+                "total_tokens": input_tokens + len(text) // 4,
+                "input_token_details": {"cache_read": cached_tokens},
+            },
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._delay(messages))
+        return ChatResult(generations=[ChatGeneration(message=self._result(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._delay(messages))
+        return ChatResult(generations=[ChatGeneration(message=self._result(messages))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._delay(messages))
+        yield from self._chunks(self._result(messages))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._delay(messages))
+        for chunk in self._chunks(self._result(messages)):
+            yield chunk
+
+    @staticmethod
+    def _chunks(message: AIMessage, size: int = 64) -> Iterator[ChatGenerationChunk]:
+        text = message.content
+        for start in range(0, len(text), size):
+            last = start + size >= len(text)
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=text[start:start + size],
+                usage_metadata=message.usage_metadata if last else None,
+            ))
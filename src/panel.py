@@ -0,0 +1,171 @@
+"""
+Panel Configuration for THE ROUNDTABLE
+
+Declarative description of the board: which panelists sit at the table, how
+each one is prompted, and how a debate round is scheduled. The LangGraph
+workflow in `backend.py` is generated from a `PanelConfig`, so adding a new
+voice to the board means adding an entry here, not rewiring the graph.
+
+Scheduling model:
+- Panelists without `after` dependencies fan out in parallel from the
+  Chief of Staff (and from the Chair when it asks for another round)
+- Panelists with `after` dependencies run once the named panelists finish
+- The Chair fans in once every panelist of the round has reported
+- A shared semaphore caps how many panelists call the model at once, and a
+  per-round deadline keeps a slow panelist from blocking the Chair
+- Round deadlines shrink to fit the debate's overall latency budget
+"""
+
+import asyncio
+import os
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .validation import ResponseRules
+
+PANEL_MAX_CONCURRENCY = int(os.getenv("PANEL_MAX_CONCURRENCY", "4"))
+ROUND_DEADLINE_SECONDS = float(os.getenv("ROUND_DEADLINE_SECONDS", "90"))
+MIN_ROUND_SECONDS = float(os.getenv("MIN_ROUND_SECONDS", "5"))
+PANELIST_SHARE = 0.7  # Fraction of each round's time slot given to panelists; the rest is the Chair's
+
+
+@dataclass(frozen=True)
+class PanelistConfig:
+    """
+    One seat at the table.
+
+    Attributes:
+        node: Graph node id (e.g. "visionary")
+        name: Agent name attached to the panelist's messages (e.g. "Aria")
+        title: Human-readable role used in logs
+        icon: Emoji used in logs
+        instruction: Persona system instruction
+        temperature: Sampling temperature for this persona
+        model: Gemini model name
+        tools: Names of tools from `src.tools` to bind to the model
+        turn_prompt: Per-turn instruction, formatted with `question` and,
+            when `ground_truth` is set, `projects`, `tasks`, `calendar_events`
+            and `notes` (the records most relevant to the turn)
+        ground_truth: Whether to render selected workspace data into the turn prompt
+        after: Node ids that must finish before this panelist speaks
+        default_stance: Message used when the panelist misses the round
+            deadline, fails, or never produces a valid answer; if None, the
+            panelist is dropped instead
+        rules: Validation applied to every answer (length, markers, loops)
+    """
+    node: str
+    name: str
+    title: str
+    icon: str
+    instruction: str
+    temperature: float
+    model: str
+    tools: Tuple[str, ...] = ()
+    turn_prompt: str = ""
+    ground_truth: bool = False
+    after: Tuple[str, ...] = ()
+    default_stance: Optional[str] = None
+    rules: ResponseRules = ResponseRules()
+
+
+@dataclass(frozen=True)
+class PanelConfig:
+    """
+    The full board: panelists plus the Chair who rules on their debate.
+
+    Attributes:
+        panelists: Debating members, in speaking order for tie-breaks
+        chair: The moderator that closes every round
+        max_concurrency: Maximum panelists calling the model at once
+        round_deadline_seconds: Wall-clock budget for the panelists of a round
+    """
+    panelists: Tuple[PanelistConfig, ...]
+    chair: PanelistConfig
+    max_concurrency: int = PANEL_MAX_CONCURRENCY
+    round_deadline_seconds: float = ROUND_DEADLINE_SECONDS
+    _by_node: Dict[str, PanelistConfig] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        by_node = {p.node: p for p in self.panelists}
+        if len(by_node) != len(self.panelists):
+            raise ValueError("Panelist node ids must be unique.")
+        reserved = {"chief_of_staff", self.chair.node}
+        for panelist in self.panelists:
+            if panelist.node in reserved:
+                raise ValueError(f"Panelist node id '{panelist.node}' is reserved.")
+            unknown = [dep for dep in panelist.after if dep not in by_node]
+            if unknown:
+                raise ValueError(f"Panelist '{panelist.node}' depends on unknown panelists: {unknown}")
+        object.__setattr__(self, "_by_node", by_node)
+        # Fail fast on dependency cycles, which would deadlock the round
+        self.stages()
+
+    def roots(self) -> List[str]:
+        """Panelists that open a round (no dependencies)."""
+        return [p.node for p in self.panelists if not p.after]
+
+    def sinks(self) -> List[str]:
+        """Panelists nobody waits on; the Chair joins on these."""
+        depended_on = {dep for p in self.panelists for dep in p.after}
+        return [p.node for p in self.panelists if p.node not in depended_on]
+
+    def stages(self) -> List[List[str]]:
+        """Group panelists into dependency levels (level 0 runs first)."""
+        remaining = {p.node: set(p.after) for p in self.panelists}
+        done: set = set()
+        stages = []
+        while remaining:
+            ready = [node for node, deps in remaining.items() if deps <= done]
+            if not ready:
+                raise ValueError(f"Panel has a dependency cycle among: {sorted(remaining)}")
+            stages.append(ready)
+            done.update(ready)
+            for node in ready:
+                del remaining[node]
+        return stages
+
+    def get(self, node: str) -> PanelistConfig:
+        return self._by_node[node]
+
+
+# One semaphore per event loop: Streamlit and the CLI each call asyncio.run(),
+# and an asyncio.Semaphore must not be shared across loops.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def panel_semaphore(limit: int) -> asyncio.Semaphore:
+    """Return the shared panel semaphore for the running loop."""
+    loop = asyncio.get_running_loop()
+    per_loop = _semaphores.setdefault(loop, {})
+    if limit not in per_loop:
+        per_loop[limit] = asyncio.Semaphore(max(1, limit))
+    return per_loop[limit]
+
+
+def next_round_deadline(panel: PanelConfig, debate_deadline: Optional[float], rounds_left: int) -> Optional[float]:
+    """
+    Deadline for the panelists of the next round.
+
+    Design: The debate's remaining latency budget is split evenly across the
+    rounds that may still run, and panelists get PANELIST_SHARE of each slot so
+    the Chair always has time left to rule. The panel's own
+    `round_deadline_seconds` caps the window when the budget is generous.
+
+    Args:
+        panel: Board config
+        debate_deadline: Epoch seconds by which the whole debate must finish
+        rounds_left: Rounds that may still run, including the next one
+
+    Returns:
+        Epoch deadline, or None if fewer than MIN_ROUND_SECONDS remain
+    """
+    now = time.time()
+    window = panel.round_deadline_seconds
+    if debate_deadline:
+        slot = (debate_deadline - now) / max(1, rounds_left)
+        window = min(window, slot * PANELIST_SHARE)
+    if window < MIN_ROUND_SECONDS:
+        return None
+    return now + window
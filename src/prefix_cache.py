@@ -0,0 +1,288 @@
+"""
+Prompt-Prefix Cache for THE ROUNDTABLE
+
+Every panelist turn starts with the same messages: the persona instruction,
+the user's question and the Chief of Staff's context report. Within a debate
+that prefix never changes between rounds, and the instruction never changes
+at all. This module registers such a prefix once with the provider's
+cached-content mechanism (Gemini context caching) and, on later turns, sends
+only the new suffix plus the cache's name:
+
+- `PrefixCache.split` picks the longest registered (or registrable) prefix
+  and returns the cached-content name with the messages still to send
+- Entries are keyed by a hash of model + prefix content, so a debate's
+  prefix is registered once per debate and an instruction once per process
+- Prefixes shorter than PREFIX_CACHE_MIN_TOKENS are not registered (the
+  provider refuses small caches, and they would not pay for themselves)
+- A failed or slow registration falls back to sending the full prompt; the
+  prefix is not retried until its TTL would have run out
+
+`GeminiPrefixStore` talks to the Generative Language cache service;
+`LocalPrefixStore` keeps prefixes in memory, and the offline model expands
+them again, so the whole path runs (and can be benchmarked) without network.
+Calls that bind tools are never split: a cached prefix would have to carry
+the tool declarations too.
+
+Compare prompt tokens and latency per debate with and without the cache
+(offline model, simulated input-token cost):
+    python -m src.prefix_cache bench [--debates 10] [--input-ms-per-1k 40]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage
+
+PREFIX_CACHE = os.getenv("PREFIX_CACHE", "1").lower() in ("1", "true", "yes")
+PREFIX_CACHE_MIN_TOKENS = int(os.getenv("PREFIX_CACHE_MIN_TOKENS", "1024"))
+PREFIX_CACHE_DEBATE_TTL_SECONDS = float(os.getenv("PREFIX_CACHE_DEBATE_TTL_SECONDS", "900"))
+PREFIX_CACHE_INSTRUCTION_TTL_SECONDS = float(os.getenv("PREFIX_CACHE_INSTRUCTION_TTL_SECONDS", "3600"))
+PREFIX_CACHE_CREATE_TIMEOUT_SECONDS = 10.0
+EXPIRY_MARGIN_SECONDS = 30  # Don't hand out a cache that may expire mid-call
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Rough token count (4 characters per token), good enough for thresholds."""
+    return sum(len(m.content if isinstance(m.content, str) else str(m.content)) for m in messages) // 4
+
+
+def prefix_key(model: str, messages: Sequence[BaseMessage]) -> str:
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for message in messages:
+        digest.update(f"\x00{message.type}\x00{message.content}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PrefixStore:
+    """Where cached prefixes live (the provider, or memory for the offline model)."""
+
+    async def create(self, model: str, messages: Sequence[BaseMessage], ttl: float) -> str:
+        """Register `messages` as a cached prefix for `model`; returns its name."""
+        raise NotImplementedError
+
+
+class GeminiPrefixStore(PrefixStore):
+    """Gemini context caching via the Generative Language cache service."""
+
+    def __init__(self, api_key: Optional[str]):
+        self.api_key = api_key
+
+    async def create(self, model: str, messages: Sequence[BaseMessage], ttl: float) -> str:
+        # Deferred: the SDK is heavy and only needed when a prefix is registered
+        from google.ai.generativelanguage_v1beta import CacheServiceAsyncClient, CachedContent
+        from langchain_google_genai.chat_models import _parse_chat_history
+
+        system_instruction, contents = _parse_chat_history(list(messages), model=model)
+        client = CacheServiceAsyncClient(client_options={"api_key": self.api_key})
+        cached = await client.create_cached_content(cached_content=CachedContent(
+            model=model if model.startswith("models/") else f"models/{model}",
+            system_instruction=system_instruction,
+            contents=contents,
+            ttl=timedelta(seconds=ttl),
+        ))
+        return cached.name
+
+
+class LocalPrefixStore(PrefixStore):
+    """
+    In-memory stand-in: holds prefixes so the offline model can expand them.
+    Like the provider, it drops a prefix once its TTL has run out.
+    """
+
+    def __init__(self):
+        self._prefixes: Dict[str, Tuple[float, List[BaseMessage]]] = {}  # name -> (expires at, messages)
+        self._lock = threading.Lock()
+
+    async def create(self, model: str, messages: Sequence[BaseMessage], ttl: float) -> str:
+        name = f"cachedContents/local-{uuid.uuid4().hex[:12]}"
+        now = time.time()
+        with self._lock:
+            for expired in [n for n, (expires_at, _) in self._prefixes.items() if expires_at <= now]:
+                del self._prefixes[expired]
+            self._prefixes[name] = (now + ttl, list(messages))
+        return name
+
+    def contents(self, name: str) -> List[BaseMessage]:
+        """The prefix registered under `name` (KeyError if it was never created or has expired)."""
+        with self._lock:
+            return list(self._prefixes[name][1])
+
+
+@dataclass
+class _Entry:
+    name: Optional[str]  # None: registration failed, don't retry before `expires_at`
+    expires_at: float
+
+
+class PrefixCache:
+    """Registry of cached prompt prefixes, shared by every debate in the process."""
+
+    def __init__(self, store: PrefixStore, min_tokens: int = PREFIX_CACHE_MIN_TOKENS, enabled: bool = PREFIX_CACHE):
+        self.store = store
+        self.min_tokens = min_tokens
+        self.enabled = enabled
+        self.counters: Counter = Counter()
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        # In-flight registrations, per event loop (a task must not be awaited from another loop)
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+
+    async def split(
+        self,
+        model: str,
+        messages: List[BaseMessage],
+        candidates: Sequence[Tuple[int, float]],
+    ) -> Tuple[Optional[str], List[BaseMessage]]:
+        """
+        Serve the longest cacheable prefix of `messages` from the cache.
+
+        Args:
+            model: Model the prompt is for (caches are per model)
+            messages: Full prompt
+            candidates: (prefix length, TTL seconds) pairs, longest first
+
+        Returns:
+            (cached-content name, remaining messages), or (None, messages)
+            when no candidate prefix could be served
+        """
+        for length, ttl in candidates if self.enabled else ():
+            if not 0 < length < len(messages):
+                continue
+            prefix = messages[:length]
+            tokens = estimate_tokens(prefix)
+            if tokens < self.min_tokens:
+                self.counters["too_small"] += 1
+                continue
+            name = await self._lookup(model, prefix, ttl)
+            if name is not None:
+                self.counters["cached_tokens"] += tokens
+                self.counters["sent_tokens"] += estimate_tokens(messages[length:])
+                return name, messages[length:]
+        self.counters["sent_tokens"] += estimate_tokens(messages)
+        return None, messages
+
+    async def _lookup(self, model: str, prefix: List[BaseMessage], ttl: float) -> Optional[str]:
+        key = prefix_key(model, prefix)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.expires_at - EXPIRY_MARGIN_SECONDS > now:
+            if entry.name is not None:
+                self.counters["hits"] += 1
+            return entry.name
+
+        # One registration per key at a time; concurrent turns wait for it
+        pending = self._pending.setdefault(asyncio.get_running_loop(), {})
+        task = pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._register(key, model, prefix, ttl))
+            pending[key] = task
+            task.add_done_callback(lambda _: pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _register(self, key: str, model: str, prefix: List[BaseMessage], ttl: float) -> Optional[str]:
+        start = time.time()
+        try:
+            name = await asyncio.wait_for(self.store.create(model, prefix, ttl), PREFIX_CACHE_CREATE_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"🗃️ Prefix cache registration failed, sending full prompts: {e!r}")
+            self.counters["failures"] += 1
+            name = None
+        else:
+            self.counters["registrations"] += 1
+            logger.info(f"🗃️ Cached a {estimate_tokens(prefix)}-token prefix for {model} ({time.time() - start:.2f}s)")
+        with self._lock:
+            self._prune(start)
+            self._entries[key] = _Entry(name=name, expires_at=start + ttl)
+        return name
+
+    def _prune(self, now: float):
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits, registrations and estimated tokens served from cache vs sent."""
+        counters = dict(self.counters)
+        sent, cached = counters.get("sent_tokens", 0), counters.get("cached_tokens", 0)
+        counters["cached_share"] = round(cached / (sent + cached), 3) if sent + cached else 0.0
+        return counters
+
+
+# --- Benchmark ---
+
+async def _bench(debates: int, question: str) -> Dict[str, Any]:
+    from .backend import get_prefix_cache, open_roundtable, run_demo
+
+    cache = get_prefix_cache()
+    cache.counters.clear()
+    db_path = "bench_prefix.db"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    start = time.perf_counter()
+    async with open_roundtable(db_path) as app:
+        for i in range(debates):
+            await run_demo(f"{question} (variant {i})", app=app)
+    return {"seconds": time.perf_counter() - start, **cache.stats()}
+
+
+def _bench_child(enabled: bool, debates: int, question: str, results):
+    os.environ["PREFIX_CACHE"] = "1" if enabled else "0"
+    results.put(asyncio.run(_bench(debates, question)))
+
+
+def run_benchmark(debates: int = 10, input_ms_per_1k: float = 40.0):
+    """Prompt tokens sent and wall time per debate, with and without the prefix cache."""
+    import multiprocessing
+
+    os.environ["ROUNDTABLE_OFFLINE_LLM"] = "1"
+    os.environ["OFFLINE_LLM_INPUT_SECONDS_PER_1K_TOKENS"] = str(input_ms_per_1k / 1000)
+    os.environ.setdefault("PREFIX_CACHE_MIN_TOKENS", "0")  # The local store has no provider minimum
+    question = "Should I take a 6-month sabbatical to travel the world next year?"
+
+    # Fresh process per configuration: the settings are read at import time
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for label, enabled in (("full prompts", False), ("prefix cache", True)):
+        queue = ctx.Queue()
+        child = ctx.Process(target=_bench_child, args=(enabled, debates, question, queue))
+        child.start()
+        results[label] = queue.get()
+        child.join()
+
+    print(f"🗃️ Prompt tokens per debate ({debates} debates, offline model, {input_ms_per_1k:g} ms per 1K input tokens)")
+    for label, result in results.items():
+        print(f"   {label:<13} sent {result.get('sent_tokens', 0) / debates:8.0f} tok  "
+              f"cached {result.get('cached_tokens', 0) / debates:8.0f} tok  "
+              f"{result['seconds'] / debates:.2f}s/debate  "
+              f"(registrations {result.get('registrations', 0)}, hits {result.get('hits', 0)})")
+    print(json.dumps(results["prefix cache"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt-prefix cache benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Tokens sent and latency per debate, with vs without the cache")
+    bench_cmd.add_argument("--debates", type=int, default=10)
+    bench_cmd.add_argument("--input-ms-per-1k", type=float, default=40.0, help="Simulated input-token processing cost")
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(args.debates, args.input_ms_per_1k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+"""
+Debate Profiling for THE ROUNDTABLE
+
+When a debate is slow, the question is where the time went: waiting on the
+model (network), LangGraph orchestration, checkpoint serialization, or our
+own prompt building. This module profiles one debate or a batch, opt-in:
+
+- `sample` mode (default): a background thread snapshots every thread's
+  stack each PROFILE_INTERVAL_MS (no dependencies, no code changes). A
+  sample where the event loop sits in its selector is asyncio wait time
+  (awaiting the model, a deadline, a worker thread); every other sample is
+  CPU, attributed to a category (model client, checkpoint, orchestration,
+  roundtable code) and to the graph node the running asyncio task works
+  for (tasks a node starts, e.g. its deadline-bound model calls, count for it)
+- `cprofile` mode: deterministic cProfile of the event loop thread, written
+  as a .pstats file (exact call counts, CPU only)
+
+Output goes to PROFILE_DIR, one set of files per profile:
+
+- `<label>.collapsed`: folded stacks, for flamegraph.pl / inferno / speedscope
+- `<label>.speedscope.json`: per-thread sampled profiles for speedscope.app
+- `<label>.summary.json`: wall vs process CPU, loop wait vs busy, CPU per
+  category and per node, hottest functions
+
+Profile every debate run by `run_demo` / `resume_debate` with
+ROUNDTABLE_PROFILE=1 (samples cover the whole process, so run one debate at a
+time, e.g. MAX_CONCURRENT_DEBATES=1), or a reproducible batch on the offline
+model:
+    python -m src.profiling run [--debates 3] [--mode sample|cprofile] [--interval-ms 5]
+    python -m src.backend --profile
+"""
+
+import argparse
+import asyncio
+import cProfile
+import json
+import linecache
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from .log_pipeline import task_node
+
+PROFILE_DEBATES = os.getenv("ROUNDTABLE_PROFILE", "0").lower() in ("1", "true", "yes")
+PROFILE_MODE = os.getenv("PROFILE_MODE", "sample")  # "sample" or "cprofile"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+MAX_STACK_DEPTH = 128
+TOP_FUNCTIONS = 20
+
+PROFILE_MODES = ("sample", "cprofile")
+
+logger = logging.getLogger(__name__)
+
+# Innermost frame of an idle thread: the loop's selector, or a worker waiting for work
+_IDLE_FRAMES = {
+    ("selectors.py", "select"), ("selectors.py", "poll"),
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"), ("thread.py", "_worker"),
+}
+# ...or a thread blocked on a C-level queue (aiosqlite's connection thread), seen from its source line
+_BLOCKING_LINE = re.compile(r"\b_?(?:tx|queue|work_queue)\.get\(")
+
+# First matching marker on the stack (outermost to innermost: any frame counts) wins
+_CATEGORIES = (
+    ("checkpoint", ("delta_checkpoint.py", "checkpoint_maintenance.py", "langgraph/checkpoint", "aiosqlite", "sqlite3")),
+    ("model", ("offline_llm.py", "langchain_google_genai", "google/genai", "google/api_core", "httpx", "httpcore", "grpc")),
+)
+_ORCHESTRATION = ("langgraph/", "langchain_core/")
+_SELECTOR_CALL = re.compile(r"method '(?:select|poll)' of 'select\.")
+
+_SITE = re.compile(r".*/(?:site|dist)-packages/")
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+Frame = Tuple[str, str, int]  # (function, short path, first line)
+
+
+def _short_path(path: str) -> str:
+    if path.startswith(_ROOT):
+        return path[len(_ROOT):]
+    return _SITE.sub("", path)
+
+
+def _running_tasks() -> Dict[int, "asyncio.Task"]:
+    """Thread ID -> the task its event loop is running right now (read from the sampler thread)."""
+    tasks = {}
+    for loop, task in list(asyncio.tasks._current_tasks.items()):
+        thread = getattr(loop, "_thread_id", None)
+        if thread is not None:
+            tasks[thread] = task
+    return tasks
+
+
+def _frame_node(frame) -> Optional[str]:
+    """
+    Graph node a backend node-function frame belongs to (see `make_panelist_node` /
+    `make_chair_node`); the fallback when no task node is known.
+    """
+    name = frame.f_code.co_name
+    if name in ("chief_of_staff_node", "chief_node"):
+        return "chief_of_staff"
+    if name in ("panelist_node", "chair_node"):
+        try:
+            seat = frame.f_locals.get("panelist") or frame.f_locals.get("chair")
+            return getattr(seat, "node", None)
+        except Exception:
+            return None
+    return None
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+        return True
+    return bool(_BLOCKING_LINE.search(linecache.getline(code.co_filename, frame.f_lineno)))
+
+
+def _category(stack: List[Frame]) -> str:
+    paths = [path for _, path, _ in stack]
+    for category, markers in _CATEGORIES:
+        if any(marker in path for path in paths for marker in markers):
+            return category
+    for path in reversed(paths):  # Innermost non-stdlib frame decides
+        if path.startswith("src/") or path in ("streamlit_app.py",):
+            return "roundtable"
+        if any(marker in path for marker in _ORCHESTRATION):
+            return "orchestration"
+    return "other"
+
+
+class DebateProfiler:
+    """One profile: started and stopped around a debate (or a batch), then written out."""
+
+    def __init__(
+        self,
+        label: str,
+        mode: str = PROFILE_MODE,
+        interval_ms: float = PROFILE_INTERVAL_MS,
+        out_dir: str = PROFILE_DIR,
+    ):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}' (expected one of {', '.join(PROFILE_MODES)})")
+        self.label = re.sub(r"[^\w.-]+", "_", label)
+        self.mode = mode
+        self.interval = max(0.001, interval_ms / 1000)
+        self.out_dir = out_dir
+        self.stacks: Dict[str, Counter] = defaultdict(Counter)  # thread name -> stack (root first) -> samples
+        self.loop_samples: Counter = Counter()  # "busy" / "wait"
+        self.node_samples: Counter = Counter()
+        self.category_samples: Counter = Counter()
+        self.self_samples: Counter = Counter()
+        self.samples = 0
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._started = self._cpu_started = 0.0
+        self.wall_seconds = self.cpu_seconds = 0.0
+        self.paths: Dict[str, str] = {}
+
+    # --- Lifecycle ---
+
+    def start(self) -> "DebateProfiler":
+        """Start profiling; the calling thread is taken to be the event loop thread."""
+        self._loop_thread = threading.get_ident()
+        self._started, self._cpu_started = time.perf_counter(), time.process_time()
+        if self.mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            self._sampler = threading.Thread(target=self._sample_loop, name="roundtable-profiler", daemon=True)
+            self._sampler.start()
+        return self
+
+    def stop(self) -> "DebateProfiler":
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+        self.wall_seconds = time.perf_counter() - self._started
+        self.cpu_seconds = time.process_time() - self._cpu_started
+        return self
+
+    # --- Sampling ---
+
+    def _sample_loop(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            tasks = _running_tasks()
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self._take(names.get(ident, f"thread-{ident}"), ident == self._loop_thread, frame, task_node(tasks.get(ident)))
+            self.samples += 1
+
+    def _take(self, thread: str, is_loop: bool, frame, node: Optional[str] = None):
+        if _is_idle(frame):
+            if is_loop:
+                self.loop_samples["wait"] += 1
+                self.stacks[thread][(("(asyncio wait)", "", 0),)] += 1
+            return
+        stack: List[Frame] = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_name, _short_path(code.co_filename), code.co_firstlineno))
+            node = node or _frame_node(frame)
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[thread][tuple(stack)] += 1
+        self.self_samples[stack[-1]] += 1
+        self.category_samples[_category(stack)] += 1
+        self.node_samples[node or "(outside nodes)"] += 1
+        if is_loop:
+            self.loop_samples["busy"] += 1
+
+    # --- Output ---
+
+    def summary(self) -> Dict[str, Any]:
+        """Wall vs CPU time, loop wait vs busy, CPU per category and per node."""
+        data: Dict[str, Any] = {
+            "label": self.label,
+            "mode": self.mode,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "process_cpu_seconds": round(self.cpu_seconds, 3),
+        }
+        if self.mode == "cprofile":
+            stats = pstats.Stats(self._cprofile)
+            # The loop thread's time inside its selector is time spent awaiting
+            # (summed self times double-count suspended coroutines, so busy is the rest of the wall time)
+            wait = sum(tt for (_, _, name), (_, _, tt, _, _) in stats.stats.items() if _SELECTOR_CALL.search(name))
+            data["event_loop"] = {
+                "wait_seconds": round(wait, 3),
+                "busy_seconds": round(max(0.0, self.wall_seconds - wait), 3),
+                "wait_share": round(wait / (self.wall_seconds or 1), 3),
+            }
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:TOP_FUNCTIONS]
+            data["top_functions"] = [
+                {"function": f"{name} ({_short_path(path)}:{line})", "calls": nc, "self_seconds": round(tt, 4), "cumulative_seconds": round(ct, 4)}
+                for (path, line, name), (_, nc, tt, ct, _) in rows
+            ]
+            return data
+        seconds = lambda n: round(n * self.interval, 3)
+        loop_total = sum(self.loop_samples.values()) or 1
+        data.update(
+            interval_ms=self.interval * 1000,
+            samples=self.samples,
+            event_loop={
+                "wait_seconds": seconds(self.loop_samples["wait"]),
+                "busy_seconds": seconds(self.loop_samples["busy"]),
+                "wait_share": round(self.loop_samples["wait"] / loop_total, 3),
+            },
+            cpu_by_category={name: seconds(n) for name, n in self.category_samples.most_common()},
+            cpu_by_node={name: seconds(n) for name, n in self.node_samples.most_common()},
+            top_functions=[
+                {"function": f"{name} ({path}:{line})", "self_seconds": seconds(n)}
+                for (name, path, line), n in self.self_samples.most_common(TOP_FUNCTIONS)
+            ],
+        )
+        return data
+
+    def write(self) -> Dict[str, str]:
+        """Write the profile files (blocking); returns their paths."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, self.label)
+        paths = {"summary": f"{base}.summary.json"}
+        if self.mode == "cprofile":
+            paths["pstats"] = f"{base}.pstats"
+            self._cprofile.dump_stats(paths["pstats"])
+        else:
+            paths["collapsed"] = f"{base}.collapsed"
+            paths["speedscope"] = f"{base}.speedscope.json"
+            with open(paths["collapsed"], "w") as f:
+                for thread, stacks in self.stacks.items():
+                    for stack, n in stacks.items():
+                        f.write(";".join([thread, *(_frame_name(frame) for frame in stack)]) + f" {n}\n")
+            with open(paths["speedscope"], "w") as f:
+                json.dump(self._speedscope(), f)
+        summary = self.summary()
+        with open(paths["summary"], "w") as f:
+            json.dump(summary, f, indent=2)
+        loop = summary.get("event_loop")
+        logger.info(
+            f"🔬 Profile {self.label}: {summary['wall_seconds']}s wall, {summary['process_cpu_seconds']}s CPU"
+            + (f", event loop waiting {loop['wait_share']:.0%}" if loop else "")
+            + f" -> {paths['summary']}"
+        )
+        self.paths = paths
+        return paths
+
+    def _speedscope(self) -> Dict[str, Any]:
+        frames: Dict[Frame, int] = {}
+        profiles = []
+        for thread, stacks in self.stacks.items():
+            samples, weights = [], []
+            for stack, n in stacks.items():
+                samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+                weights.append(n * self.interval)
+            profiles.append({
+                "type": "sampled", "name": thread, "unit": "seconds",
+                "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.label,
+            "exporter": "roundtable.profiling",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": name, "file": path, "line": line} for name, path, line in frames]},
+            "profiles": profiles,
+        }
+
+
+def _frame_name(frame: Frame) -> str:
+    name, path, line = frame
+    return f"{name} ({path}:{line})" if path else name
+
+
+# Sampling sees every thread, so only one profile runs at a time
+_active: Optional[DebateProfiler] = None
+_active_lock = threading.Lock()
+
+
+def _claim(label: str, mode: Optional[str], interval_ms: Optional[float]) -> Optional[DebateProfiler]:
+    global _active
+    with _active_lock:
+        if _active is not None:
+            logger.info(f"🔬 Profile {_active.label} already running, not profiling {label} separately")
+            return None
+        _active = DebateProfiler(label, mode or PROFILE_MODE, interval_ms or PROFILE_INTERVAL_MS)
+        return _active
+
+
+def _release():
+    global _active
+    with _active_lock:
+        _active = None
+
+
+@contextmanager
+def profiling(label: str, mode: Optional[str] = None, interval_ms: Optional[float] = None) -> Iterator[Optional[DebateProfiler]]:
+    """Profile the enclosed block (e.g. an `asyncio.run`) and write the files when it ends."""
+    profiler = _claim(label, mode, interval_ms)
+    if profiler is None:
+        yield None
+        return
+    try:
+        profiler.start()
+        yield profiler
+    finally:
+        profiler.stop()
+        _release()
+        profiler.write()
+
+
+@asynccontextmanager
+async def profiled(label: str, enabled: bool = PROFILE_DEBATES) -> AsyncIterator[Optional[DebateProfiler]]:
+    """
+    Profile a debate from inside the event loop when `enabled`
+    (ROUNDTABLE_PROFILE); the files are written off the loop.
+    """
+    profiler = _claim(label, None, None) if enabled else None
+    if profiler is None:
+        yield None
+        return
+    try:
+        profiler.start()
+        yield profiler
+    finally:
+        profiler.stop()
+        _release()
+        await asyncio.to_thread(profiler.write)
+
+
+# --- Batch runner ---
+
+async def _run_batch(questions: List[str]) -> int:
+    from .backend import open_roundtable, run_demo
+
+    turns = 0
+    async with open_roundtable(os.getenv("PROFILE_DB_PATH", "profile_debates.db")) as app:
+        for question in questions:
+            turns += len(await run_demo(question, app=app))
+    return turns
+
+
+def run_profile(debates: int = 3, mode: str = PROFILE_MODE, interval_ms: float = PROFILE_INTERVAL_MS, question: Optional[str] = None) -> Dict[str, str]:
+    """Profile a batch of debates end to end (graph build, every node, checkpoints) in this process."""
+    questions = [
+        question or f"Should I take a 6-month sabbatical to travel the world next year? (variant {i})"
+        for i in range(debates)
+    ]
+    label = f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{mode}"
+    with profiling(label, mode, interval_ms) as profiler:
+        turns = asyncio.run(_run_batch(questions))
+    print(f"🔬 {debates} debates, {turns} turns profiled in {profiler.wall_seconds:.2f}s")
+    summary = profiler.summary()
+    print(json.dumps({k: v for k, v in summary.items() if k != "top_functions"}, indent=2))
+    for kind, path in profiler.paths.items():
+        print(f"   {kind:<10} {path}")
+    return profiler.paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile debates")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_cmd = sub.add_parser("run", help="Profile a batch of debates (offline model unless --live)")
+    run_cmd.add_argument("--debates", type=int, default=3)
+    run_cmd.add_argument("--mode", choices=PROFILE_MODES, default=PROFILE_MODE)
+    run_cmd.add_argument("--interval-ms", type=float, default=PROFILE_INTERVAL_MS)
+    run_cmd.add_argument("--question", default=None)
+    run_cmd.add_argument("--live", action="store_true", help="Use the configured Gemini models instead of the offline model")
+    args = parser.parse_args()
+    if args.command == "run":
+        if not args.live:
+            os.environ["ROUNDTABLE_OFFLINE_LLM"] = "1"  # Read when the backend is imported
+        from .backend import configure_logging
+
+        configure_logging()
+        run_profile(args.debates, args.mode, args.interval_ms, args.question)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Prompt Registry for THE ROUNDTABLE
+
+Every prompt the board sends is registered here once, at import, instead of
+being re-assembled from f-strings on every turn:
+
+- Templates are parsed once into literal segments and field slots; the
+  literals are interned, and rendering is a single join
+- Templates without fields (persona instructions) are pre-rendered, and
+  their SystemMessage is built once and reused by every turn
+- Each template has a `version` (hash of its name and text), so caches,
+  traces and metrics can key on the exact prompt that produced an answer;
+  `prompt_versions()` lists them all
+
+Micro-benchmark of prompt construction at growing history sizes:
+    python -m src.prompts bench [--sizes 10,100,1000,10000]
+"""
+
+import argparse
+import hashlib
+import string
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+_Segment = Tuple[str, Optional[str], str, Optional[str]]  # literal, field, format spec, conversion
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    A parsed, versioned prompt.
+
+    Attributes:
+        name: Registry key, e.g. "chair.status"
+        text: Template source in `str.format` syntax
+        version: First 12 hex digits of sha256(name + text)
+        fields: Names the template expects
+    """
+    name: str
+    text: str
+    version: str = field(init=False)
+    fields: Tuple[str, ...] = field(init=False)
+    _segments: Tuple[_Segment, ...] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        segments = tuple(
+            (sys.intern(literal), name, spec or "", conversion)
+            for literal, name, spec, conversion in string.Formatter().parse(self.text)
+        )
+        object.__setattr__(self, "_segments", segments)
+        object.__setattr__(self, "fields", tuple(dict.fromkeys(s[1] for s in segments if s[1] is not None)))
+        object.__setattr__(self, "version", hashlib.sha256(f"{self.name}\x00{self.text}".encode("utf-8")).hexdigest()[:12])
+
+    def render(self, **values: Any) -> str:
+        """Fill the template (KeyError for a missing field, like `str.format`)."""
+        if not self.fields:
+            return self.static
+        parts = []
+        for literal, name, spec, conversion in self._segments:
+            parts.append(literal)
+            if name is not None:
+                value = values[name]
+                if conversion:
+                    value = _CONVERSIONS[conversion](value)
+                parts.append(value if type(value) is str and not spec else format(value, spec))
+        return "".join(parts)
+
+    @cached_property
+    def static(self) -> str:
+        """The rendered text of a template without fields."""
+        if self.fields:
+            raise ValueError(f"Prompt '{self.name}' has fields {self.fields}; use render().")
+        return "".join(literal for literal, *_ in self._segments)
+
+    @cached_property
+    def system_message(self) -> SystemMessage:
+        """Shared SystemMessage for a static template (built once; never mutate it)."""
+        return SystemMessage(content=self.static)
+
+    def human(self, **values: Any) -> HumanMessage:
+        return HumanMessage(content=self.render(**values))
+
+    def key(self, **values: Any) -> str:
+        """Stable cache key for this prompt version filled with `values`."""
+        digest = hashlib.sha256(self.version.encode("utf-8"))
+        for name in self.fields:
+            digest.update(f"\x00{name}\x00{values[name]}".encode("utf-8"))
+        return digest.hexdigest()
+
+
+class PromptRegistry:
+    """Named, versioned templates; registering the same text again is a no-op."""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, text: str) -> PromptTemplate:
+        """
+        Parse and store `text` under `name`.
+
+        Registering the same text again returns the stored template. Different
+        text under a taken name (e.g. a custom panel reusing a seat name) is
+        kept alongside it as "name@version".
+        """
+        with self._lock:
+            existing = self._templates.get(name)
+            if existing is not None and existing.text == text:
+                return existing
+            template = PromptTemplate(name, text)
+            if existing is not None:
+                key = f"{name}@{template.version}"
+                template = self._templates.setdefault(key, PromptTemplate(key, text))
+            else:
+                self._templates[name] = template
+            return template
+
+    def register_static(self, name: str, text: str) -> PromptTemplate:
+        """Register literal text (braces are not fields), e.g. a persona instruction."""
+        return self.register(name, text.replace("{", "{{").replace("}", "}}"))
+
+    def __getitem__(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+    def __iter__(self) -> Iterator[PromptTemplate]:
+        return iter(list(self._templates.values()))
+
+    def versions(self) -> Dict[str, str]:
+        """Version of every registered prompt, by name."""
+        return {t.name: t.version for t in self}
+
+
+prompts = PromptRegistry()
+
+
+def prompt_versions() -> Dict[str, str]:
+    """Versions of all prompts in the shared registry (for metrics and cache keys)."""
+    return prompts.versions()
+
+
+# --- Benchmark ---
+
+def _history(size: int) -> List[BaseMessage]:
+    from langchain_core.messages import AIMessage
+
+    history: List[BaseMessage] = [HumanMessage(content="Should I take a 6-month sabbatical to travel the world next year?")]
+    for i in range(size - 1):
+        history.append(AIMessage(content=f"Round {i // 3 + 1} argument {i}: " + "budget and deadline trade-offs " * 20, name="Aria"))
+    return history
+
+
+def _legacy_prompt(instruction: str, history: List[BaseMessage], round_number: int, max_rounds: int) -> List[BaseMessage]:
+    # How the Chair's prompt was assembled before the registry: fresh f-string and SystemMessage per turn
+    debate_context = f"""
+**DEBATE STATUS:**
+- Current Round: {round_number} of {max_rounds}
+
+{"⚠️  FINAL ROUND - You MUST produce a final decision (SUPPORT or OPPOSE) NOW." if round_number >= max_rounds else ""}
+
+Review the debate. Decide:
+- **OPPOSE**: If the idea is reckless, risky, or unfeasible
+- **SUPPORT**: If the idea is viable (with conditions)
+- **NEEDS_REVISION**: If you need more information (only if NOT final round)
+
+Remember your instruction: Protect the user from financial ruin.
+"""
+    return [SystemMessage(content=instruction), *history, HumanMessage(content=debate_context)]
+
+
+def run_benchmark(sizes=(10, 100, 1000, 10000), repeat: int = 200):
+    """Time the Chair's prompt construction, legacy f-strings vs the registry."""
+    from .backend import DEFAULT_PANEL, MAX_DEBATE_ROUNDS, chair_prompt
+
+    chair = DEFAULT_PANEL.chair
+    print(f"🧱 Chair prompt construction, µs per turn (best of {repeat})")
+    for size in sizes:
+        history = _history(size)
+        assert [m.content for m in _legacy_prompt(chair.instruction, history, 2, MAX_DEBATE_ROUNDS)] == \
+            [m.content for m in chair_prompt(chair, history, 2)], "registry prompt differs from the legacy prompt"
+        timings = {}
+        for label, build in (
+            ("legacy", lambda: _legacy_prompt(chair.instruction, history, 2, MAX_DEBATE_ROUNDS)),
+            ("registry", lambda: chair_prompt(chair, history, 2)),
+        ):
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                build()
+                best = min(best, time.perf_counter() - start)
+            timings[label] = best * 1e6
+        print(f"   {size:>6} messages: legacy {timings['legacy']:9.1f}  registry {timings['registry']:9.1f}  "
+              f"(x{timings['legacy'] / timings['registry']:.1f})")
+    from .prompts import prompt_versions as registered  # The registry the board uses (not __main__'s)
+    print(f"   {len(registered())} prompts registered")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Prompt construction time at growing history sizes")
+    bench_cmd.add_argument("--sizes", default="10,100,1000,10000")
+    bench_cmd.add_argument("--repeat", type=int, default=200)
+    sub.add_parser("versions", help="List registered prompts and their versions")
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(tuple(int(s) for s in args.sizes.split(",")), args.repeat)
+    elif args.command == "versions":
+        from .backend import create_roundtable_graph
+        create_roundtable_graph()  # Registers the panel's instructions and turn prompts
+        from .prompts import prompt_versions as registered
+        for name, version in sorted(registered().items()):
+            print(f"{version}  {name}")
+
+
+if __name__ == "__main__":
+    main()
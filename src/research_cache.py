@@ -0,0 +1,329 @@
+"""
+Research Cache for THE ROUNDTABLE
+
+The Chief of Staff's web search is a full model call, and the same topics
+("BMW M3 price", "latest movies") come up again and again across users. This
+module caches search results by topic:
+
+- `search_intent` normalizes a question to (category, topic): filler and
+  personal phrasing are dropped and the remaining words sorted, so "Should I
+  buy a BMW M3?" and "What does a BMW M3 cost?" share one entry
+- Each category has its own freshness window (CATEGORY_TTL_SECONDS): prices
+  and markets go stale in minutes, reviews and general background in hours
+- Stale-while-revalidate: a stale entry (up to STALE_FACTOR x its TTL old) is
+  served at once while one background call refreshes it; older or missing
+  entries are fetched inline, and concurrent askers share that one call
+- Results are stored with the time they were researched, and the report
+  says how old they are
+- Entries persist in a local SQLite file (RESEARCH_CACHE_PATH), so restarts
+  and worker processes share a warm cache; keys include the search prompt's
+  version, so editing the prompt invalidates old results
+
+CLI:
+    python -m src.research_cache stats
+    python -m src.research_cache intent "Should I buy a BMW M3?"
+    python -m src.research_cache clear
+    python -m src.research_cache bench [--questions 40] [--latency 2.0]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+RESEARCH_CACHE = os.getenv("RESEARCH_CACHE", "1").lower() in ("1", "true", "yes")
+RESEARCH_CACHE_PATH = os.getenv("RESEARCH_CACHE_PATH", "research_cache.db")
+RESEARCH_CACHE_MAX_ENTRIES = int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "5000"))
+STALE_FACTOR = 4  # Stale entries are served (and refreshed) until this many TTLs old
+
+# Freshness per category, in seconds
+CATEGORY_TTL_SECONDS = {
+    "markets": 15 * 60,
+    "prices": 60 * 60,
+    "news": 6 * 3600,
+    "reviews": 24 * 3600,
+    "general": 12 * 3600,
+}
+# First matching category wins (markets before prices: "stock price" is a market question)
+_CATEGORY_WORDS = (
+    ("markets", {"stock", "stocks", "shares", "invest", "investing", "investment", "market", "markets", "crypto", "bitcoin", "rates", "mortgage", "interest"}),
+    ("prices", {"buy", "buying", "price", "prices", "cost", "costs", "afford", "cheap", "expensive", "deal", "deals", "purchase"}),
+    ("news", {"latest", "new", "news", "release", "releases", "upcoming", "current", "today", "now"}),
+    ("reviews", {"review", "reviews", "rating", "ratings", "best", "worth", "recommend", "watch", "movie", "movies", "read"}),
+)
+_STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "we", "our", "you", "your", "should", "would", "could", "can", "will",
+    "do", "does", "did", "is", "are", "was", "be", "to", "of", "for", "in", "on", "at", "and", "or", "it",
+    "this", "that", "what", "which", "how", "much", "many", "good", "time", "get", "about", "with", "into",
+    "next", "year", "there", "any", "some", "if", "so", "am", "than", "from", "by", "as", "tell",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS research_cache (
+    key TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    question TEXT NOT NULL,
+    results TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    ttl REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def search_intent(question: str) -> Tuple[str, str]:
+    """
+    Normalize a question to its search intent.
+
+    Returns:
+        (category, topic) where topic is the sorted content words, minus
+        stopwords and the words that only signal the category
+    """
+    words = re.findall(r"[a-z0-9$€£][a-z0-9$€£.\-]*", question.lower())
+    words = [w.strip(".-") for w in words]
+    category = next((name for name, markers in _CATEGORY_WORDS if markers.intersection(words)), "general")
+    signal = set().union(*(markers for _, markers in _CATEGORY_WORDS))
+    topic = " ".join(sorted({w for w in words if w and w not in _STOPWORDS and w not in signal}))
+    return category, topic or question.strip().lower()
+
+
+@dataclass
+class Research:
+    """One cached search result."""
+    results: str
+    fetched_at: float
+    ttl: float
+    category: str
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.age < self.ttl
+
+    @property
+    def servable(self) -> bool:
+        return self.age < self.ttl * STALE_FACTOR
+
+    def with_timestamp(self) -> str:
+        """The results with a note on when they were researched."""
+        researched = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.fetched_at))
+        minutes = int(self.age // 60)
+        age = "just now" if minutes < 1 else f"{minutes} min ago" if minutes < 120 else f"{minutes // 60} h ago"
+        return f"{self.results}\n\n_Researched {researched} ({age}){'' if self.fresh else '; refreshing'}_"
+
+
+Fetch = Callable[[], Awaitable[str]]
+
+
+class ResearchCache:
+    """Topic-keyed, persistent cache of web-search results."""
+
+    def __init__(self, path: str = RESEARCH_CACHE_PATH, version: str = "", enabled: bool = RESEARCH_CACHE):
+        self.path = path
+        self.version = version
+        self.enabled = enabled
+        self.counters: Counter = Counter()
+        self._schema_ready = False
+        self._db_lock = threading.Lock()
+        # In-flight fetches per event loop (inline and background), so each topic is fetched once
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+        self._background: Set[asyncio.Task] = set()
+
+    def key(self, question: str) -> Tuple[str, str, str]:
+        category, topic = search_intent(question)
+        return f"{self.version}:{category}:{topic}", category, topic
+
+    async def research(self, question: str, fetch: Fetch) -> str:
+        """
+        Search results for `question`, from cache when fresh enough.
+
+        Args:
+            question: The user's question
+            fetch: Performs the actual search (the model call) when needed
+
+        Returns:
+            Results text; cached results carry a "Researched ..." note
+        """
+        if not self.enabled:
+            return await fetch()
+        key, category, topic = self.key(question)
+        cached = await asyncio.to_thread(self._read, key)
+        if cached is not None and cached.fresh:
+            self.counters["hits"] += 1
+            return cached.with_timestamp()
+        if cached is not None and cached.servable:
+            self.counters["stale_hits"] += 1
+            self._refresh(key, category, topic, question, fetch, background=True)
+            return cached.with_timestamp()
+        self.counters["misses"] += 1
+        research = await asyncio.shield(self._refresh(key, category, topic, question, fetch))
+        return research.results
+
+    def _refresh(self, key: str, category: str, topic: str, question: str, fetch: Fetch, background: bool = False) -> asyncio.Task:
+        inflight = self._inflight.setdefault(asyncio.get_running_loop(), {})
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, category, topic, question, fetch))
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+            if background:
+                self.counters["revalidations"] += 1
+                self._background.add(task)
+                task.add_done_callback(self._background_done)
+        return task
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"🔎 Background research refresh failed: {task.exception()}")
+
+    async def _fetch_and_store(self, key: str, category: str, topic: str, question: str, fetch: Fetch) -> "Research":
+        results = await fetch()
+        self.counters["fetches"] += 1
+        research = Research(results=results, fetched_at=time.time(), ttl=CATEGORY_TTL_SECONDS[category], category=category)
+        await asyncio.to_thread(self._write, key, topic, question, research)
+        logger.info(f"🔎 Researched '{topic}' ({category}, fresh for {research.ttl / 60:.0f} min)")
+        return research
+
+    # --- SQLite (worker threads, one short-lived connection per call) ---
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def _read(self, key: str) -> Optional[Research]:
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT results, fetched_at, ttl, category FROM research_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE research_cache SET hits = hits + 1 WHERE key = ?", (key,))
+                    conn.commit()
+            finally:
+                conn.close()
+        return Research(*row) if row else None
+
+    def _write(self, key: str, topic: str, question: str, research: Research):
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO research_cache (key, category, topic, question, results, fetched_at, ttl, hits) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE((SELECT hits FROM research_cache WHERE key = ?), 0))",
+                    (key, research.category, topic, question, research.results, research.fetched_at, research.ttl, key),
+                )
+                self._prune(conn)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _prune(self, conn: sqlite3.Connection):
+        # Entries too old to serve, then the oldest beyond RESEARCH_CACHE_MAX_ENTRIES
+        conn.execute("DELETE FROM research_cache WHERE fetched_at + ttl * ? < ?", (STALE_FACTOR, time.time()))
+        conn.execute(
+            "DELETE FROM research_cache WHERE key NOT IN (SELECT key FROM research_cache ORDER BY fetched_at DESC LIMIT ?)",
+            (RESEARCH_CACHE_MAX_ENTRIES,),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Entries per category plus this process's hit/miss counters."""
+        by_category: Dict[str, int] = {}
+        if os.path.exists(self.path):
+            with self._db_lock:
+                conn = self._connect()
+                try:
+                    by_category = dict(conn.execute("SELECT category, COUNT(*) FROM research_cache GROUP BY category").fetchall())
+                finally:
+                    conn.close()
+        return {"entries": by_category, **self.counters}
+
+    def clear(self) -> int:
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                deleted = conn.execute("DELETE FROM research_cache").rowcount
+                conn.commit()
+            finally:
+                conn.close()
+        return deleted
+
+
+# --- CLI ---
+
+_BENCH_QUESTIONS = (
+    "Should I buy a BMW M3?", "What does a BMW M3 cost?", "Is the BMW M3 worth buying?",
+    "What movie should I watch this weekend?", "Best movies to watch this weekend?",
+    "Should I invest in Tesla stock?", "Is Tesla stock a good investment now?",
+    "Is now a good time to buy a house?",
+)
+
+
+async def _bench(cache: ResearchCache, questions: int, latency: float) -> Dict[str, Any]:
+    def search(question: str) -> Fetch:
+        async def fetch() -> str:
+            await asyncio.sleep(latency)  # Stands in for the search model call
+            return f"**Web Search Results:** offline results for {question}"
+        return fetch
+
+    start = time.perf_counter()
+    for i in range(questions):
+        question = _BENCH_QUESTIONS[i % len(_BENCH_QUESTIONS)]
+        await cache.research(question, search(question))
+    return {"seconds": time.perf_counter() - start, **cache.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Research (web search) cache")
+    parser.add_argument("--path", default=RESEARCH_CACHE_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Entries per category")
+    intent_cmd = sub.add_parser("intent", help="Show the cache key a question maps to")
+    intent_cmd.add_argument("question")
+    sub.add_parser("clear", help="Delete every entry")
+    bench_cmd = sub.add_parser("bench", help="Search calls and time for repeated topics (offline)")
+    bench_cmd.add_argument("--questions", type=int, default=40)
+    bench_cmd.add_argument("--latency", type=float, default=2.0, help="Simulated seconds per search call")
+    args = parser.parse_args()
+
+    if args.command == "intent":
+        category, topic = search_intent(args.question)
+        print(f"{category}: {topic}  (fresh for {CATEGORY_TTL_SECONDS[category] / 60:.0f} min)")
+    elif args.command == "stats":
+        print(ResearchCache(args.path).stats())
+    elif args.command == "clear":
+        print(f"🗑️  Deleted {ResearchCache(args.path).clear()} entries")
+    elif args.command == "bench":
+        topics = len({search_intent(q) for q in _BENCH_QUESTIONS})
+        print(f"🔎 {args.questions} questions, {len(_BENCH_QUESTIONS)} phrasings of {topics} topics, "
+              f"{args.latency:g}s per search call")
+        for label, enabled in (("no cache", False), ("research cache", True)):
+            path = "bench_research.db"
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            result = asyncio.run(_bench(ResearchCache(path, enabled=enabled), args.questions, args.latency))
+            calls = result.get("fetches", 0) if enabled else args.questions
+            print(f"   {label:<15} {calls:>4} search calls  {result['seconds']:6.2f}s  "
+                  f"(hits {result.get('hits', 0)}, misses {result.get('misses', 0)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""
+Memory-Bounded Session State for THE ROUNDTABLE
+
+A long-running host (the Streamlit app, the API) used to hold every session's
+transcript as a list of dicts, every finished job's transcript until the job
+expired, and one copy of the workspace records (projects, tasks, events,
+notes) per debate state. Memory grew with users and sessions. This module
+bounds it:
+
+- `TranscriptEntry` is the compact transcript record: a read-only mapping
+  with `__slots__`, an interned agent name, an epoch timestamp (rendered as
+  ISO on access) and usage stored as a tuple. `entry["agent"]` and
+  `dict(entry)` work as they did with plain dicts
+- `ContextStore` keeps workspace records content-addressed: the Chief of
+  Staff stores them once and the debate state carries only the hash
+  (`context_data["workspace_ref"]`). Debates on the same workspace share
+  one immutable copy; the newest CONTEXT_MEMORY_LIMIT are kept in memory
+  and the rest are read back from SQLite on demand (e.g. when resuming).
+  Records not stored or shared since the checkpoint retention window are
+  deleted by the checkpoint maintenance pass (`prune`)
+- `SessionStore` keeps finished transcripts by thread: the
+  SESSION_MEMORY_LIMIT most recently used are in memory, idle ones are only
+  on disk (SESSION_STORE_PATH) and are loaded again when a session returns
+
+Memory held by 1,000 sessions, as before vs with compact records and the
+bounded stores (tracemalloc):
+    python -m src.session_memory bench [--sessions 1000]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "session_store.db")
+SESSION_MEMORY_LIMIT = int(os.getenv("SESSION_MEMORY_LIMIT", "64"))  # Transcripts kept in memory
+SESSION_STORE_MAX_ENTRIES = int(os.getenv("SESSION_STORE_MAX_ENTRIES", "10000"))  # Transcripts kept on disk
+CONTEXT_MEMORY_LIMIT = int(os.getenv("CONTEXT_MEMORY_LIMIT", "8"))  # Workspace contexts kept in memory
+CONTEXT_TOUCH_SECONDS = 3600  # A context shared from memory has its last use written back at most this often
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_transcripts (
+    thread_id TEXT PRIMARY KEY,
+    entries TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workspace_contexts (
+    ref TEXT PRIMARY KEY,
+    records TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL
+);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+# --- Transcript records ---
+
+class TranscriptEntry(Mapping):
+    """One agent message of a transcript (keys: agent, content, timestamp, and usage if recorded)."""
+
+    __slots__ = ("agent", "content", "created", "_usage")
+
+    def __init__(
+        self,
+        agent: str,
+        content: str,
+        timestamp: Union[str, float, None] = None,
+        usage: Union[Dict[str, Any], Tuple[Tuple[str, Any], ...], None] = None,
+    ):
+        self.agent = sys.intern(agent)
+        self.content = content
+        if timestamp is None:
+            self.created = time.time()
+        elif isinstance(timestamp, str):
+            self.created = datetime.fromisoformat(timestamp).timestamp()
+        else:
+            self.created = float(timestamp)
+        self._usage = tuple(usage.items()) if isinstance(usage, dict) else usage
+
+    @classmethod
+    def from_dict(cls, entry: Mapping) -> "TranscriptEntry":
+        return cls(entry["agent"], entry["content"], entry.get("timestamp"), entry.get("usage"))
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "agent":
+            return self.agent
+        if key == "content":
+            return self.content
+        if key == "timestamp":
+            return datetime.fromtimestamp(self.created).isoformat()
+        if key == "usage" and self._usage is not None:
+            return dict(self._usage)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from ("agent", "content", "timestamp")
+        if self._usage is not None:
+            yield "usage"
+
+    def __len__(self) -> int:
+        return 3 if self._usage is None else 4
+
+    def __reduce__(self):
+        return (self.__class__, (self.agent, self.content, self.created, self._usage))
+
+    def __repr__(self) -> str:
+        return f"TranscriptEntry(agent={self.agent!r}, content={self.content[:40]!r}...)"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready copy."""
+        return dict(self)
+
+
+# --- SQLite (worker threads, one short-lived connection per call) ---
+
+class _SqliteStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._db_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            if "used_at" not in {row[1] for row in conn.execute("PRAGMA table_info(workspace_contexts)")}:
+                conn.execute("ALTER TABLE workspace_contexts ADD COLUMN used_at REAL")  # Stores from before pruning
+            self._schema_ready = True
+        return conn
+
+    def _execute(self, sql: str, params: Sequence[Any] = (), fetch: bool = False):
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                if fetch:
+                    return conn.execute(sql, params).fetchone()
+                conn.execute(sql, params)
+                conn.commit()
+            finally:
+                conn.close()
+
+
+# --- Shared workspace contexts ---
+
+class ContextStore(_SqliteStore):
+    """Content-addressed, immutable workspace records shared by every debate on the same workspace."""
+
+    def __init__(self, path: str = SESSION_STORE_PATH, capacity: int = CONTEXT_MEMORY_LIMIT):
+        super().__init__(path)
+        self.capacity = max(1, capacity)
+        self.counters: Counter = Counter()
+        self._memory: "OrderedDict[str, Mapping[str, Any]]" = OrderedDict()
+        self._touched: Dict[str, float] = {}  # ref -> when its use was last written (refs in memory only)
+        self._lock = threading.Lock()
+
+    def put(self, records: Dict[str, Any]) -> str:
+        """Store workspace records (once per distinct content); returns their reference."""
+        payload = json.dumps(records, sort_keys=True, default=str)
+        ref = hashlib.sha256(payload.encode()).hexdigest()[:16]
+        now = time.time()
+        with self._lock:
+            shared = ref in self._memory
+            if shared:
+                self._memory.move_to_end(ref)
+                self.counters["shared"] += 1
+                if now - self._touched.get(ref, 0) < CONTEXT_TOUCH_SECONDS:
+                    return ref
+        # Also re-inserts records pruned from disk while still in memory here
+        self._execute(
+            "INSERT INTO workspace_contexts (ref, records, created_at, used_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (ref) DO UPDATE SET used_at = excluded.used_at",
+            (ref, payload, now, now),
+        )
+        if not shared:
+            self._remember(ref, MappingProxyType(dict(records)))
+            self.counters["stored"] += 1
+        with self._lock:
+            if ref in self._memory:
+                self._touched[ref] = now
+        return ref
+
+    def prune(self, max_age_seconds: float, dry_run: bool = False) -> int:
+        """
+        Delete records not stored or shared for `max_age_seconds` (blocking).
+
+        Returns:
+            How many were deleted (or would be, on a dry run)
+        """
+        if not os.path.exists(self.path):
+            return 0
+        cutoff = time.time() - max_age_seconds
+        where = "FROM workspace_contexts WHERE IFNULL(used_at, created_at) < ?"
+        if dry_run:
+            return self._execute(f"SELECT COUNT(*) {where}", (cutoff,), fetch=True)[0]
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                deleted = conn.execute(f"DELETE {where}", (cutoff,)).rowcount
+                conn.commit()
+            finally:
+                conn.close()
+        self.counters["pruned"] += deleted
+        return deleted
+
+    def get(self, ref: str) -> Optional[Mapping[str, Any]]:
+        """Records for a reference from memory, or None if they would have to be read from disk."""
+        with self._lock:
+            records = self._memory.get(ref)
+            if records is not None:
+                self._memory.move_to_end(ref)
+        return records
+
+    def load(self, ref: str) -> Optional[Mapping[str, Any]]:
+        """Records for a reference, read back from disk when no longer in memory (blocking)."""
+        records = self.get(ref)
+        if records is not None:
+            return records
+        row = self._execute("SELECT records FROM workspace_contexts WHERE ref = ?", (ref,), fetch=True)
+        if row is None:
+            return None
+        self.counters["loaded"] += 1
+        records = MappingProxyType(json.loads(row[0]))
+        self._remember(ref, records)
+        return records
+
+    def _remember(self, ref: str, records: Mapping[str, Any]):
+        with self._lock:
+            self._memory[ref] = records
+            self._memory.move_to_end(ref)
+            while len(self._memory) > self.capacity:
+                evicted, _ = self._memory.popitem(last=False)
+                self._touched.pop(evicted, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_memory": len(self._memory), **self.counters}
+
+
+# --- Session transcripts ---
+
+class SessionStore(_SqliteStore):
+    """Finished transcripts by thread: recently used ones in memory, idle ones spilled to disk."""
+
+    def __init__(self, path: str = SESSION_STORE_PATH, capacity: int = SESSION_MEMORY_LIMIT):
+        super().__init__(path)
+        self.capacity = max(1, capacity)
+        self.counters: Counter = Counter()
+        self._memory: "OrderedDict[str, Tuple[TranscriptEntry, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, thread_id: str, entries: Sequence[Mapping]):
+        """Store a thread's transcript on disk and keep it in memory as the most recently used (blocking)."""
+        entries = tuple(e if isinstance(e, TranscriptEntry) else TranscriptEntry.from_dict(e) for e in entries)
+        self._execute(
+            "INSERT OR REPLACE INTO session_transcripts (thread_id, entries, updated_at) VALUES (?, ?, ?)",
+            (thread_id, json.dumps([e.to_dict() for e in entries]), time.time()),
+        )
+        self.counters["stored"] += 1
+        if self.counters["stored"] % 100 == 0:
+            self._execute(
+                "DELETE FROM session_transcripts WHERE thread_id NOT IN "
+                "(SELECT thread_id FROM session_transcripts ORDER BY updated_at DESC LIMIT ?)",
+                (SESSION_STORE_MAX_ENTRIES,),
+            )
+        self._remember(thread_id, entries)
+
+    def get(self, thread_id: str) -> Optional[List[TranscriptEntry]]:
+        """A thread's transcript, from memory or (for an idle session) from disk; None if unknown."""
+        with self._lock:
+            entries = self._memory.get(thread_id)
+            if entries is not None:
+                self._memory.move_to_end(thread_id)
+                self.counters["memory_hits"] += 1
+                return list(entries)
+        row = self._execute("SELECT entries FROM session_transcripts WHERE thread_id = ?", (thread_id,), fetch=True)
+        if row is None:
+            return None
+        self.counters["disk_loads"] += 1
+        entries = tuple(TranscriptEntry.from_dict(e) for e in json.loads(row[0]))
+        self._remember(thread_id, entries)
+        return list(entries)
+
+    def _remember(self, thread_id: str, entries: Tuple[TranscriptEntry, ...]):
+        with self._lock:
+            self._memory[thread_id] = entries
+            self._memory.move_to_end(thread_id)
+            while len(self._memory) > self.capacity:
+                self._memory.popitem(last=False)  # Already on disk: dropping it is the spill
+                self.counters["spilled"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_memory": len(self._memory), **self.counters}
+
+
+_context_store: Optional[ContextStore] = None
+_session_store: Optional[SessionStore] = None
+_stores_lock = threading.Lock()
+
+
+def get_context_store() -> ContextStore:
+    """Process-wide workspace context store."""
+    global _context_store
+    with _stores_lock:
+        if _context_store is None:
+            _context_store = ContextStore()
+        return _context_store
+
+
+def get_session_store() -> SessionStore:
+    """Process-wide transcript store (shared by every Streamlit session and executor job)."""
+    global _session_store
+    with _stores_lock:
+        if _session_store is None:
+            _session_store = SessionStore()
+        return _session_store
+
+
+# --- Benchmark ---
+
+def _bench_sessions(sessions: int, compact: bool, path: str) -> Tuple[int, int]:
+    """(bytes held, peak bytes) for `sessions` finished debates, one Streamlit session each."""
+    import copy
+    import tracemalloc
+
+    from .mock_data import get_mock_data
+
+    workspace = get_mock_data()
+    records = {
+        "projects": workspace.get_all_projects(),
+        "tasks": workspace.get_all_tasks(),
+        "calendar_events": workspace.get_calendar_events(30),
+        "notes": workspace.notes,
+    }
+    agents = ["ChiefOfStaff"] + ["Aria", "Marcus", "TheChair"] * 3
+    usage = {"input_tokens": 2800, "output_tokens": 160, "seconds": 0.05, "debate_tokens": 17000, "debate_seconds": 0.6, "tokens_left": 43000}
+
+    tracemalloc.start()
+    held = {}
+    store = SessionStore(path, SESSION_MEMORY_LIMIT) if compact else None
+    contexts = ContextStore(path) if compact else None
+    for i in range(sessions):
+        # Content is unique per session either way; what differs is everything around it
+        transcript = [
+            {
+                "agent": "".join(agent),  # A fresh string, as after deserialization
+                "content": f"Session {i}, turn {n}: " + "the budget and the timeline suggest a careful plan. " * 20,
+                "timestamp": datetime.now().isoformat(),
+                "usage": dict(usage),
+            }
+            for n, agent in enumerate(agents)
+        ]
+        if compact:
+            ref = contexts.put(records)
+            state = {"context_data": {"workspace_ref": ref, "web_search": "", "timestamp": transcript[0]["timestamp"]}}
+            store.put(f"session-{i}", transcript)
+            held[i] = {"state": state, "result_thread": f"session-{i}"}
+        else:
+            # A deserialized debate state carries its own copy of the workspace records
+            state = {"context_data": {**copy.deepcopy(records), "web_search": "", "timestamp": transcript[0]["timestamp"]}}
+            held[i] = {"state": state, "messages": transcript}
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current, peak
+
+
+def run_benchmark(sessions: int = 1000):
+    """Memory held by N finished sessions, as before vs compact records with bounded stores."""
+    path = "bench_sessions.db"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    print(f"🧠 {sessions} sessions, one finished 3-round debate each (memory limit {SESSION_MEMORY_LIMIT} transcripts)")
+    results = {}
+    for label, compact in (("dicts + copies", False), ("compact + LRU", True)):
+        start = time.perf_counter()
+        current, peak = _bench_sessions(sessions, compact, path)
+        results[label] = current
+        print(f"   {label:<15} held {current / 1e6:7.1f} MB  peak {peak / 1e6:7.1f} MB  "
+              f"({current / sessions / 1024:6.1f} KB/session, {time.perf_counter() - start:.1f}s)")
+    before, after = results.values()
+    print(f"   {before / max(1, after):.1f}x less memory held")
+
+    # Idle sessions come back from disk
+    store = SessionStore(path, SESSION_MEMORY_LIMIT)
+    start = time.perf_counter()
+    entries = store.get("session-0")
+    print(f"   idle session reload: {len(entries or [])} entries in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-bounded session state")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="tracemalloc comparison at N sessions")
+    bench_cmd.add_argument("--sessions", type=int, default=1000)
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(args.sessions)
+
+
+if __name__ == "__main__":
+    main()
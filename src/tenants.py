@@ -0,0 +1,373 @@
+"""
+Tenant Workspaces for THE ROUNDTABLE
+
+One process used to serve exactly one workspace: a single `MockNotionData`,
+one context snapshot and selector, and one Notion token from the
+environment. This module scopes all of that per tenant, so one deployment
+serves many users:
+
+- The tenant is part of the debate's thread ID ("acme.debate_1a2b3c4d";
+  a plain "debate_1a2b3c4d" belongs to DEFAULT_TENANT), so checkpoints,
+  resumes, worker-pool jobs and API lookups carry it with no schema change
+- `tenant_scope` sets the tenant for one debate run (`run_demo` and
+  `resume_debate` do this); nodes and tools call `current_tenant()` for its
+  `TenantWorkspace`: workspace data, context snapshot, context selector
+  indexes, Notion clients (one per event loop, with the tenant's token),
+  database lookups and Notion rate limiter
+- Tenant caches (context snapshot, selector indexes) share one budget,
+  TENANT_CACHE_MAX_MB for the whole process: `TenantRegistry.enforce` drops
+  the caches of the least recently used idle tenants until the total fits;
+  they are rebuilt on that tenant's next debate
+- Fair scheduling across tenants lives in `fair_queue`
+
+Tenant ids are lowercase names ([a-z0-9_-], at most 40 characters); with
+TENANTS set (comma-separated) only those are accepted. A tenant's Notion
+token is NOTION_API_KEY_<TENANT> (upper case, "-" as "_"), its optional
+mock server NOTION_BASE_URL_<TENANT>; the default tenant keeps
+NOTION_API_KEY / NOTION_TOKEN and NOTION_BASE_URL.
+
+Check isolation and the memory cap:
+    python -m src.tenants check [--tenants 12] [--cap-mb 1]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .context_selector import ContextSelector, get_context_selector
+from .context_snapshot import ContextSnapshotService, get_context_service
+from .mock_data import MockNotionData, get_mock_data
+from .notion_bulk import RateLimiter, get_rate_limiter
+
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT", "default")
+TENANT_CACHE_MAX_MB = float(os.getenv("TENANT_CACHE_MAX_MB", "256"))
+ALLOWED_TENANTS = frozenset(t.strip() for t in os.getenv("TENANTS", "").split(",") if t.strip())
+TENANT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,39}$")
+THREAD_SEPARATOR = "."
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownTenantError(ValueError):
+    """Raised for malformed tenant ids and, with TENANTS set, ids not listed there."""
+
+
+def validate_tenant(tenant: Optional[str]) -> str:
+    """The tenant id to use (DEFAULT_TENANT for None / ""); raises UnknownTenantError."""
+    tenant = tenant or DEFAULT_TENANT
+    if tenant != DEFAULT_TENANT and (not TENANT_ID.match(tenant) or (ALLOWED_TENANTS and tenant not in ALLOWED_TENANTS)):
+        raise UnknownTenantError(f"Unknown tenant '{tenant}'.")
+    return tenant
+
+
+def tenant_of(thread_id: str) -> str:
+    """The tenant a debate thread belongs to."""
+    tenant, separator, _ = thread_id.partition(THREAD_SEPARATOR)
+    return tenant if separator else DEFAULT_TENANT
+
+
+def tenant_thread_id(tenant: Optional[str], thread_id: str) -> str:
+    """`thread_id` namespaced for `tenant` (unchanged for the default tenant)."""
+    tenant = validate_tenant(tenant)
+    return thread_id if tenant == DEFAULT_TENANT else f"{tenant}{THREAD_SEPARATOR}{thread_id}"
+
+
+def approx_size(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """Deep size estimate in bytes of plain data and simple objects (shared objects counted once)."""
+    seen = set() if seen is None else seen
+    total, stack = 0, [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        elif hasattr(item, "nbytes"):  # numpy embedding matrices
+            total += int(item.nbytes)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+        elif hasattr(item, "__slots__"):
+            stack.extend(getattr(item, slot) for slot in item.__slots__ if hasattr(item, slot))
+    return total
+
+
+class TenantWorkspace:
+    """
+    Everything one tenant's debates read: workspace data and the caches and clients built on it.
+
+    Attributes:
+        tenant: Tenant id
+        workspace: The tenant's workspace data
+        context_service: Context snapshots of `workspace`
+        selector: Context selector (its indexes are per tenant; the embedding model is shared)
+        databases: Notion database lookups by search query -> (id, title)
+        rate_limiter: Limiter for this tenant's Notion token
+        last_used: When a debate last ran in this tenant's scope (epoch seconds)
+        active: Debates running in this tenant's scope right now
+    """
+
+    def __init__(self, tenant: str):
+        self.tenant = tenant
+        if tenant == DEFAULT_TENANT:
+            # The process-wide singletons keep serving code that predates tenants
+            self.workspace = get_mock_data()
+            self.context_service = get_context_service()
+            self.selector = get_context_selector()
+            self.rate_limiter = get_rate_limiter()
+        else:
+            self.workspace = MockNotionData()
+            self.context_service = ContextSnapshotService(self.workspace)
+            self.selector = ContextSelector(embedder=get_context_selector().embedder)
+            self.rate_limiter = RateLimiter()
+        self.databases: Dict[str, Tuple[str, str]] = {}
+        self.last_used = time.time()
+        self.active = 0
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._sizes: Dict[int, Tuple[Any, int]] = {}  # id(cached object) -> (object, bytes)
+        self._lock = threading.Lock()
+
+    def _env_name(self, name: str) -> str:
+        return name if self.tenant == DEFAULT_TENANT else f"{name}_{self.tenant.upper().replace('-', '_')}"
+
+    def notion_client(self):
+        """This tenant's Notion client for the running event loop (its HTTP pool is bound to the loop)."""
+        if self.tenant == DEFAULT_TENANT:
+            api_key, names = os.getenv("NOTION_API_KEY") or os.getenv("NOTION_TOKEN"), "NOTION_API_KEY or NOTION_TOKEN"
+        else:
+            names = self._env_name("NOTION_API_KEY")
+            api_key = os.getenv(names)
+        if not api_key:
+            raise ValueError(f"{names} not found in environment variables.")
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._clients:
+                from notion_client import AsyncClient as NotionClient
+
+                base_url = os.getenv(self._env_name("NOTION_BASE_URL"))  # e.g. a local mock server
+                self._clients[loop] = NotionClient(auth=api_key, **({"base_url": base_url} if base_url else {}))
+            return self._clients[loop]
+
+    def cache_bytes(self) -> int:
+        """Approximate memory held by this tenant's evictable caches (sizes memoized per object)."""
+        snapshot = self.context_service.cached()
+        cached = ([snapshot] if snapshot is not None else []) + self.selector.cached_indexes()
+        sizes = {}
+        for obj in cached:
+            known = self._sizes.get(id(obj))
+            if known is None or known[0] is not obj:
+                # The embedder (and its model) is shared, not this tenant's memory
+                known = (obj, approx_size(obj, {id(self.selector.embedder)}))
+            sizes[id(obj)] = known
+        self._sizes = sizes
+        return sum(size for _, size in sizes.values())
+
+    def evict(self) -> int:
+        """Drop the snapshot and selector indexes; returns the bytes released (approximately)."""
+        released = self.cache_bytes()
+        self.context_service.reset()
+        self.selector.clear()
+        self._sizes = {}
+        return released
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "revision": self.workspace.revision,
+            "active": self.active,
+            "last_used": round(self.last_used, 3),
+            "cache_bytes": self.cache_bytes(),
+            "snapshot": dict(self.context_service.counters),
+            "context": self.selector.stats(),
+        }
+
+
+class TenantRegistry:
+    """Creates tenant workspaces on first use and keeps their caches under one memory cap."""
+
+    def __init__(self, max_bytes: float = TENANT_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._tenants: Dict[str, TenantWorkspace] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tenant: Optional[str] = None) -> TenantWorkspace:
+        """The workspace of `tenant` (validated; created on first use)."""
+        tenant = validate_tenant(tenant)
+        with self._lock:
+            workspace = self._tenants.get(tenant)
+            if workspace is None:
+                workspace = self._tenants[tenant] = TenantWorkspace(tenant)
+                logger.info(f"🏢 Tenant workspace '{tenant}' created")
+            return workspace
+
+    def tenants(self) -> List[TenantWorkspace]:
+        with self._lock:
+            return list(self._tenants.values())
+
+    def enforce(self) -> int:
+        """
+        Evict caches of least recently used idle tenants while the total is over the cap (blocking).
+
+        Tenants with a debate running are never evicted, so the cap can be
+        exceeded while every cached tenant is busy.
+
+        Returns:
+            Bytes released
+        """
+        sizes = [(workspace, workspace.cache_bytes()) for workspace in self.tenants()]
+        total = sum(size for _, size in sizes)
+        released = 0
+        for workspace, size in sorted(sizes, key=lambda s: s[0].last_used):
+            if total <= self.max_bytes:
+                break
+            if workspace.active or not size:
+                continue
+            workspace.evict()
+            total -= size
+            released += size
+            self.evictions += 1
+            logger.info(f"🏢 Evicted caches of tenant '{workspace.tenant}' ({size / 1024:.0f} KB)")
+        return released
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tenant cache sizes and activity, against the cap."""
+        tenants = {workspace.tenant: workspace.stats() for workspace in self.tenants()}
+        return {
+            "tenants": tenants,
+            "cache_bytes": sum(t["cache_bytes"] for t in tenants.values()),
+            "max_bytes": int(self.max_bytes),
+            "evictions": self.evictions,
+        }
+
+
+_registry: Optional[TenantRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tenants() -> TenantRegistry:
+    """Process-wide tenant registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TenantRegistry()
+        return _registry
+
+
+# The tenant of the debate being run (inherited by its node and tool tasks)
+_tenant: ContextVar[Optional[TenantWorkspace]] = ContextVar("roundtable_tenant", default=None)
+
+
+def current_tenant() -> TenantWorkspace:
+    """The workspace of the tenant in scope (the default tenant outside any `tenant_scope`)."""
+    return _tenant.get() or get_tenants().get(DEFAULT_TENANT)
+
+
+@contextmanager
+def tenant_scope(tenant: Union[str, TenantWorkspace, None]) -> Iterator[TenantWorkspace]:
+    """Run the block (and the tasks it starts) against `tenant`'s workspace."""
+    workspace = tenant if isinstance(tenant, TenantWorkspace) else get_tenants().get(tenant)
+    token = _tenant.set(workspace)
+    workspace.active += 1
+    workspace.last_used = time.time()
+    try:
+        yield workspace
+    finally:
+        workspace.active -= 1
+        workspace.last_used = time.time()
+        _tenant.reset(token)
+
+
+# --- Check ---
+
+def _debate_context(workspace: TenantWorkspace) -> Dict[str, Any]:
+    """What a Chief of Staff builds for a debate, from the tenant in scope."""
+    snapshot = workspace.context_service.current()
+    return {
+        "projects": snapshot.project_list,
+        "tasks": snapshot.task_list,
+        "calendar_events": snapshot.calendar,
+        "notes": workspace.workspace.notes,
+        "timestamp": f"{workspace.tenant}-{snapshot.revision}",
+    }
+
+
+def run_check(tenants: int = 12, cap_mb: float = 1.0) -> bool:
+    """Isolation between tenants, and cache eviction under `cap_mb`; prints a report."""
+    registry = TenantRegistry(max_bytes=cap_mb * 1024 * 1024)
+    ok = True
+
+    def expect(condition: bool, message: str):
+        nonlocal ok
+        ok &= condition
+        print(f"   {'✅' if condition else '❌'} {message}")
+
+    # 1. Isolation: edits, snapshots and indexes of one tenant never show up in another
+    a, b = registry.get("acme"), registry.get("globex")
+    a.workspace.upsert("projects", {"id": "acme-secret", "title": "Acme Secret Merger", "status": "Active",
+                                    "priority": "High", "budget": "$1,000"})
+    seen_by_b = {p["title"] for p in b.context_service.current().project_list}
+    expect("Acme Secret Merger" not in seen_by_b, "a tenant's edit is invisible to other tenants")
+    expect(a.workspace is not b.workspace and a.context_service is not b.context_service,
+           "each tenant has its own workspace and snapshot")
+    a.selector.select(_debate_context(a), "merger", "", 400)
+    expect(not b.selector.cached_indexes(), "selector indexes are per tenant")
+    with tenant_scope(a):
+        expect(current_tenant() is a, "tenant_scope selects the workspace")
+        expect(tenant_of(tenant_thread_id("acme", "debate_1")) == "acme", "thread ids carry the tenant")
+    expect(current_tenant().tenant == DEFAULT_TENANT, "outside a scope the default tenant is used")
+    try:
+        registry.get("../etc")
+        expect(False, "malformed tenant ids are rejected")
+    except UnknownTenantError:
+        expect(True, "malformed tenant ids are rejected")
+
+    # 2. Memory cap: fill many tenants' caches, then enforce
+    for i in range(tenants):
+        workspace = registry.get(f"tenant-{i}")
+        with tenant_scope(workspace):
+            workspace.selector.select(_debate_context(workspace), "budget deadline", "", 400)
+    before = sum(w.cache_bytes() for w in registry.tenants())
+    busy = registry.get(f"tenant-{tenants - 1}")
+    with tenant_scope(busy):
+        released = registry.enforce()
+        after = sum(w.cache_bytes() for w in registry.tenants())
+        expect(busy.cache_bytes() > 0, "a tenant with a debate running keeps its caches")
+    print(f"   🏢 {tenants + 2} tenants: {before / 1024:.0f} KB cached, cap {cap_mb * 1024:.0f} KB, "
+          f"{released / 1024:.0f} KB released, {after / 1024:.0f} KB left ({registry.evictions} evictions)")
+    expect(after <= registry.max_bytes or all(w.active or not w.cache_bytes() for w in registry.tenants()),
+           "caches fit under the cap after enforce")
+    oldest = registry.get("acme")
+    expect(oldest.cache_bytes() == 0, "least recently used tenants are evicted first")
+    revision = oldest.workspace.revision
+    expect(oldest.context_service.current().revision == revision, "an evicted tenant rebuilds on its next debate")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tenant workspaces")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check_cmd = sub.add_parser("check", help="Tenant isolation and cache eviction under a memory cap")
+    check_cmd.add_argument("--tenants", type=int, default=12)
+    check_cmd.add_argument("--cap-mb", type=float, default=1.0)
+    args = parser.parse_args()
+    if args.command == "check":
+        print("🏢 Tenant workspaces\n")
+        sys.exit(0 if run_check(args.tenants, args.cap_mb) else 1)
+
+
+if __name__ == "__main__":
+    main()
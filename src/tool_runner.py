@@ -0,0 +1,270 @@
+"""
+Tool Execution for THE ROUNDTABLE
+
+Panelists with tools (Marcus fact-checking against Notion) get their tool
+calls executed here. Without this stage a tool call was a dead end; with it a
+turn is a short loop: the model asks for tools, they run, their results go
+back into the prompt, and the model answers.
+
+- All tool calls of one model turn run concurrently, so a fact-check costs
+  one batch of lookups instead of a serial chain
+- Read-only calls (READ_ONLY_TOOLS) are memoized per debate: the same
+  search in a later round is answered from memory, and identical calls in
+  flight at the same time share one execution. Writes always run, and a
+  successful write clears the debate's memo
+- Failed calls (a `ToolException` or a timeout) go back to the model as
+  error results and are never memoized
+- Each tool's latency is recorded in `call_metrics()` as "tool.<name>";
+  memo hits and batch sizes are in `ToolRunner.stats()`
+
+Compare a three-round fact-check, serial and unmemoized vs batched and
+memoized (simulated tool latency):
+    python -m src.tool_runner bench [--rounds 3] [--calls 3] [--tool-ms 300]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from .latency import record_latency
+
+TOOL_MAX_STEPS = int(os.getenv("TOOL_MAX_STEPS", "3"))  # Model turns that may request tools
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "20"))
+TOOL_MEMO_DEBATES = 256  # Debates whose tool results are kept
+# Tools without side effects; only these are memoized
+READ_ONLY_TOOLS = frozenset({"notion_search", "notion_read_page", "calendar_list_events"})
+
+logger = logging.getLogger(__name__)
+
+ModelCall = Callable[[List[BaseMessage]], Awaitable[AIMessage]]
+
+
+def call_key(name: str, args: Dict[str, Any]) -> str:
+    """Memo key for a tool call: the tool name and its canonical arguments."""
+    return f"{name}:{json.dumps(args, sort_keys=True, default=str)}"
+
+
+class ToolRunner:
+    """Executes model tool calls in parallel batches, memoizing read-only results per debate."""
+
+    def __init__(self, parallel: bool = True, memoize: bool = True, timeout: float = TOOL_TIMEOUT_SECONDS):
+        self.parallel = parallel
+        self.memoize = memoize
+        self.timeout = timeout
+        self.counters: Counter = Counter()
+        self._memo: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # In-flight read-only calls, per event loop (a task must not be awaited from another loop)
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], asyncio.Task]]" = weakref.WeakKeyDictionary()
+
+    async def loop(
+        self,
+        call_model: ModelCall,
+        prompt: List[BaseMessage],
+        tools: Dict[str, Any],
+        debate: str,
+        max_steps: int = TOOL_MAX_STEPS,
+    ) -> Tuple[List[BaseMessage], Optional[AIMessage]]:
+        """
+        Let the model call tools until it answers or runs out of steps.
+
+        Args:
+            call_model: Sends a prompt to the tool-bound model
+            prompt: Prompt to start from
+            tools: Tools the model may call, by name
+            debate: Memo scope (one debate)
+            max_steps: Model turns that may request tools
+
+        Returns:
+            (prompt extended with the tool calls and their results, the model's
+            final answer or None if it was still calling tools at the last step)
+        """
+        prompt = list(prompt)
+        for _ in range(max_steps):
+            response = await call_model(prompt)
+            if not response.tool_calls:
+                return prompt, response
+            prompt += [response, *await self.run(response.tool_calls, tools, debate)]
+        return prompt, None
+
+    async def run(self, tool_calls: Sequence[Dict[str, Any]], tools: Dict[str, Any], debate: str) -> List[ToolMessage]:
+        """Execute one model turn's tool calls (concurrently, unless disabled); results in call order."""
+        self.counters["batches"] += 1
+        self.counters["calls"] += len(tool_calls)
+        if self.parallel:
+            return list(await asyncio.gather(*(self._call(call, tools, debate) for call in tool_calls)))
+        return [await self._call(call, tools, debate) for call in tool_calls]
+
+    async def _call(self, call: Dict[str, Any], tools: Dict[str, Any], debate: str) -> ToolMessage:
+        name, args, call_id = call["name"], call.get("args") or {}, call.get("id") or ""
+        tool = tools.get(name)
+        if tool is None:
+            self.counters["errors"] += 1
+            return ToolMessage(content=f"Unknown tool '{name}'. Available: {', '.join(tools)}.", tool_call_id=call_id, name=name, status="error")
+        if not (self.memoize and name in READ_ONLY_TOOLS):
+            content, ok = await self._execute(tool, name, args)
+            if ok and name not in READ_ONLY_TOOLS:
+                self.forget(debate)  # A write may have changed what earlier lookups returned
+            return ToolMessage(content=content, tool_call_id=call_id, name=name, status="success" if ok else "error")
+
+        key = call_key(name, args)
+        with self._lock:
+            memo = self._memo.get(debate)
+            if memo is not None:
+                self._memo.move_to_end(debate)
+                if key in memo:
+                    self.counters["memo_hits"] += 1
+                    return ToolMessage(content=memo[key], tool_call_id=call_id, name=name)
+
+        pending = self._pending.setdefault(asyncio.get_running_loop(), {})
+        task = pending.get((debate, key))
+        if task is None:
+            task = asyncio.ensure_future(self._execute(tool, name, args))
+            pending[(debate, key)] = task
+            task.add_done_callback(lambda _: pending.pop((debate, key), None))
+        else:
+            self.counters["shared_in_flight"] += 1
+        content, ok = await asyncio.shield(task)
+        if ok:
+            with self._lock:
+                self._memo.setdefault(debate, {})[key] = content
+                self._memo.move_to_end(debate)
+                while len(self._memo) > TOOL_MEMO_DEBATES:
+                    self._memo.popitem(last=False)
+        return ToolMessage(content=content, tool_call_id=call_id, name=name, status="success" if ok else "error")
+
+    async def _execute(self, tool, name: str, args: Dict[str, Any]) -> Tuple[str, bool]:
+        """Run one tool; (result text, succeeded)."""
+        self.counters["executions"] += 1
+        start = time.perf_counter()
+        try:
+            # A ToolCall input makes the tool report handled ToolExceptions as status="error"
+            result = await asyncio.wait_for(
+                tool.ainvoke({"name": name, "args": args, "id": "memo", "type": "tool_call"}), self.timeout
+            )
+            ok = getattr(result, "status", "success") != "error"
+            content = result.content if isinstance(result, ToolMessage) else str(result)
+        except asyncio.TimeoutError:
+            ok, content = False, f"Error: {name} timed out after {self.timeout:g}s."
+        except Exception as e:
+            ok, content = False, f"Error: {name} failed: {e}"
+        record_latency(f"tool.{name}", time.perf_counter() - start, ok)
+        if not ok:
+            self.counters["errors"] += 1
+            logger.warning(f"🛠️ {name} failed: {content[:200]}")
+        return content if isinstance(content, str) else str(content), ok
+
+    def forget(self, debate: str):
+        """Drop a debate's memoized results (e.g. after a workspace write)."""
+        with self._lock:
+            self._memo.pop(debate, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batches, calls, executions and memo hits so far."""
+        counters = dict(self.counters)
+        batches = counters.get("batches", 0)
+        counters["calls_per_batch"] = round(counters.get("calls", 0) / batches, 2) if batches else 0.0
+        with self._lock:
+            counters["memoized_debates"] = len(self._memo)
+        return counters
+
+
+_runner: Optional[ToolRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_tool_runner() -> ToolRunner:
+    """Process-wide tool runner (its memo is shared by every debate's rounds)."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ToolRunner()
+        return _runner
+
+
+# --- Benchmark ---
+
+def _bench_tools(tool_seconds: float) -> Dict[str, Any]:
+    from langchain_core.tools import tool
+
+    @tool
+    async def notion_search(query: str) -> str:
+        """Search the workspace."""
+        await asyncio.sleep(tool_seconds)
+        return f"3 pages match '{query}'"
+
+    @tool
+    async def notion_read_page(page_id: str) -> str:
+        """Read a page."""
+        await asyncio.sleep(tool_seconds)
+        return f"Contents of {page_id}"
+
+    @tool
+    async def calendar_list_events(start_time: str, end_time: str) -> str:
+        """List events."""
+        await asyncio.sleep(tool_seconds)
+        return f"Events between {start_time} and {end_time}"
+
+    return {t.name: t for t in (notion_search, notion_read_page, calendar_list_events)}
+
+
+async def _bench_debate(runner: ToolRunner, tools: Dict[str, Any], rounds: int, calls: int, debate: str) -> float:
+    # Marcus re-checks the same facts every round: `calls` lookups, then an answer
+    batch = [
+        {"name": name, "args": args, "id": f"call-{i}", "type": "tool_call"}
+        for i, (name, args) in enumerate([
+            ("notion_search", {"query": "budget"}),
+            ("calendar_list_events", {"start_time": "2026-01-01", "end_time": "2026-01-31"}),
+            ("notion_read_page", {"page_id": "note-002"}),
+            ("notion_search", {"query": "deadlines"}),
+            ("notion_read_page", {"page_id": "proj-005"}),
+        ][:calls])
+    ]
+
+    async def call_model(prompt: List[BaseMessage]) -> AIMessage:
+        asked = any(isinstance(m, ToolMessage) for m in prompt)
+        return AIMessage(content="Checked." if asked else "", tool_calls=[] if asked else batch)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await runner.loop(call_model, [], tools, debate)
+    return time.perf_counter() - start
+
+
+def run_benchmark(rounds: int = 3, calls: int = 3, tool_ms: float = 300.0):
+    """Tool time per debate: serial and unmemoized vs parallel batches with memoization."""
+    tools = _bench_tools(tool_ms / 1000)
+    print(f"🛠️ Fact-check of {calls} lookups per round, {rounds} rounds, {tool_ms:g} ms per tool call")
+    for label, runner in (
+        ("serial", ToolRunner(parallel=False, memoize=False)),
+        ("parallel+memo", ToolRunner()),
+    ):
+        seconds = asyncio.run(_bench_debate(runner, tools, rounds, min(calls, 5), "bench"))
+        stats = runner.stats()
+        print(f"   {label:<14} {seconds:6.2f}s/debate  executions {stats.get('executions', 0):>3}  "
+              f"memo hits {stats.get('memo_hits', 0):>3}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool execution benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Serial vs parallel+memoized tool execution per debate")
+    bench_cmd.add_argument("--rounds", type=int, default=3)
+    bench_cmd.add_argument("--calls", type=int, default=3, help="Tool calls per round (max 5)")
+    bench_cmd.add_argument("--tool-ms", type=float, default=300.0)
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(args.rounds, args.calls, args.tool_ms)
+
+
+if __name__ == "__main__":
+    main()
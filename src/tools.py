@@ -1,23 +1,46 @@
 import os
 import datetime
-from typing import Any, Dict, List, Optional
-from langchain_core.tools import tool
-from notion_client import Client as NotionClient
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.tools import ToolException, tool
+from pydantic import BaseModel, Field
+from src.notion_bulk import create_events, rate_limited
+from src.tenants import current_tenant
+
+# Failures are raised as ToolException and reported to the model as error
+# results (status="error"), so the tool runner never memoizes them.
+# Clients are async, so a batch of tool calls really runs concurrently, and
+# every request goes through the tenant's Notion rate limiter.
 
 # --- Notion Tools (Python Native) ---
 
+# Clients, database lookups and the rate limiter belong to the tenant whose
+# debate is running (one client per event loop: its HTTP pool is bound to the loop)
 def _get_notion_client():
-    api_key = os.getenv("NOTION_API_KEY") or os.getenv("NOTION_TOKEN")
-    if not api_key:
-        raise ValueError("NOTION_API_KEY or NOTION_TOKEN not found in environment variables.")
-    return NotionClient(auth=api_key)
+    return current_tenant().notion_client()
+
+def _limited(call):
+    return rate_limited(call, current_tenant().rate_limiter)
+
+async def _find_database(notion, *queries: str) -> Optional[Tuple[str, str]]:
+    """First database matching any of `queries`, in order (remembered per tenant once found)."""
+    databases_found = current_tenant().databases
+    for query in queries:
+        if query not in databases_found:
+            search_res = await _limited(lambda: notion.search(query=query))
+            databases = [r for r in search_res["results"] if r["object"] == "database"]
+            if not databases:
+                continue
+            title = databases[0]["title"][0]["plain_text"] if databases[0].get("title") else query
+            databases_found[query] = (databases[0]["id"], title)
+        return databases_found[query]
+    return None
 
 @tool
 async def notion_search(query: str):
     """Search for pages in Notion matching the query."""
     try:
         notion = _get_notion_client()
-        response = notion.search(query=query, page_size=5)
+        response = await _limited(lambda: notion.search(query=query, page_size=5))
         
         results = []
         for result in response.get("results", []):
@@ -33,7 +56,7 @@ async def notion_search(query: str):
             
         return "\n".join(results) if results else "No results found."
     except Exception as e:
-        return f"Error searching Notion: {str(e)}"
+        raise ToolException(f"Error searching Notion: {str(e)}") from e
 
 @tool
 async def notion_read_page(page_id: str):
@@ -41,7 +64,7 @@ async def notion_read_page(page_id: str):
     try:
         notion = _get_notion_client()
         # Fetch page blocks
-        blocks = notion.blocks.children.list(block_id=page_id)
+        blocks = await _limited(lambda: notion.blocks.children.list(block_id=page_id))
         
         content = []
         for block in blocks.get("results", []):
@@ -52,7 +75,7 @@ async def notion_read_page(page_id: str):
         
         return "\n".join(content) if content else "Empty page or unsupported block types."
     except Exception as e:
-        return f"Error reading page: {str(e)}"
+        raise ToolException(f"Error reading page: {str(e)}") from e
 
 # --- Notion Calendar Tools ---
 
@@ -68,33 +91,19 @@ async def calendar_list_events(start_time: str, end_time: str):
         # 1. Find the database
         # We search for "Calendar" or "Events" or "Task"
         db_name = os.getenv("NOTION_CALENDAR_DATABASE_NAME", "Calendar")
-        # Search without filter first, then filter in Python to be safe
-        search_res = notion.search(query=db_name)
-        
-        # Filter for databases only
-        databases = [r for r in search_res["results"] if r["object"] == "database"]
-        
-        if not databases:
-            # Fallback 1: Search for "Task" or "To-do"
-            search_res = notion.search(query="To-do")
-            databases = [r for r in search_res["results"] if r["object"] == "database"]
-            
-        if not databases:
-            # Fallback 2: Specific known DB "Weekly To-do List"
-            search_res = notion.search(query="Weekly To-do List")
-            databases = [r for r in search_res["results"] if r["object"] == "database"]
+        # Fallbacks: "To-do", then the specific known DB "Weekly To-do List"
+        database = await _find_database(notion, db_name, "To-do", "Weekly To-do List")
             
-        if not databases:
+        if not database:
             return "No 'Calendar', 'To-do', or 'Weekly To-do List' database found in Notion."
             
-        db_id = databases[0]["id"]
-        db_title = databases[0]["title"][0]["plain_text"]
+        db_id, db_title = database
         
         # 2. Query the database
         # We just get the last 10 items for now as a "schedule"
         # Filtering by date in Notion API requires knowing the property name (e.g. "Date")
         # We will try to fetch and then parse.
-        query_res = notion.databases.query(database_id=db_id, page_size=10)
+        query_res = await _limited(lambda: notion.databases.query(database_id=db_id, page_size=10))
         
         events = []
         for page in query_res["results"]:
@@ -114,7 +123,29 @@ async def calendar_list_events(start_time: str, end_time: str):
         return f"Events from Notion DB '{db_title}':\n" + "\n".join(events)
 
     except Exception as e:
-        return f"Error fetching Notion calendar: {str(e)}"
+        raise ToolException(f"Error fetching Notion calendar: {str(e)}") from e
+
+class CalendarEvent(BaseModel):
+    """One event to schedule."""
+    summary: str = Field(description="Event title")
+    start_time: str = Field(description="ISO 8601 start, e.g. 2026-02-03T09:00:00")
+    end_time: str = Field(default="", description="ISO 8601 end (optional)")
+    description: str = Field(default="", description="Notes added to the event page")
+    idempotency_key: str = Field(default="", description="Stable id for this event; repeated keys are created once")
+
+async def _create_calendar_events(events: List[Dict[str, Any]]):
+    notion = _get_notion_client()
+    
+    # 1. Find DB once for the whole batch (same lookup as above, cached)
+    db_name = os.getenv("NOTION_CALENDAR_DATABASE_NAME", "Calendar")
+    database = await _find_database(notion, db_name)
+    if not database:
+        return None, db_name
+    
+    # 2. Create pages concurrently, rate limited, at most once per idempotency key
+    # We assume the title property is named "Name" and the date property "Date";
+    # a robust implementation would inspect the schema first.
+    return await create_events(notion, database[0], events, limiter=current_tenant().rate_limiter), db_name
 
 @tool
 async def calendar_create_event(summary: str, start_time: str, end_time: str, description: str = ""):
@@ -122,41 +153,41 @@ async def calendar_create_event(summary: str, start_time: str, end_time: str, de
     Create a new event in the Notion Calendar database.
     """
     try:
-        notion = _get_notion_client()
-        
-        # 1. Find DB (same logic as above, ideally cached)
-        db_name = os.getenv("NOTION_CALENDAR_DATABASE_NAME", "Calendar")
-        search_res = notion.search(query=db_name)
-        databases = [r for r in search_res["results"] if r["object"] == "database"]
-        
-        if not databases:
-             return "No 'Calendar' database found to create event."
-        
-        db_id = databases[0]["id"]
-        
-        # 2. Create Page
-        # We assume the title property is named "Name" or "Title" (standard)
-        # We assume there is a Date property named "Date"
-        new_page = {
-            "parent": {"database_id": db_id},
-            "properties": {
-                "Name": {
-                    "title": [{"text": {"content": summary}}]
-                },
-                "Date": {
-                    "date": {"start": start_time}
-                }
-            }
-        }
-        
-        # Note: This might fail if property names don't match exactly. 
-        # A robust implementation would inspect the schema first.
-        # For this demo, we try standard names.
-        try:
-            notion.pages.create(**new_page)
-            return f"Created Notion page '{summary}' in database '{db_name}'."
-        except Exception as create_err:
-            return f"Failed to create page. Ensure DB has properties 'Name' (title) and 'Date' (date). Error: {create_err}"
+        result, db_name = await _create_calendar_events([
+            {"summary": summary, "start_time": start_time, "end_time": end_time, "description": description}
+        ])
+    except Exception as e:
+        raise ToolException(f"Error creating Notion event: {str(e)}") from e
+    if result is None:
+        return "No 'Calendar' database found to create event."
+    if result.failed:
+        raise ToolException(f"Failed to create page. Ensure DB has properties 'Name' (title) and 'Date' (date). Error: {result.failed[0][1]}")
+    if result.skipped:
+        return f"Notion page '{summary}' already exists in database '{db_name}' (not created again)."
+    if result.in_progress:
+        return f"Notion page '{summary}' is still being created by another call in database '{db_name}'; not confirmed yet, check again later."
+    return f"Created Notion page '{summary}' in database '{db_name}'."
 
+@tool
+async def calendar_create_events(events: List[CalendarEvent]):
+    """
+    Create many events in the Notion Calendar database in one call.
+    Use this instead of repeated calendar_create_event calls when scheduling
+    several items. Events already created (same idempotency key, or same
+    title and times) are not created again.
+    """
+    try:
+        result, db_name = await _create_calendar_events([
+            event.model_dump() if isinstance(event, BaseModel) else dict(event) for event in events
+        ])
     except Exception as e:
-        return f"Error creating Notion event: {str(e)}"
+        raise ToolException(f"Error creating Notion events: {str(e)}") from e
+    if result is None:
+        return "No 'Calendar' database found to create events."
+    if result.failed and not (result.created or result.skipped or result.in_progress):
+        raise ToolException(result.describe(db_name))
+    return result.describe(db_name)
+
+# Report ToolExceptions to the model instead of raising them
+for _tool in (notion_search, notion_read_page, calendar_list_events, calendar_create_event, calendar_create_events):
+    _tool.handle_tool_error = True
@@ -0,0 +1,114 @@
+"""
+UI Data Access for THE ROUNDTABLE
+
+Streamlit re-executes the whole script on every interaction (each button
+click, each edit of the question box), so anything the page reads must be
+cheap to read twice. This module is the only place the UI touches workspace
+data:
+
+- `workspace_summary` aggregates projects, tasks and events (and pre-renders
+  the sidebar markup) once per workspace revision; with a real Notion
+  backend each of those reads is a network call
+- `transcript_stats` computes the decision, round count, agents, word
+  count and token usage once, when a debate's result is stored, instead of on every rerun
+
+Caches are keyed by the tenant and its workspace revision, which changes
+whenever the workspace is modified, so stale data is never shown after an
+edit and one tenant never sees another's.
+"""
+
+from datetime import date
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import streamlit as st
+
+from .tenants import get_tenants
+
+UPCOMING_EVENT_DAYS = 30
+SIDEBAR_EVENT_LIMIT = 10
+
+
+def workspace_revision(tenant: Optional[str] = None) -> int:
+    """Current revision of the tenant's workspace (with the tenant, the cache key for everything below)."""
+    return get_tenants().get(tenant).workspace.revision
+
+
+def _stat_box(value: int, label: str) -> str:
+    return f"""
+    <div class="stat-box">
+        <div class="stat-number">{value}</div>
+        <div class="stat-label">{label}</div>
+    </div>
+    """
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _workspace_summary(tenant: Optional[str], revision: int, today: date) -> Dict[str, Any]:
+    # `revision` and `today` only key the cache: the event window moves daily
+    mock_data = get_tenants().get(tenant).workspace
+    projects = mock_data.get_all_projects()
+    tasks = mock_data.get_all_tasks()
+    events = mock_data.get_calendar_events(UPCOMING_EVENT_DAYS)["events"]
+    return {
+        "stat_boxes": "".join([
+            _stat_box(len(projects), "Active Projects"),
+            _stat_box(len(tasks), "Pending Tasks"),
+            _stat_box(len(events), "Upcoming Events"),
+        ]),
+        "projects": [
+            {
+                "title": p["title"],
+                "caption": f"Status: {p['status']} | Priority: {p['priority']}",
+                "budget": f"Budget: {p['budget']}",
+            }
+            for p in projects
+        ],
+        "events": [
+            {"title": e["title"], "caption": f"{e['date']} at {e['time']}"}
+            for e in events[:SIDEBAR_EVENT_LIMIT]
+        ],
+    }
+
+
+def workspace_summary(tenant: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Sidebar data for the current revision of the tenant's workspace.
+
+    Returns:
+        Dict with pre-rendered `stat_boxes` HTML and display-ready `projects`
+        and `events` (first SIDEBAR_EVENT_LIMIT)
+    """
+    return _workspace_summary(tenant, workspace_revision(tenant), date.today())
+
+
+def transcript_stats(messages: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Everything the results view derives from a transcript, computed once.
+
+    Args:
+        messages: Transcript entries as returned by `run_demo`
+
+    Returns:
+        Dict with the Chair's last message, the decision ("SUPPORT"/"OPPOSE" or
+        None), rounds, number of agents, total words, and the debate's tokens
+        and seconds (None for transcripts recorded without usage)
+    """
+    chair_message = None
+    decision = None
+    for msg in messages:
+        if msg["agent"] == "TheChair":
+            chair_message = msg["content"]
+            if "DECISION: SUPPORT" in chair_message:
+                decision = "SUPPORT"
+            elif "DECISION: OPPOSE" in chair_message:
+                decision = "OPPOSE"
+    usage = messages[-1].get("usage", {}) if messages else {}
+    return {
+        "chair_message": chair_message,
+        "decision": decision,
+        "rounds": sum(1 for m in messages if m["agent"] == "TheChair"),
+        "agents": len({m["agent"] for m in messages}),
+        "words": sum(len(m["content"].split()) for m in messages),
+        "tokens": usage.get("debate_tokens"),
+        "seconds": usage.get("debate_seconds"),
+    }
@@ -0,0 +1,181 @@
+"""
+Response Validation for THE ROUNDTABLE
+
+Shared checks applied to every agent's answer before it enters the debate:
+
+- Minimum length (empty or one-line answers stall the debate)
+- Required decision markers (e.g. the Chair's "DECISION: SUPPORT/OPPOSE")
+- Degenerate repetition, where the model loops on the same passage until it
+  hits MAX_TOKENS
+
+Repetition is detected while the answer is still streaming, so a looping
+generation can be cancelled after a few repeats instead of burning the whole
+output budget.
+"""
+
+import os
+import re
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from .budget import record_usage
+
+VALIDATION_MAX_ATTEMPTS = int(os.getenv("VALIDATION_MAX_ATTEMPTS", "2"))  # First answer + regenerations
+MIN_RESPONSE_CHARS = 50
+REPETITION_MIN_PERIOD = 20  # Shortest repeated passage (chars) treated as a loop
+REPETITION_MAX_PERIOD = 300  # Longest repeated passage (chars) searched for
+REPETITION_REPEATS = 4  # Consecutive copies needed to call it a loop
+REPETITION_CHECK_EVERY = 64  # Chars of new output between streaming checks
+
+_WORD = re.compile(r"[^\W\d_]{3,}")
+
+
+@dataclass(frozen=True)
+class ResponseRules:
+    """
+    What an agent's answer must look like.
+
+    Attributes:
+        min_length: Minimum characters after stripping whitespace
+        required_markers: At least one must appear (case-insensitive); empty for none
+        markers_lead: Whether the marker must be a whole word opening the answer
+            (one-word decisions, where "no" would otherwise match "know" or "not")
+        check_repetition: Whether to reject looping output
+    """
+    min_length: int = MIN_RESPONSE_CHARS
+    required_markers: Tuple[str, ...] = ()
+    markers_lead: bool = False
+    check_repetition: bool = True
+
+
+@dataclass
+class StreamedText:
+    """Text collected from one generation, and whether it was cut short for looping."""
+    text: str
+    degenerate: bool = False
+
+
+def find_repetition(text: str) -> Optional[int]:
+    """
+    Detect a passage repeated back-to-back at the end of `text`.
+
+    Args:
+        text: Generated text so far
+
+    Returns:
+        Index where the loop starts repeating (keep text[:index]), or None
+    """
+    for period in range(REPETITION_MIN_PERIOD, min(REPETITION_MAX_PERIOD, len(text) // REPETITION_REPEATS) + 1):
+        unit = text[-period:]
+        # Cheap rejection first: the previous copy must match
+        if text[-2 * period:-period] != unit:
+            continue
+        if not _WORD.search(unit):
+            # Rules, tables and padding ("-----", "| --- |") are not loops
+            continue
+        if text.endswith(unit * REPETITION_REPEATS):
+            return len(text) - (REPETITION_REPEATS - 1) * period
+    return None
+
+
+def leading_marker(text: str, markers: Tuple[str, ...]) -> Optional[str]:
+    """
+    The marker `text` opens with, as a whole word (case-insensitive; leading
+    markdown emphasis or quotes are skipped).
+
+    Returns:
+        The matching entry of `markers`, or None
+    """
+    found = re.match(r"\s*[*_\"'`]*(" + "|".join(map(re.escape, markers)) + r")\b", text or "", re.IGNORECASE)
+    if found is None:
+        return None
+    return next(marker for marker in markers if marker.lower() == found.group(1).lower())
+
+
+def check_response(text: str, rules: ResponseRules) -> Optional[str]:
+    """
+    Validate an answer against `rules`.
+
+    Returns:
+        Human-readable reason for rejection, or None if the answer is valid
+    """
+    stripped = (text or "").strip()
+    if len(stripped) < rules.min_length:
+        return f"the answer was too short ({len(stripped)} characters, need at least {rules.min_length})"
+    if rules.required_markers and rules.markers_lead:
+        if leading_marker(stripped, rules.required_markers) is None:
+            return "the answer must start with " + " or ".join(rules.required_markers)
+    elif rules.required_markers:
+        lowered = stripped.lower()
+        if not any(marker.lower() in lowered for marker in rules.required_markers):
+            return "the answer is missing a required line: " + " or ".join(rules.required_markers)
+    if rules.check_repetition and find_repetition(stripped) is not None:
+        return "the answer repeated the same passage over and over"
+    return None
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Text of a streamed message chunk (content may be a string or a list of parts)."""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    parts: List[str] = []
+    for part in content or []:
+        if isinstance(part, str):
+            parts.append(part)
+        elif isinstance(part, dict) and part.get("type") == "text":
+            parts.append(part.get("text", ""))
+    return "".join(parts)
+
+
+async def stream_response(llm, messages: List[Any], check_repetition: bool = True) -> StreamedText:
+    """
+    Stream one generation, stopping early if it degenerates into a loop.
+
+    Design: Returning early closes the provider stream (via `aclosing`), which
+    cancels the rest of the generation, so a loop costs a few repeats rather
+    than the full MAX_TOKENS.
+
+    The call's token usage (as reported by the provider, or estimated from
+    the text) and duration go to the debate's budget meter.
+
+    Args:
+        llm: Chat model (or runnable) supporting `astream`
+        messages: Prompt messages
+        check_repetition: Whether to watch for loops while streaming
+
+    Returns:
+        StreamedText with the collected (and, if looping, trimmed) text
+    """
+    pieces: List[str] = []
+    length = 0
+    next_check = REPETITION_CHECK_EVERY
+    usage: dict = {}
+    start = time.perf_counter()
+    try:
+        async with aclosing(llm.astream(messages)) as stream:
+            async for chunk in stream:
+                for name, value in (getattr(chunk, "usage_metadata", None) or {}).items():
+                    if name in ("input_tokens", "output_tokens"):
+                        usage[name] = usage.get(name, 0) + value
+                piece = _chunk_text(chunk)
+                if not piece:
+                    continue
+                pieces.append(piece)
+                length += len(piece)
+                if check_repetition and length >= next_check:
+                    next_check = length + REPETITION_CHECK_EVERY
+                    text = "".join(pieces)
+                    cut = find_repetition(text)
+                    if cut is not None:
+                        return StreamedText(text=text[:cut], degenerate=True)
+                    pieces = [text]
+        return StreamedText(text="".join(pieces))
+    finally:
+        # A stream cut short reports no usage: what was produced is estimated
+        record_usage(
+            usage, time.perf_counter() - start,
+            prompt_tokens=sum(len(_chunk_text(m)) for m in messages) // 4, output_tokens=length // 4,
+        )
@@ -0,0 +1,682 @@
+"""
+Multi-Process Worker Pool for THE ROUNDTABLE
+
+`DebateExecutor` runs every debate on one event loop, so prompt building,
+message serialization and response parsing for dozens of concurrent debates
+all share one GIL. `WorkerPool` spreads them across processes:
+
+- A dispatcher (the calling process) keeps waiting jobs in a `FairQueue` and
+  sends them to the least busy of N worker processes only as slots free up,
+  so tenants share the pool fairly; each worker has its own event loop,
+  compiled graph and model clients, and runs up to `debates_per_worker`
+  debates at once
+- Workers report each agent message and the final status back on an event
+  queue, so the dispatcher exposes the same `DebateJob` view (incremental
+  transcript, cancellation) as the in-process executor
+- Checkpoints go through a single writer process that owns the only
+  `DeltaSqliteSaver`. Workers use `RemoteSaver`, which forwards writes without
+  waiting (LangGraph only needs the checkpoint id back, which is known
+  locally) and round-trips reads. Requests from one worker are applied in
+  order, so a worker always reads its own writes. A write the writer fails to
+  apply is reported back, and the debate fails at its next checkpoint call
+- The dispatcher checks every WORKER_CHECK_SECONDS that the processes are
+  alive. When a worker dies (OOM, segfault, kill), its debates fail, their
+  slots are freed and a new worker takes its place; when the writer dies, the
+  running debates fail (their checkpoints are incomplete) and the writer and
+  workers are restarted
+
+Benchmark (offline model stand-in, scaling across worker counts):
+    python -m src.worker_pool bench [--debates 64] [--workers 0,1,2,4]
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from .executor import (
+    JOB_RETENTION_SECONDS,
+    MAX_CONCURRENT_DEBATES,
+    MAX_QUEUED_DEBATES,
+    DebateExecutor,
+    DebateJob,
+    QueueFullError,
+    new_job,
+)
+from .fair_queue import FairQueue, admission_error
+from .session_memory import TranscriptEntry
+from .tenants import tenant_of, validate_tenant
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 1)))
+WORKER_CHECK_SECONDS = float(os.getenv("WORKER_CHECK_SECONDS", "1"))  # How often dead processes are looked for
+
+logger = logging.getLogger(__name__)
+
+_CONFIG_KEYS = ("thread_id", "checkpoint_ns", "checkpoint_id")
+
+
+def _portable(config: Optional[RunnableConfig]) -> Optional[RunnableConfig]:
+    """The picklable part of a config (runtime configs carry callbacks and stream writers)."""
+    if config is None:
+        return None
+    configurable = config.get("configurable", {})
+    return {"configurable": {k: configurable[k] for k in _CONFIG_KEYS if k in configurable}}
+
+
+def _thread_of(args: Sequence[Any]) -> Optional[str]:
+    """The thread a checkpoint call is for (its first argument is a config or a thread id)."""
+    first = args[0] if args else None
+    if isinstance(first, dict):
+        return first.get("configurable", {}).get("thread_id")
+    return first if isinstance(first, str) else None
+
+
+# --- Checkpoint writer process ---
+
+def _writer_process(db_path: str, requests, replies):
+    from .log_pipeline import configure_logging, stop_logging
+
+    configure_logging()
+    try:
+        asyncio.run(_writer_main(db_path, requests, replies))
+    finally:
+        stop_logging()  # Child processes skip atexit: write out what is still queued
+
+
+async def _writer_main(db_path: str, requests, replies):
+    from .checkpoint_maintenance import schedule_maintenance
+    from .delta_checkpoint import DeltaSqliteSaver
+
+    loop = asyncio.get_running_loop()
+    async with DeltaSqliteSaver.from_conn_string(db_path) as saver:
+        await saver.setup()
+        while True:
+            request = await loop.run_in_executor(None, requests.get)
+            if request is None:
+                return
+            worker, request_id, method, args = request
+            try:
+                if method == "alist":
+                    result = [t async for t in saver.alist(*args)]
+                else:
+                    result = await getattr(saver, method)(*args)
+                ok = True
+            except Exception as e:
+                result, ok = e, False
+                logger.error(f"❌ Checkpoint writer: {method} failed: {e}")
+            if request_id is not None:
+                replies.put((worker, (request_id, ok, result)))
+            elif not ok:
+                # Nobody waits on a forwarded write: tell the worker, so the debate fails
+                replies.put((worker, (None, False, (_thread_of(args), result))))
+            if method == "athread_finished":
+                # The writer owns the store, so it is the one process that maintains it
+                schedule_maintenance(db_path)
+
+
+class RemoteSaver(BaseCheckpointSaver):
+    """Checkpointer for worker processes: forwards every call to the writer process."""
+
+    # Same version format as the writer's saver, so threads move freely between them
+    get_next_version = AsyncSqliteSaver.get_next_version
+
+    def __init__(self, worker: Tuple[int, int], requests, replies):
+        super().__init__()
+        self.worker = worker  # (index, generation): the dispatcher relays replies by it
+        self._requests = requests
+        self._replies = replies
+        self._ids = itertools.count()
+        self._pending: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._failed: Dict[Optional[str], BaseException] = {}  # thread_id -> error of a forwarded write
+        self._reader = threading.Thread(target=self._read_replies, name="store-replies", daemon=True)
+        self._reader.start()
+
+    def _read_replies(self):
+        while True:
+            reply = self._replies.get()
+            if reply is None:
+                return
+            request_id, ok, result = reply
+            if request_id is None:
+                thread_id, error = result
+                self._failed[thread_id] = error
+                continue
+            pending = self._pending.pop(request_id, None)
+            if pending is None:
+                continue  # The caller was cancelled
+            loop, future = pending
+            setter = future.set_result if ok else future.set_exception
+            loop.call_soon_threadsafe(lambda s=setter, r=result: None if future.done() else s(r))
+
+    def _check(self, args: Sequence[Any]):
+        """Raise the error of an earlier forwarded write for the same thread, if any."""
+        error = self._failed.pop(_thread_of(args), None)
+        if error is not None:
+            raise error
+
+    def _send(self, method: str, *args: Any):
+        self._check(args)
+        self._requests.put((self.worker, None, method, args))
+
+    async def _call(self, method: str, *args: Any) -> Any:
+        self._check(args)
+        loop = asyncio.get_running_loop()
+        request_id = next(self._ids)
+        future = loop.create_future()
+        self._pending[request_id] = (loop, future)
+        self._requests.put((self.worker, request_id, method, args))
+        try:
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    def close(self):
+        self._replies.put(None)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._call("aget_tuple", _portable(config))
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for tuple_ in await self._call("alist", _portable(config), filter, _portable(before), limit):
+            yield tuple_
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        self._send("aput", _portable(config), checkpoint, metadata, new_versions)
+        return {
+            "configurable": {
+                "thread_id": config["configurable"]["thread_id"],
+                "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._send("aput_writes", _portable(config), list(writes), task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._call("adelete_thread", thread_id)
+
+    async def athread_started(self, thread_id: str, question: str) -> None:
+        self._send("athread_started", thread_id, question)
+
+    async def athread_finished(self, thread_id: str, status: str = "finished") -> None:
+        self._failed.pop(thread_id, None)  # Already failed or finished: nothing left to fail
+        self._send("athread_finished", thread_id, status)
+
+
+# --- Worker processes ---
+
+def _worker_process(
+    worker: Tuple[int, int], jobs, events, controls, store_requests, store_replies, debates_per_worker: int,
+):
+    from .log_pipeline import configure_logging, stop_logging
+
+    configure_logging()
+    try:
+        asyncio.run(_worker_main(worker, jobs, events, controls, store_requests, store_replies, debates_per_worker))
+    finally:
+        stop_logging()
+
+
+async def _worker_main(
+    worker: Tuple[int, int], jobs, events, controls, store_requests, store_replies, debates_per_worker: int,
+):
+    from .backend import create_roundtable_graph, resume_debate, run_demo
+
+    loop = asyncio.get_running_loop()
+    saver = RemoteSaver(worker, store_requests, store_replies)
+    app = create_roundtable_graph().compile(checkpointer=saver)
+    running: Dict[str, asyncio.Task] = {}
+    slots = asyncio.Semaphore(max(1, debates_per_worker))
+
+    def read_controls():
+        while True:
+            job_id = controls.get()
+            if job_id is None:
+                return
+            loop.call_soon_threadsafe(lambda j=job_id: running[j].cancel() if j in running else None)
+
+    threading.Thread(target=read_controls, name="worker-controls", daemon=True).start()
+    events.put(("ready", None, worker))
+
+    async def run(job_id: str, question: str, resume: bool, follow_up: bool):
+        on_message = lambda entry: events.put(("message", job_id, entry))
+        try:
+            if resume:
+                await resume_debate(job_id, on_message=on_message, app=app)
+            else:
+                await run_demo(question, job_id, on_message=on_message, app=app, follow_up=follow_up)
+            events.put(("ended", job_id, worker, "finished", None))
+        except asyncio.CancelledError:
+            events.put(("ended", job_id, worker, "cancelled", None))
+        except Exception as e:
+            events.put(("ended", job_id, worker, "failed", str(e)))
+        finally:
+            running.pop(job_id, None)
+            slots.release()
+
+    while True:
+        # Take a job only when a slot is free; the dispatcher sends no more than fit
+        await slots.acquire()
+        job = await loop.run_in_executor(None, jobs.get)
+        if job is None:
+            break
+        job_id, question, resume, follow_up = job
+        events.put(("started", job_id, worker))
+        running[job_id] = asyncio.create_task(run(job_id, question, resume, follow_up))
+
+    if running:
+        await asyncio.gather(*running.values(), return_exceptions=True)
+    saver.close()
+
+
+# --- Dispatcher ---
+
+async def _replay(db_path: str, thread_id: str) -> List[TranscriptEntry]:
+    from .backend import open_roundtable, replay_debate
+    async with open_roundtable(db_path) as app:
+        return await replay_debate(thread_id, app)
+
+
+class WorkerPool:
+    """Dispatches debates to worker processes; same job API as DebateExecutor."""
+
+    def __init__(
+        self,
+        workers: int = WORKER_PROCESSES,
+        debates_per_worker: int = MAX_CONCURRENT_DEBATES,
+        max_queued: int = MAX_QUEUED_DEBATES,
+        db_path: Optional[str] = None,
+    ):
+        from .backend import DB_PATH
+
+        self.workers = max(1, workers)
+        self.db_path = db_path or DB_PATH
+        self.debates_per_worker = debates_per_worker
+        self.max_queued = max_queued
+        self.counters: Counter = Counter()
+        self._jobs: Dict[str, DebateJob] = {}
+        self._job_workers: Dict[str, Tuple[int, int]] = {}  # job_id -> (worker index, generation) it was sent to
+        self._lock = threading.Lock()
+        self._workers_lock = threading.Lock()  # Guards the per-worker state below
+        self._ready = threading.Event()
+        self._ready_workers: Set[int] = set()  # Indexes whose current process has compiled its graph
+        self._stopping = False
+        self._readers = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="pool-replay")
+        self._queue = FairQueue(self.workers * debates_per_worker)
+
+        # spawn: workers must not inherit the parent's event loops, threads or sqlite handles
+        self._ctx = multiprocessing.get_context("spawn")
+        self._events = self._ctx.Queue()
+        # A process killed inside get() never releases the queue's lock, so every queue
+        # a process reads from is read by that process only and replaced along with it
+        self._generations = [0] * self.workers
+        self._load = [0] * self.workers  # Jobs sent to each worker that have not ended
+        self._job_queues: List[Any] = [None] * self.workers
+        self._controls: List[Any] = [None] * self.workers
+        self._replies: List[Any] = [None] * self.workers
+        self._processes: List[Any] = [None] * self.workers
+        self._retired: List[Any] = []  # Workers stopped after the writer died, joined at shutdown
+        self._start_writer()
+        for index in range(self.workers):
+            self._start_worker(index)
+        self._collector = threading.Thread(target=self._collect, name="pool-events", daemon=True)
+        self._collector.start()
+
+    # --- Processes ---
+
+    def _start_writer(self):
+        self._store_requests = self._ctx.Queue()
+        self._store_replies = self._ctx.Queue()
+        self._writer = self._ctx.Process(
+            target=_writer_process,
+            args=(self.db_path, self._store_requests, self._store_replies),
+            name="checkpoint-writer",
+            daemon=True,
+        )
+        self._writer.start()
+        self._relay = threading.Thread(
+            target=self._relay_replies, args=(self._store_replies,), name="store-relay", daemon=True
+        )
+        self._relay.start()
+
+    def _relay_replies(self, replies):
+        """Pass writer replies on to the worker they are for (dropped if that process has died since)."""
+        while True:
+            message = replies.get()
+            if message is None:
+                return
+            (index, generation), reply = message
+            with self._workers_lock:
+                if generation == self._generations[index]:
+                    self._replies[index].put(reply)
+
+    def _start_worker(self, index: int):
+        self._job_queues[index] = self._ctx.Queue()
+        self._controls[index] = self._ctx.Queue()
+        self._replies[index] = self._ctx.Queue()
+        self._processes[index] = self._ctx.Process(
+            target=_worker_process,
+            args=((index, self._generations[index]), self._job_queues[index], self._events, self._controls[index],
+                  self._store_requests, self._replies[index], self.debates_per_worker),
+            name=f"debate-worker-{index}",
+            daemon=True,
+        )
+        self._processes[index].start()
+
+    def _replace_worker(self, index: int, error: str):
+        """Fail the jobs sent to worker `index`, free their slots and start a new process in its place."""
+        lost = (index, self._generations[index])
+        self._generations[index] += 1
+        for job in self.jobs():
+            if self._job_workers.get(job.job_id) == lost:
+                self._fail(job, error)
+                self._queue.done(job)
+        self._load[index] = 0
+        self._ready_workers.discard(index)  # The new process reports ready again
+        self._start_worker(index)
+
+    def _check_processes(self):
+        """Replace dead workers; if the writer died, replace it and every worker."""
+        if self._stopping:
+            return
+        with self._workers_lock:
+            if not self._writer.is_alive():
+                error = f"Checkpoint writer exited with code {self._writer.exitcode}."
+                logger.error(f"❌ {error} Restarting it and the workers.")
+                self.counters["writer_restarts"] += 1
+                self._store_replies.put(None)  # Stops the old relay
+                self._start_writer()
+                for index, process in enumerate(self._processes):
+                    # Running debates lost their checkpoint writes: they fail, the old
+                    # process cancels them and exits, a new one takes its place
+                    current = (index, self._generations[index])
+                    for job_id, worker in list(self._job_workers.items()):
+                        if worker == current:
+                            self._controls[index].put(job_id)
+                    self._job_queues[index].put(None)
+                    self._controls[index].put(None)
+                    self._retired.append(process)
+                    self._replace_worker(index, error)
+            else:
+                for index, process in enumerate(self._processes):
+                    if not process.is_alive():
+                        error = f"Worker {index} exited with code {process.exitcode}."
+                        logger.error(f"❌ {error} Starting a replacement.")
+                        self.counters["worker_restarts"] += 1
+                        self._replace_worker(index, error)
+        self._dispatch()
+
+    # --- Events ---
+
+    def _collect(self):
+        next_check = time.monotonic() + WORKER_CHECK_SECONDS
+        while True:
+            try:
+                event = self._events.get(timeout=WORKER_CHECK_SECONDS)
+            except queue.Empty:
+                event = ()
+            if event is None:
+                return
+            if time.monotonic() >= next_check:
+                self._check_processes()
+                next_check = time.monotonic() + WORKER_CHECK_SECONDS
+            if event:
+                self._handle(event)
+
+    def _handle(self, event: tuple):
+        kind, job_id = event[0], event[1]
+        if kind == "ready":
+            index, generation = event[2]
+            with self._workers_lock:
+                if generation == self._generations[index]:
+                    self._ready_workers.add(index)
+                if len(self._ready_workers) == self.workers:
+                    self._ready.set()
+            return
+        job = self.get(job_id)
+        if job is None:
+            return
+        if kind == "message":
+            job._append(event[2])
+            return
+        worker = event[2]
+        with self._workers_lock:
+            if self._job_workers.get(job_id) != worker:
+                return  # From a process that has died since: the job was failed then
+            if kind == "ended":
+                self._load[worker[0]] -= 1
+        if kind == "started":
+            if job.done:
+                # Cancelled while in the queue: the worker already took it
+                self._controls[worker[0]].put(job_id)
+            else:
+                job.status = "running"
+        elif kind == "ended":
+            status, error = event[3], event[4]
+            if not job.done:
+                if status == "finished":
+                    job._spill()
+                job._end(status, error)
+                self.counters[status] += 1
+            self._queue.done(job)
+            self._dispatch()
+
+    def _fail(self, job: DebateJob, error: str):
+        if not job.done:
+            job._end("failed", error)
+            self.counters["failed"] += 1
+            logger.error(f"❌ Debate {job.job_id} failed: {error}")
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until every worker has imported the backend and compiled its graph."""
+        return self._ready.wait(timeout)
+
+    # --- Jobs ---
+
+    def _enqueue(self, job: DebateJob) -> DebateJob:
+        with self._lock:
+            self._prune()
+            problem = admission_error((j for j in self._jobs.values() if j.status == "queued"), job, self.max_queued)
+            if problem:
+                self.counters["rejected"] += 1
+                raise QueueFullError(problem)
+            if job.job_id in self._jobs and not self._jobs[job.job_id].done:
+                raise ValueError(f"Debate '{job.job_id}' is already running.")
+            self._jobs[job.job_id] = job
+            self.counters["submitted"] += 1
+            self._queue.push(job)
+        self._dispatch()
+        return job
+
+    def _dispatch(self):
+        """Send the next fair-share jobs to the least busy workers, up to one per free slot."""
+        with self._workers_lock:
+            while (job := self._queue.pop()) is not None:
+                index = min(range(self.workers), key=self._load.__getitem__)
+                self._load[index] += 1
+                self._job_workers[job.job_id] = (index, self._generations[index])
+                self._job_queues[index].put((job.job_id, job.question, job.resume, job.follow_up))
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [j.job_id for j in self._jobs.values() if j.done and (j.finished_at or 0) < cutoff]:
+            del self._jobs[job_id]
+            self._job_workers.pop(job_id, None)
+
+    def submit(
+        self, question: str, thread_id: Optional[str] = None, follow_up: bool = False,
+        tenant: Optional[str] = None, priority: str = "interactive",
+    ) -> DebateJob:
+        return self._enqueue(new_job(question, thread_id, follow_up, tenant, priority))
+
+    def resume(self, thread_id: str) -> DebateJob:
+        job = self.get(thread_id)
+        if job and not job.done:
+            return job
+        validate_tenant(tenant_of(thread_id))
+        return self._enqueue(DebateJob(job_id=thread_id, question="", resume=True))
+
+    def replay(self, thread_id: str) -> concurrent.futures.Future:
+        """Transcript from checkpoints, read directly (WAL readers do not block the writer)."""
+        return self._readers.submit(asyncio.run, _replay(self.db_path, thread_id))
+
+    def get(self, job_id: str) -> Optional[DebateJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.done:
+            return False
+        if job.status == "queued":
+            job._end("cancelled")
+            self.counters["cancelled"] += 1
+            return True
+        with self._workers_lock:
+            self._controls[self._job_workers[job_id][0]].put(job_id)
+        return True
+
+    def jobs(self) -> List[DebateJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stats(self) -> Dict[str, Any]:
+        statuses = Counter(job.status for job in self.jobs())
+        return {
+            "workers": self.workers,
+            "running": statuses["running"],
+            "queued": statuses["queued"],
+            "max_concurrency": self.workers * self.debates_per_worker,
+            "max_queued": self.max_queued,
+            "totals": dict(self.counters),
+            "scheduler": self._queue.stats(),
+        }
+
+    def shutdown(self):
+        """Let running debates finish, then stop workers, the writer and the collector."""
+        self._stopping = True
+        for jobs in self._job_queues:
+            jobs.put(None)
+        for process in self._processes:
+            process.join()
+        for process in self._retired:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()  # Stuck flushing to the dead writer's queue
+        self._store_requests.put(None)
+        self._writer.join()
+        self._store_replies.put(None)
+        self._relay.join()
+        for controls in self._controls:
+            controls.put(None)
+        self._events.put(None)
+        self._collector.join()
+        self._readers.shutdown()
+
+# --- Benchmark ---
+
+def _run_pool(workers: int, debates: int, db_path: str) -> Dict[str, Any]:
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    if workers == 0:
+        pool = DebateExecutor(max_queued=debates, db_path=db_path)
+    else:
+        pool = WorkerPool(workers=workers, max_queued=debates, db_path=db_path)
+        pool.wait_until_ready()
+    start = time.perf_counter()
+    jobs = [pool.submit(f"Should I take a sabbatical? (bench {i})") for i in range(debates)]
+    for job in jobs:
+        job.finished.result()
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    statuses = Counter(job.status for job in jobs)
+    return {
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "debates_per_second": round(debates / elapsed, 2),
+        "statuses": dict(statuses),
+    }
+
+
+def _bench_child(workers: int, debates: int, db_path: str, results):
+    results.put(_run_pool(workers, debates, db_path))
+
+
+def _run_isolated(workers: int, debates: int, db_path: str) -> Dict[str, Any]:
+    # Fresh process per configuration: the offline-model settings are read at import time
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    child = ctx.Process(target=_bench_child, args=(workers, debates, db_path, results))
+    child.start()
+    result = results.get()
+    child.join()
+    return result
+
+
+def run_benchmark(debates: int = 64, worker_counts: Sequence[int] = (0, 1, 2, 4), db_path: str = "bench_pool.db"):
+    """Debates per second across worker counts (0 = in-process executor), on the offline model."""
+    os.environ["ROUNDTABLE_OFFLINE_LLM"] = "1"
+    # Near-zero model latency: what is left is the CPU-side work the pool spreads out
+    os.environ.setdefault("OFFLINE_LLM_LATENCY_SECONDS", "0.005")
+    print(f"🧮 {debates} debates, {os.cpu_count()} CPU(s) available\n")
+    baseline = None
+    for workers in worker_counts:
+        result = _run_isolated(workers, debates, db_path)
+        baseline = baseline or result["debates_per_second"]
+        label = "in-process" if workers == 0 else f"{workers} worker(s)"
+        print(f"   {label:>12}: {result['debates_per_second']:>6} debates/s  "
+              f"({result['seconds']}s, x{result['debates_per_second'] / baseline:.2f})  {result['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process debate worker pool")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = sub.add_parser("bench", help="Throughput scaling across worker counts")
+    bench_cmd.add_argument("--debates", type=int, default=64)
+    bench_cmd.add_argument("--workers", default="0,1,2,4", help="Comma-separated worker counts (0 = in-process executor)")
+    args = parser.parse_args()
+    if args.command == "bench":
+        run_benchmark(args.debates, [int(w) for w in args.workers.split(",")])
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,18 @@ Beautiful visual interface to watch the AI debate in real-time.
 """
 
 import streamlit as st
-import asyncio
 from datetime import datetime
 import json
-from src.backend import run_demo
-from src.mock_data import mock_data
+from src.backend import configure_logging
+from src.checkpoint_maintenance import thread_info
+from src.executor import get_executor
+from src.session_memory import get_session_store
+from src.tenants import UnknownTenantError, tenant_of, validate_tenant
+from src.ui_data import transcript_stats, workspace_summary
 from typing import List, Dict
 
+configure_logging()
+
 # Page config
 st.set_page_config(
     page_title="THE ROUNDTABLE",
@@ -98,48 +103,35 @@ st.markdown("""
 st.title("🎭 THE ROUNDTABLE")
 st.subheader("Your Personal Board of Directors")
 
+# Each tenant sees only its own workspace and debates (?tenant=acme; the default tenant otherwise)
+try:
+    tenant = validate_tenant(st.query_params.get("tenant"))
+except UnknownTenantError as e:
+    st.error(str(e))
+    st.stop()
+
 # Sidebar with mock data overview
 with st.sidebar:
     st.header("📊 Your Data Context")
     
-    projects = mock_data.get_all_projects()
-    tasks = mock_data.get_all_tasks()
-    events = mock_data.get_calendar_events(30)
-    
-    st.markdown(f"""
-    <div class="stat-box">
-        <div class="stat-number">{len(projects)}</div>
-        <div class="stat-label">Active Projects</div>
-    </div>
-    """, unsafe_allow_html=True)
+    # Cached per tenant and workspace revision: reruns don't re-query or re-render it
+    workspace = workspace_summary(tenant)
     
-    st.markdown(f"""
-    <div class="stat-box">
-        <div class="stat-number">{len(tasks)}</div>
-        <div class="stat-label">Pending Tasks</div>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown(f"""
-    <div class="stat-box">
-        <div class="stat-number">{len(events['events'])}</div>
-        <div class="stat-label">Upcoming Events</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(workspace["stat_boxes"], unsafe_allow_html=True)
     
     st.divider()
     
     with st.expander("📁 View Projects"):
-        for proj in projects:
+        for proj in workspace["projects"]:
             st.markdown(f"**{proj['title']}**")
-            st.caption(f"Status: {proj['status']} | Priority: {proj['priority']}")
-            st.caption(f"Budget: {proj['budget']}")
+            st.caption(proj["caption"])
+            st.caption(proj["budget"])
             st.divider()
     
     with st.expander("📅 View Calendar"):
-        for event in events['events'][:10]:
+        for event in workspace["events"]:
             st.markdown(f"**{event['title']}**")
-            st.caption(f"{event['date']} at {event['time']}")
+            st.caption(event["caption"])
             st.divider()
 
 # Main content
@@ -175,35 +167,96 @@ question = st.text_area(
     placeholder="e.g., Should I take a sabbatical next year? Can I afford to start a business?"
 )
 
-if st.button("🚀 Start Debate", type="primary", use_container_width=True):
+# Debates run on a shared background executor: this script run only enqueues
+# and polls, so widget interactions stay instant while a debate is going
+executor = get_executor()
+
+# A finished debate can be followed up on its thread: one short round on the same context
+can_follow_up = st.session_state.get("debate_status") == "finished" and "thread_id" in st.session_state
+follow_up = can_follow_up and st.checkbox("↪️ Follow up on the last debate (reuses its context and verdict)", value=True)
+
+if st.button("🚀 Start Debate", type="primary", use_container_width=True, disabled="job_id" in st.session_state):
     if not question:
         st.error("Please enter a question!")
     else:
-        with st.spinner("🎭 THE ROUNDTABLE is deliberating..."):
-            # Run the debate
-            messages = asyncio.run(run_demo(question))
-            
-            st.session_state.messages = messages
-            st.session_state.question_asked = question
+        job = executor.submit(question, st.session_state.thread_id if follow_up else None, follow_up=follow_up, tenant=tenant)
+        st.session_state.job_id = job.job_id
+        st.session_state.thread_id = job.job_id
+        st.session_state.question_asked = question
+        st.session_state.pop("result_thread", None)
+        st.session_state.pop("stats", None)
+        st.session_state.pop("debate_status", None)
+        # Keep the thread in the URL so a page reload can reconnect to this debate
+        st.query_params["debate"] = job.job_id
+
+# Reconnect after a page reload: attach to the debate if it is still running,
+# otherwise finish it from its checkpoints (or replay it) instead of starting over
+debate_id = st.query_params.get("debate")
+if debate_id and st.session_state.get("thread_id") != debate_id:
+    st.session_state.thread_id = debate_id
+    owned = tenant_of(debate_id) == tenant
+    info = thread_info(executor.db_path, debate_id) if owned else None
+    live_job = executor.get(debate_id) if owned else None
+    if info is None and live_job is None:
+        del st.query_params["debate"]
+    else:
+        st.session_state.job_id = executor.resume(debate_id).job_id
+        st.session_state.question_asked = info["question"] if info else live_job.question
+
+
+@st.fragment(run_every=1.0)
+def debate_progress():
+    """Poll the running debate and show each agent as it speaks."""
+    job = executor.get(st.session_state.job_id)
+    if job is None:
+        st.session_state.pop("job_id", None)
+        st.rerun()
+    
+    messages = job.snapshot()
+    if job.done:
+        # The session keeps only the thread ID; the transcript lives in the memory-bounded session store
+        st.session_state.result_thread = job.job_id
+        st.session_state.stats = transcript_stats(messages)
+        st.session_state.debate_status = job.status
+        st.session_state.debate_error = job.error
+        del st.session_state.job_id
+        st.rerun()
+    
+    status = "⏳ Waiting for a free seat at the table..." if job.status == "queued" else "🎭 THE ROUNDTABLE is deliberating..."
+    st.info(f"{status} ({len(messages)} contributions so far)")
+    for msg in messages:
+        st.markdown(f"**{msg['agent']}** — {msg['content'][:200]}...")
+    
+    if st.button("🛑 Cancel Debate", use_container_width=True):
+        executor.cancel(job.job_id)
+
+
+if "job_id" in st.session_state:
+    debate_progress()
+
+if st.session_state.get("debate_status") == "failed":
+    st.error(f"The debate failed: {st.session_state.get('debate_error')}")
+elif st.session_state.get("debate_status") == "cancelled":
+    st.warning("Debate cancelled. Reload the page to pick it up where it stopped.")
 
 # Display results if available
-if "messages" in st.session_state:
+def stored_transcript(thread_id: str) -> List:
+    """A finished debate's transcript: the retained job's, else the session store's (memory or disk)."""
+    job = executor.get(thread_id)
+    return job.snapshot() if job is not None else (get_session_store().get(thread_id) or [])
+
+
+if "result_thread" in st.session_state:
     st.markdown("---")
+    messages = stored_transcript(st.session_state.result_thread)
     
-    # Extract final decision from The Chair's message
-    final_decision = None
-    decision_type = None
-    chair_message = None
-    
-    for msg in st.session_state.messages:
-        if msg['agent'] == 'TheChair':
-            chair_message = msg['content']
-            if "✅ DECISION: SUPPORT" in chair_message or "DECISION: SUPPORT" in chair_message:
-                final_decision = "SUPPORT"
-                decision_type = "support"
-            elif "❌ DECISION: OPPOSE" in chair_message or "DECISION: OPPOSE" in chair_message:
-                final_decision = "OPPOSE"
-                decision_type = "oppose"
+    # Computed once when the result was stored, not on every rerun
+    if "stats" not in st.session_state:
+        st.session_state.stats = transcript_stats(messages)
+    stats = st.session_state.stats
+    final_decision = stats["decision"]
+    decision_type = final_decision.lower() if final_decision else None
+    chair_message = stats["chair_message"]
     
     # Display prominent final decision if found
     if final_decision:
@@ -235,7 +288,7 @@ if "messages" in st.session_state:
         st.markdown("---")
         
         # Display each agent's response EXCEPT The Chair (since it's already shown)
-        for msg in st.session_state.messages:
+        for msg in messages:
             agent = msg['agent']
             if agent == "TheChair":
                 continue # Skip Chair, already shown above
@@ -272,19 +325,19 @@ if "messages" in st.session_state:
         # Summary stats
         st.markdown("---")
         st.subheader("📊 Debate Statistics")
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            rounds = sum(1 for m in st.session_state.messages if m['agent'] == "TheChair")
-            st.metric("Debate Rounds", rounds)
+            st.metric("Debate Rounds", stats["rounds"])
         
         with col2:
-            total_agents = len(set(m['agent'] for m in st.session_state.messages))
-            st.metric("Agents Involved", total_agents)
+            st.metric("Agents Involved", stats["agents"])
         
         with col3:
-            total_words = sum(len(m['content'].split()) for m in st.session_state.messages)
-            st.metric("Total Words", total_words)
+            st.metric("Total Words", stats["words"])
+        
+        with col4:
+            st.metric("Tokens Used", f"{stats['tokens']:,}" if stats.get("tokens") is not None else "—")
 
 # Footer
 st.markdown("---")
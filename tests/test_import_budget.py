@@ -0,0 +1,11 @@
+"""Import-time budget for the entry modules (see src/import_budget.py)."""
+
+import pytest
+
+from src.import_budget import DEFAULT_MODULES, IMPORT_BUDGET_MS, check
+
+
+@pytest.mark.parametrize("module", DEFAULT_MODULES)
+def test_import_within_budget(module):
+    # Best of three fresh interpreters; also fails if a deferred SDK was imported eagerly
+    assert check([module], IMPORT_BUDGET_MS, runs=3) == []
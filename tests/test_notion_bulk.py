@@ -0,0 +1,103 @@
+"""Bulk Notion event creation against the local mock Notion server (see src/notion_bulk.py)."""
+
+import asyncio
+
+import pytest
+
+from src import notion_bulk
+from src.notion_bulk import (
+    NOTION_RATE_BURST,
+    NOTION_RATE_LIMIT_PER_SECOND,
+    IdempotencyStore,
+    MockNotionServer,
+    _bulk,
+    _events,
+)
+
+EVENTS = 12
+
+
+@pytest.fixture
+def server():
+    with MockNotionServer(latency=0.05) as server:
+        yield server
+
+
+@pytest.fixture
+def store(tmp_path):
+    return IdempotencyStore(str(tmp_path / "idempotency.db"))
+
+
+def test_bulk_creates_each_event_once(server, store):
+    events = _events(EVENTS, "Planning")
+    result, _ = asyncio.run(_bulk(server, events + events[:3], store))  # With in-batch duplicates
+    assert len(result.created) == EVENTS
+    assert len(result.skipped) == 3
+    assert not result.failed
+    assert len(server.pages) == EVENTS
+
+
+def test_retried_call_creates_nothing(server, store):
+    events = _events(EVENTS, "Planning")
+    asyncio.run(_bulk(server, events, store))
+    retry, _ = asyncio.run(_bulk(server, events, store))
+    assert not retry.created
+    assert len(retry.skipped) == EVENTS
+    assert len(server.pages) == EVENTS
+
+
+def test_overlapping_calls_create_each_event_once(server, store):
+    events = _events(EVENTS, "Overlap")
+
+    async def overlapping():
+        return await asyncio.gather(_bulk(server, events, store), _bulk(server, events, store))
+
+    (first, _), (second, _) = asyncio.run(overlapping())
+    assert len(first.created) + len(second.created) == EVENTS
+    assert len(server.pages) == EVENTS
+
+
+def test_key_held_by_unfinished_create_is_not_reported_created(server, store, monkeypatch):
+    monkeypatch.setattr(notion_bulk, "IN_FLIGHT_WAIT_SECONDS", 0.5)
+    event = dict(_events(1, "Held")[0], idempotency_key="held")
+    store.claim("held", event["summary"])  # Another create, still in flight
+    result, _ = asyncio.run(_bulk(server, [event], store))
+    assert not result.created and not result.skipped
+    assert result.in_progress == [(event["summary"], "held")]
+    assert not server.pages
+
+
+def test_key_released_by_failed_create_is_created(server, store):
+    event = dict(_events(1, "Released")[0], idempotency_key="released")
+    store.claim("released", event["summary"])
+
+    async def other_create_fails():
+        await asyncio.sleep(0.3)
+        await asyncio.to_thread(store.release, "released")
+
+    async def both():
+        return await asyncio.gather(_bulk(server, [event], store), other_create_fails())
+
+    (result, _), _ = asyncio.run(both())
+    assert len(result.created) == 1 and not result.in_progress
+    assert len(server.pages) == 1
+
+
+def test_tool_deduplicates_repeated_call(server, tmp_path, monkeypatch):
+    from src.tools import calendar_create_events
+
+    # As a retried planning turn would call it
+    monkeypatch.setenv("NOTION_API_KEY", "mock")
+    monkeypatch.setenv("NOTION_BASE_URL", server.base_url)
+    monkeypatch.setattr(notion_bulk, "_store", IdempotencyStore(str(tmp_path / "tool.db")))
+    call = {"name": "calendar_create_events", "args": {"events": _events(5, "Tool")}, "id": "check", "type": "tool_call"}
+    first, second = (asyncio.run(calendar_create_events.ainvoke(call)).content for _ in range(2))
+    assert "created 5," in first
+    assert "created 0, already existed 5" in second
+    assert len(server.pages) == 5
+
+
+def test_requests_stay_under_rate_limit(server, store):
+    result, _ = asyncio.run(_bulk(server, _events(EVENTS, "Rate"), store))
+    assert len(result.created) == EVENTS
+    assert server.peak_rate() <= NOTION_RATE_LIMIT_PER_SECOND + NOTION_RATE_BURST
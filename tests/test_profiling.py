@@ -0,0 +1,23 @@
+"""Per-node CPU attribution of an offline debate profile (see src/profiling.py)."""
+
+import glob
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_offline_profile_attributes_cpu_to_nodes(tmp_path):
+    # Fresh interpreter: the offline model is chosen when the backend is imported
+    env = dict(os.environ, PROFILE_DIR=str(tmp_path), PROFILE_DB_PATH=str(tmp_path / "profile.db"))
+    subprocess.run(
+        [sys.executable, "-m", "src.profiling", "run", "--debates", "10", "--interval-ms", "1"],
+        cwd=ROOT, env=env, check=True, capture_output=True, timeout=300,
+    )
+    (path,) = glob.glob(str(tmp_path / "*.summary.json"))
+    with open(path) as f:
+        by_node = json.load(f)["cpu_by_node"]
+    for node in ("visionary", "skeptic", "chair"):
+        assert by_node.get(node, 0) > 0, by_node